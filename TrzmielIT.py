@@ -1,9 +1,23 @@
-from typing import Tuple
 
 import pygame
 from pygame.locals import *
+import os
 import sys
+import time
 import random
+import atexit
+from collections import OrderedDict, deque
+from assets import AssetManager
+from audio import AudioMixer, MUSIC
+from profiler import FrameProfiler
+from ui import WidgetIndex
+from tween import Tweens, ease_in_quad
+from controls import InputQueue
+from simulation import World, FixedTimestep, BEE_X, BEE_START_Y, JUMP, POINT, HIT, LANDED, DIFFICULTIES
+from collision import obstacle_shape, split_gap
+from replay import ReplayReader, ReplayWriter
+from scores import ScoreStore
+from network import RaceClient, RaceSession, serve_in_background, DEFAULT_PORT
 try:
     import pyi_splash
 except:
@@ -30,39 +44,42 @@ except:
         True jeśli ma lecieć muzyka, w innym przypadku False
     sounds_on : bool
         True jeśli mają być dźwięki, w innym przypadku False
-    click : bool
-        True tylko raz przy naciśnięciu przycisku potem False
-    open_settings : bool
-        True jeśli ma być otwrte okno, w innym przypadku False
-    start_disappear : bool
-        True jeśli ma zaniknąć okno startowe
-    pointget_acc : int
-        służy do wywoływania funkcji pointget, domyślnie powinna zostać przeniesiona jako zmienna okna 1_player_mode
-        lub jakkolwiek będzie się nazywać
-    game_highscores_file 
-        Odzwierciedla plik tekstowy, w którym są zapisywane najlepsze wyniki gracza
+    game_highscores
+        Dawny plik tekstowy z najlepszymi wynikami, przepisywany do game_scores przy pierwszym uruchomieniu
+    game_scores
+        Baza wyników wszystkich gier (scores.ScoreStore)
+    course_seed : int
+        Ziarno toru każdej gry (None - losowe), ustawiane opcją --seed, żeby powtórzyć tor np. przy zgłaszaniu błędu
+    course_difficulty : string
+        Krzywa trudności toru z simulation.DIFFICULTIES, ustawiana opcją --difficulty
+    record_replays : bool
+        True jeśli każda gra ma być nagrywana do replays_directory (wyłączane opcją --no-replays)
+    replays_directory : string
+        Katalog z nagranymi powtórkami
+    race_host : string
+        Adres serwera wyścigów (opcja --join host[:port]); na tym komputerze serwer uruchamiany jest w razie potrzeby
+    race_port : int
+        Port serwera wyścigów
+    pulse_step : float
+        Czas jednego kroku pulsowania tytułu i cytatu w milisekundach
 """
 FPS = 60
 src_width = 800
 src_height = 600
-display_screen_window = pygame.display.set_mode((src_width, src_height))
+display_screen_window = None
 music_on = True
 sounds_on = True
-click = False
-open_settings = False
-open_results = False
-start_disappear = False
-one_player_mode = False
 SCORE = 0
-pointget_acc = 0
-inactive_bool = False
 game_highscores = r"data/highscores.txt"
+game_scores = r"data/scores.sqlite3"
 HIGHSCORE = None
-gap = 98
-PROGRAM_RUNNING = True
-START_WINDOW = True
-RESTART_1_PLAYER = False
-RETURN_TO_MENU = False
+course_seed = None
+course_difficulty = 'classic'
+record_replays = True
+replays_directory = r"data/replays"
+race_host = 'localhost'
+race_port = DEFAULT_PORT
+pulse_step = 1000 / 30
 
 """
     Adresy obrazków i dźwięków
@@ -92,7 +109,6 @@ start_button_1_player_image = 'images/start/Przycisk single.png'
 start_button_2_player_image = 'images/start/Przycisk multi.png'
 start_button_settings_image = 'images/settings/settings_icon.png'
 game_obstacle_image = 'images/game/rura.png'
-start_inactive_button_image = 'images/start/inactive_button.png'
 counter_background = 'images/counter_background.png'
 
 icon_image = 'images/start/icon.png'
@@ -116,17 +132,9 @@ settings_note_image = 'images/settings/note.png'
 results_background_image = 'images/results/background_with_text.png'
 results_return_image = 'images/results/POWROT.png'
 results_restart_image = 'images/results/RESTART.png'
-""" Tworzenie cytatu jako obrazka """
-quotes = open("data/quotes.txt", encoding="utf-8")
-trzmiel_quotes = quotes.read()
-trzmiel_quotes_table = trzmiel_quotes.split('\n')
-pygame.font.init()
-quote_index = random.randint(0, len(trzmiel_quotes_table)) - 1
-quote_text = trzmiel_quotes_table[quote_index]
-Font = pygame.font.SysFont("OCR-A BT", 20)
-Font.set_bold(False)
-Font.set_italic(True)
-quote_image = pygame.font.Font.render(Font, quote_text, False, [255, 241, 150])
+quotes_file = 'data/quotes.txt'
+quote_font = "OCR-A BT"
+quote_color = [255, 241, 150]
 """
     Pozycje obrazków
     ----------------
@@ -138,31 +146,35 @@ quote_image = pygame.font.Font.render(Font, quote_text, False, [255, 241, 150])
         Pozycja (środek) przycisku gry dwuosobowej
     start_button_settings_position : Tuple [int, int]
         Pozycja (środek) przycisku ustawień
+    counter_position, highscore_position, score_position : Tuple [int, int]
+        Pozycja (środek) liczb licznika punktów, najlepszego wyniku i wyniku gry
+    counter_digit_spacing, results_digit_spacing : int
+        Odległość pomiędzy środkami kolejnych cyfr na liczniku i na ekranie wyników
 """
 animation_title_position = (400, 120)
 start_button_1_player_position = (400, 400)
 start_button_2_player_position = (400, 500)
 start_button_settings_position = (40, 560)
-start_trzmiel_position = (150, 280)
+start_trzmiel_position = (BEE_X, BEE_START_Y)
 settings_window_position = (95, 100)
 settings_title_position = (247, 120)
 settings_button_position_1 = (500, 250)
 settings_button_position_2 = (500, 400)
 settings_speaker_position = (250, 200)
 settings_note_position = (250, 350)
-counter_hundreds_position = (48, 50)
-counter_tens_position = (85, 50)
-counter_ones_position = (124, 50)
+counter_position = (86, 50)
+counter_digit_spacing = 38
 counter_background_positions = (10, 10)
+opponent_counter_position = (714, 50)
+opponent_counter_background_position = (640, 10)
+status_position = (400, 300)
 results_background_position = (208, 108)
-highscore_hundreds_position = (362, 315)
-highscore_tens_position = (397, 315)
-highscore_ones_position = (432, 315)
-score_hundreds_position = (362, 225)
-score_tens_position = (397, 225)
-score_ones_position = (432, 225)
+highscore_position = (397, 315)
+score_position = (397, 225)
+results_digit_spacing = 35
 results_return_position = (300, 380)
 results_restart_position = (490, 380)
+race_result_position = (400, 80)
 quote_positions = (400, 220)
 
 """
@@ -177,28 +189,165 @@ settings_button_pressed_size = (100, 100)
 settings_button_not_pressed_size = (100, 100)
 settings_speaker_size = (100, 100)
 settings_note_size = (100, 100)
-inactive_button_size = (260, 120)
 number_size = (30, 38)
 counter_background_size = (150, 85)
 results_return_size = (150, 45)
 results_restart_size = (150, 45)
-
+obstacle_size = (100, 1150)
+loading_bar_size = (400, 24)
+loading_background_color = (124, 200, 222)
+loading_bar_color = (255, 241, 150)
+""" Przezroczystość trzmiela przeciwnika w wyścigu (0 - niewidoczny, 255 - pełny) """
+opponent_alpha = 130
+
+""" game_images : AssetManager
+        Słownik przechowujący obrazki, wczytywane przy pierwszym użyciu (zarejestrowane w register_assets)
+    game_sounds : AssetManager
+        Słownik przechowujący dźwięki
 """
-    Nr kanałów dla poszczególnych dźwięków
+game_images = AssetManager()
+game_sounds = AssetManager()
+""" audio : AudioMixer
+        Muzyka i efekty dźwiękowe (z game_sounds) z głośnościami grup: MUSIC, 'menu' i 'game'
+    sound_groups : List[string]
+        Grupy efektów wyciszane przyciskiem dźwięków w ustawieniach
 """
-start_music_channel = 0
-start_click_sound_channel = 1
-jumping_sound_channel = 2
-point_get_sound_channel = 3
-results_sound_channel = 4
-
-""" game_images : Dict[string, image.pyi]
-        Słownik przechowujący obrazki
-    game_sounds : Dict[string, image.pyi]
-        Słownik przechowujący dźwięki
+audio = AudioMixer(game_sounds)
+sound_groups = ['menu', 'game']
+""" scaled_images : Dict[Tuple[image.pyi, Tuple[int, int]], image.pyi]
+        Przeskalowane obrazki, tworzone raz dla każdego obrazka i rozmiaru
+"""
+scaled_images = {}
+""" held_keys : Set[int]
+        Aktualnie wciśnięte klawisze, według zdarzeń KEYDOWN i KEYUP
+    mouse_position : Tuple[int, int]
+        Ostatnie położenie myszki, według zdarzeń myszki
+    frame_hook : Callable
+        Funkcja wywoływana po wyświetleniu każdej klatki (np. przez benchmark.py), None jeśli brak
+    inputs : InputQueue
+        Zdarzenia z czasem nadejścia i oś czasu skoku, z której kroki symulacji biorą stan skoku
+"""
+held_keys = set()
+mouse_position = (0, 0)
+frame_hook = None
+inputs = InputQueue()
+""" tweens : Tweens
+        Trwające przejścia obiektów (np. wysuwanie okna startowego), przesuwane co klatkę przez SceneManager
+    swipe_duration : int
+        Czas wysuwania elementów z ekranu w milisekundach
+"""
+tweens = Tweens()
+swipe_duration = 600
+""" profile_stages : Tuple[string, ...]
+        Etapy klatki mierzone przez profiler (wait - oczekiwanie na zegar, nie jest pracą gry)
+    profiler : FrameProfiler
+        Czasy etapów ostatnich klatek, nakładka z wykresem przełączana klawiszem F3
+"""
+profile_stages = ('events', 'assets', 'wait', 'simulation', 'background', 'obstacles', 'bee', 'hud', 'results',
+                  'ui', 'overlay', 'flip')
+profiler = FrameProfiler(profile_stages, idle=('wait',))
+""" obstacle_pool : List[Obstacle]
+        Przeszkody do rysowania, tworzone raz i używane we wszystkich kolejnych grach
+"""
+obstacle_pool = []
+""" replay_recorder : replay.ReplayWriter
+        Nagrywana gra (None - brak)
+    replay_source : replay.ReplayReader
+        Powtórka do odtworzenia w następnej grze (opcja --replay), None - gra gracza
+    replay_player : Iterator[bool]
+        Stany skoku odtwarzanej powtórki w kolejnych krokach, None - gra gracza
+"""
+replay_recorder = None
+replay_source = None
+replay_player = None
+""" race_server : network.RaceServer
+        Serwer wyścigów wbudowany w grę, uruchamiany przy pierwszym wyścigu, gdy na tym komputerze żaden nie działa
+    status_font : pygame.font.Font
+        Czcionka napisów w trakcie wyścigu, tworzona przy pierwszym użyciu
+    status_images : Dict[string, image.pyi]
+        Obrazki napisów, tworzone raz dla każdego napisu
+"""
+race_server = None
+status_font = None
+status_images = {}
+""" scenes : SceneManager
+        Stos scen gry (okno startowe, ustawienia, gra, wyścig, wyniki), tworzony przez build_scenes
 """
-game_images = {}
-game_sounds = {}
+scenes = None
+
+
+def scaled(image, size):
+    """
+    :function scaled: Zwraca obrazek przeskalowany do podanego rozmiaru, skalując go tylko przy pierwszym wywołaniu
+    :param image: Oryginalny obrazek
+    :type image: image.pyi
+    :param size: Docelowy rozmiar
+    :type size: Tuple[int, int]
+    :rtype: image.pyi
+    """
+    key = (image, size)
+    result = scaled_images.get(key)
+    if result is None:
+        result = scaled_images[key] = pygame.transform.scale(image, size)
+    return result
+
+
+def pulse_frames(image, scale):
+    """
+    :function pulse_frames: Zwraca klatki animacji pulsowania, dla każdej wartości powiększenia od 0 do scale + 1
+    :param image: Oryginalny obrazek
+    :type image: image.pyi
+    :param scale: Skala powiększenia
+    :type scale: int
+    :rtype: List[image.pyi]
+    """
+    orig_x, orig_y = image.get_size()
+    """ Mechanizm powiększania poprzez dodawanie wartości do rozmiarów obrazka """
+    return [scaled(image, (orig_x + grow, int(orig_y + grow * 0.5))) for grow in range(scale + 2)]
+
+
+def track_input(event):
+    """
+    :function track_input: Uaktualnia stan klawiszy i myszki na podstawie zdarzenia. Stan brany jest ze zdarzeń,
+    a nie z pygame.key.get_pressed, więc sterowanie można odtworzyć wstawiając zdarzenia do kolejki
+    :param event: Zdarzenie z pygame.event.get
+    :type event: pygame.event.Event
+    """
+    global mouse_position
+    if event.type == KEYDOWN:
+        held_keys.add(event.key)
+        if event.key == K_F3:
+            profiler.toggle_overlay()
+    elif event.type == KEYUP:
+        held_keys.discard(event.key)
+    elif event.type in (MOUSEMOTION, MOUSEBUTTONDOWN, MOUSEBUTTONUP):
+        mouse_position = event.pos
+
+
+def jump_pressed():
+    """
+    :function jump_pressed: Sprawdza czy wciśnięty jest klawisz skoku (spacja lub strzałka w górę)
+    :rtype: bool
+    """
+    return K_SPACE in held_keys or K_UP in held_keys
+
+
+def present_frame():
+    """
+    :function present_frame: Wyświetla narysowaną klatkę (z nakładką profilera, jeśli włączona), kończy pomiar
+    klatki i wywołuje frame_hook
+    """
+    if profiler.overlay:
+        profiler.draw_overlay(display_screen_window)
+        profiler.mark('overlay')
+    screen.present()
+    latency = inputs.presented()
+    if latency is not None:
+        profiler.add_latency(latency)
+    profiler.mark('flip')
+    profiler.end_frame()
+    if frame_hook:
+        frame_hook()
 
 
 class ButtonSprite(pygame.sprite.Sprite):
@@ -212,14 +361,11 @@ class ButtonSprite(pygame.sprite.Sprite):
         :type self.center: Tuple[int, int]
         :ivar self.rect: Prostokąt do wyświetlania przycisku
         :type self.rect: pygame.Surface
-        :ivar self.pos: Pozycja krawędzi elementów w formacie (x_min, x_max, y_min, y_max)
-                       x_min         x_max
-                       \\//          \\//
-               y_min -> |-------------|
-                        |             |
-                        |             |
-               y_max -> |-------------|
-        :type self.pos: Tuple[int, int, int, int]
+        :ivar self.hit_rect: Obszar reagujący na myszkę (obrazek w oryginalnym rozmiarze na początkowym miejscu),
+            pod którym przycisk jest w indeksie elementów sceny (ui.WidgetIndex)
+        :type self.hit_rect: pygame.Rect
+        :ivar self.hovered: True gdy kursor jest nad przyciskiem
+        :type self.hovered: bool
     """
 
     def __init__(self, image, center, clicked=False):
@@ -233,34 +379,18 @@ class ButtonSprite(pygame.sprite.Sprite):
         :type clicked: bool
         :ivar self.original_center: Początkowy środek obiektu
         :type self.original_center: Tuple[int, int]
-        :ivar self.on_screen: True jeśli obiekt ma być na ekranie
-        :type self.on_screen: bool
-        :ivar self.disappeared: True jeśli obiekt osiągnął pożądaną pozycję opuszczenia ekranu
-        :type self.disappeared: bool
-        :ivar self.place_to_move: Miejsce do którego ma się przesunąć środek obiektu znikając z ekranu
-        :type self.place_to_move: Tuple[int, int]
-        :ivar self.disappear_speed: Prędkość chowania się elementu
-        :type self.disappear_speed: int
         """
         super().__init__()
         self.original_image = image
         self.image = image
         self.center = center
         self.rect = self.image.get_rect(center=center)
-        """ Obliczenie krawędzie na podstawie środka i rozmiarów obrazka """
-        self.pos = (self.center[0] - self.image.get_width() / 2,
-                    self.center[0] + self.image.get_width() / 2,
-                    self.center[1] - self.image.get_height() / 2,
-                    self.center[1] + self.image.get_height() / 2)
-        self.played = False
+        self.hit_rect = self.image.get_rect(center=center)
+        self.hovered = False
         self.on_click = None
         self.image_clicked = None
         self.clicked = clicked
         self.original_center = center
-        self.on_screen = True
-        self.disappeared = False
-        self.place_to_move = center
-        self.disappear_speed = 10
 
     def enlarge(self, scale_factor=1.1):
         """
@@ -274,12 +404,10 @@ class ButtonSprite(pygame.sprite.Sprite):
             image_to_show = self.image_clicked
         orig_x, orig_y = image_to_show.get_size()
         """ Wymnażanie oryginalnych rozmiarów razy współczynnik """
-        size_x = orig_x * scale_factor
-        size_y = orig_y * scale_factor
-        """ zmiana rozmiarów """
-        self.image = pygame.transform.scale(image_to_show, (size_x, size_y))
-        """ odnowienie prostokąta """
-        self.rect = self.image.get_rect(center=self.rect.center)
+        size_x = int(orig_x * scale_factor)
+        size_y = int(orig_y * scale_factor)
+        """ zmiana rozmiarów, przeskalowany obrazek tworzony jest tylko raz """
+        self.set_image(scaled(image_to_show, (size_x, size_y)))
 
     def reset_image(self):
         """
@@ -288,8 +416,26 @@ class ButtonSprite(pygame.sprite.Sprite):
         image_to_show = self.original_image
         if self.clicked and self.image_clicked:
             image_to_show = self.image_clicked
-        self.image = pygame.transform.scale(image_to_show, image_to_show.get_size())
-        self.rect = self.image.get_rect(center=self.rect.center)
+        self.set_image(image_to_show)
+
+    def set_image(self, image):
+        """
+        :function set_image: Podmienia wyświetlany obrazek i odnawia prostokąt, jeśli obrazek się zmienił
+        :param image: Nowy obrazek
+        :type image: image.pyi
+        """
+        if image is not self.image:
+            self.image = image
+            self.rect = self.image.get_rect(center=self.rect.center)
+
+    def restore(self):
+        """
+        :function restore: Przywraca przycisk na początkowe miejsce na ekranie (po wysunięciu go przez swipe_out)
+        """
+        tweens.cancel(self)
+        self.hovered = False
+        self.reset_image()
+        self.rect = self.image.get_rect(center=self.original_center)
 
     def set_on_click(self, func):
         """
@@ -311,51 +457,61 @@ class ButtonSprite(pygame.sprite.Sprite):
         """
         self.clicked = not self.clicked
 
-    def update(self):
+    def hover(self, on):
+        """
+        :function hover: Wywoływana przez ui.WidgetIndex, gdy kursor wjedzie na przycisk lub z niego zjedzie
+        :param on: True - kursor nad przyciskiem
+        :type on: bool
+        """
+        if on == self.hovered:
+            return
+        self.hovered = on
+        if on:
+            """ Najechany - powiększenie i dźwięk """
+            audio.play("on_hover_sound")
+            self.enlarge()
+        else:
+            self.reset_image()
+
+    def press(self):
         """
-        :function update: Funkcja dziedziczona po pygame.sprite.Sprite, wywoływana co tyknięcie zegara
+        :function press: Wywoływana przez ui.WidgetIndex przy puszczeniu przycisku myszki nad przyciskiem
         """
-        if self.on_screen:
-            if check_if_clicked(pygame.mouse.get_pos(), self.pos):
-                """ Jeśli najechany to powiększ i wydaj dźwięk (jeśli nie został zagrany wcześniej) """
-                if not self.played:
-                    pygame.mixer.Channel(start_click_sound_channel).play(game_sounds["on_hover_sound"])
-                    self.played = True
+        if self.on_click:
+            self.on_click()
+            self.toggle_clicked()
+            """ obrazek po zmianie wciśnięcia """
+            if self.hovered:
                 self.enlarge()
-                if click and self.on_click:
-                    self.on_click()
-                    self.toggle_clicked()
             else:
-                """ W przeciwnym razie oryginalny obrazek i nie zagrano jeszcze dźwięku """
                 self.reset_image()
-                self.played = False
-        else:
-            """ jeśli nie ma być na ekranie """
-            self.disappeared = move_sprite_to([self], self.place_to_move, self.disappear_speed)
 
 
-def swipe_out(sprites):
+def swipe_out(sprites, on_done=None):
     """
-    Funkcja ustawiająca on_screen na False oraz obliczająca pożądane miejsce wysunięcia (do najbliższej krawędzi)
+    Funkcja wysuwająca obiekty z ekranu (do najbliższej krawędzi) w czasie swipe_duration
     :param sprites: Lista Sprite do wysunięcia
+    :param on_done: Funkcja wywoływana, gdy wszystkie obiekty znikną z ekranu
+    :type on_done: Callable
     """
     for sprite in sprites:
-        sprite.on_screen = False
         """ do której krawędzi najbliżej """
         closest_border = min(sprite.rect.centerx, src_width - sprite.rect.centerx, sprite.rect.centery,
                              src_height - sprite.rect.centery)
         if closest_border == sprite.rect.centerx:
             """ najbliżej w lewo """
-            sprite.place_to_move = (-sprite.image.get_width(), sprite.rect.centery)
+            destination = (-sprite.image.get_width(), sprite.rect.centery)
         elif closest_border == src_width - sprite.rect.centerx:
             """ najbliżej w prawo"""
-            sprite.place_to_move = (src_width + sprite.image.get_width(), sprite.rect.centery)
+            destination = (src_width + sprite.image.get_width(), sprite.rect.centery)
         elif closest_border == sprite.rect.centery:
             """ najbliżej w górę """
-            sprite.place_to_move = (sprite.rect.centerx, -sprite.image.get_height())
+            destination = (sprite.rect.centerx, -sprite.image.get_height())
         else:
             """ najbliżej w dół """
-            sprite.place_to_move = (sprite.rect.centerx, src_height + sprite.image.get_height())
+            destination = (sprite.rect.centerx, src_height + sprite.image.get_height())
+        """ wszystkie przejścia trwają tyle samo, więc kończą się w tej samej klatce co ostatnie """
+        tweens.move(sprite, destination, swipe_duration, ease_in_quad, on_done if sprite is sprites[-1] else None)
 
 
 def toggle_music():
@@ -364,19 +520,18 @@ def toggle_music():
     """
     global music_on
     music_on = not music_on
-    if music_on:
-        """ Jeśli zmieniona muzykę na on to zacznij grać muzykę"""
-        pygame.mixer.Channel(start_music_channel).play(game_sounds['start_music'], -1)
-    else:
-        pygame.mixer.Channel(start_music_channel).stop()
+    """ Wyciszona muzyka jest zatrzymywana, a po włączeniu gra od początku """
+    audio.set_muted(MUSIC, not music_on)
 
 
 def toggle_settings_window():
     """
-    :function toggle_settings_window: Funkcja zmieniająca stan zmiennej open_settings
+    :function toggle_settings_window: Funkcja otwierająca lub zamykająca okienko ustawień nad oknem startowym
     """
-    global open_settings
-    open_settings = not open_settings
+    if scenes.top_name == 'settings':
+        scenes.pop()
+    else:
+        scenes.push('settings')
 
 
 def toggle_sounds():
@@ -385,39 +540,24 @@ def toggle_sounds():
     """
     global sounds_on
     sounds_on = not sounds_on
-    if sounds_on:
-        pygame.mixer.Channel(start_click_sound_channel).set_volume(1.0)
-        pygame.mixer.Channel(jumping_sound_channel).set_volume(0.2)
-        pygame.mixer.Channel(point_get_sound_channel).set_volume(0.5)
-        pygame.mixer.Channel(results_sound_channel).set_volume(0.2)
-    else:
-        pygame.mixer.Channel(start_click_sound_channel).set_volume(0.0)
-        pygame.mixer.Channel(jumping_sound_channel).set_volume(0.0)
-        pygame.mixer.Channel(point_get_sound_channel).set_volume(0.0)
-        pygame.mixer.Channel(results_sound_channel).set_volume(0.0)
-
-
-def restart_1_player():
-    global RESTART_1_PLAYER
-    RESTART_1_PLAYER = True
-
+    for group in sound_groups:
+        audio.set_muted(group, not sounds_on)
 
-def return_to_menu():
-    global RETURN_TO_MENU
-    RETURN_TO_MENU = True
 
-
-def check_if_clicked(mouse_pos: Tuple[int, int], bounds: Tuple[int, int, int, int]) -> bool:
+def settings_buttons():
     """
-    :function check_if_clicked: Funkcja sprawdzająca czy współrzędne myszki znajdują się w ramach podanych krawędzi
-    :param mouse_pos: Współrzędne myszki
-    :type mouse_pos: Tuple[int, int]
-    :param bounds: Krawędzie obiektu
-    :type bounds: Tuple[int, int, int, int]
-    :return: True jeśli znajduje się, False w przeciwnym razie
-    :rtype: bool
+    :function settings_buttons: Funkcja tworząca przyciski okienka ustawień
+    :return: Grupa przycisków dźwięków i muzyki
+    :rtype: pygame.sprite.Group
     """
-    return bounds[0] <= mouse_pos[0] <= bounds[1] and bounds[2] <= mouse_pos[1] <= bounds[3]
+    button_sound = ButtonSprite(game_images['settings_button_not_pressed'], settings_button_position_1, sounds_on)
+    button_music = ButtonSprite(game_images['settings_button_not_pressed'], settings_button_position_2, music_on)
+    """ Przypisanie reakcji na nacisniecie """
+    button_music.set_image_clicked(game_images['settings_button_pressed'])
+    button_sound.set_image_clicked(game_images['settings_button_pressed'])
+    button_music.set_on_click(toggle_music)
+    button_sound.set_on_click(toggle_sounds)
+    return pygame.sprite.Group(button_music, button_sound)
 
 
 def settings_window():
@@ -431,203 +571,281 @@ def settings_window():
     display_screen_window.blit(game_images['settings_note'], settings_note_position)
 
 
-def results_window():
+def results_window(highscore_counter, score_counter, best=None):
+    """
+    :function results_window: Funkcja rysująca na ekranie okienko wyników
+    :param highscore_counter: Licznik najlepszego wyniku
+    :type highscore_counter: ScoreRenderer
+    :param score_counter: Licznik wyniku gry
+    :type score_counter: ScoreRenderer
+    :param best: Najlepszy wynik do wyświetlenia (None - rekord z bazy wyników)
+    :type best: int
+    """
     display_screen_window.blit(game_images['results_background'], results_background_position)
-    show_number(highscore_ones_position, highscore_tens_position, highscore_hundreds_position, HIGHSCORE.read()[0])
-    show_number(score_ones_position, score_tens_position, score_hundreds_position, SCORE)
+    highscore_counter.draw(display_screen_window, HIGHSCORE.best() if best is None else best)
+    score_counter.draw(display_screen_window, SCORE)
 
 
-class Numbers(pygame.sprite.Sprite):
+class ScoreRenderer:
     """
-        :class Numbers: Klasa pochodna od klasy Sprite odpowiedzialna za utworzenie spriteów cyfr.
-            :ivar self.number: Wyświetlana cyfra
-            :type self.number: int
-            :ivar self.images: Lista grafik numerów
-            :type self.images: List[image.pyi]
-            :ivar self.image: Aktualna grafika cyfry
+        :class ScoreRenderer: Klasa wyświetlająca liczbę (w domyśle punkty) z obrazków cyfr.
+        Obrazek liczby składany jest tylko przy zmianie wartości, w pozostałych klatkach rysowany jest gotowy obrazek.
+            :ivar self.digits: Lista grafik cyfr od 0 do 9
+            :type self.digits: List[image.pyi]
+            :ivar self.center: Środek wyświetlanej liczby
+            :type self.center: Tuple[int, int]
+            :ivar self.spacing: Odległość pomiędzy środkami kolejnych cyfr
+            :type self.spacing: int
+            :ivar self.value: Liczba, z której złożono self.image (None - jeszcze nie złożono)
+            :type self.value: int
+            :ivar self.image: Złożony obrazek liczby
             :type self.image: image.pyi
-            :ivar self.rect: Prostokąt do wyświetlania cyfry
-            :type self.rect: pygame.Surface
-            :ivar self.center: Przechowuje dane o środku grafiki
-            :type self.center: (int, int)
-
+            :ivar self.rect: Prostokąt do wyświetlania liczby
+            :type self.rect: pygame.Rect
     """
 
-    def __init__(self, center, images):
-        super().__init__()
-        self.number = 0
-        self.images = images
-        self.image = images[self.number]
-        self.rect = self.image.get_rect(center=center)
+    def __init__(self, digits, center, spacing):
+        self.digits = digits
         self.center = center
+        self.spacing = spacing
+        self.value = None
+        self.image = None
+        self.rect = None
+
+    def compose(self, value):
+        """
+        :function compose: Składa obrazek liczby z cyfr, wyśrodkowany na self.center
+        :param value: Liczba do wyświetlenia
+        :type value: int
+        """
+        text = str(value)
+        digit_width = max(digit.get_width() for digit in self.digits)
+        digit_height = max(digit.get_height() for digit in self.digits)
+        width = self.spacing * (len(text) - 1) + digit_width
+        self.image = pygame.Surface((width, digit_height), pygame.SRCALPHA)
+        for i, char in enumerate(text):
+            """ każda cyfra wyśrodkowana na swoim miejscu """
+            digit = self.digits[int(char)]
+            self.image.blit(digit, digit.get_rect(center=(digit_width / 2 + i * self.spacing, digit_height / 2)))
+        self.rect = self.image.get_rect(center=self.center)
+        self.value = value
+
+    def draw(self, surface, value):
+        """
+        :function draw: Rysuje liczbę, składając obrazek tylko jeśli zmieniła się wartość
+        :param surface: Powierzchnia, na której rysujemy
+        :type surface: pygame.Surface
+        :param value: Liczba do wyświetlenia
+        :type value: int
+        """
+        if value != self.value:
+            self.compose(value)
+        surface.blit(self.image, self.rect)
 
 
-class ScoreCounterONES(Numbers):
+class DirtyScreen:
     """
-        :class ScoreCounterONES: Klasa pochodna od klasy Numbers,
-        odpowiadzialna za wyświetlanie cyfr jedności wyniku.
+    :class DirtyScreen: Wyświetlanie tylko zmienionych prostokątów ekranu. Bez zapamiętanej warstwy każda klatka
+    rysowana jest i wyświetlana w całości. Po capture() ekran jest zapamiętywany jako nieruchome tło, a w kolejnych
+    klatkach begin() odnawia z niego tylko prostokąty narysowane w poprzedniej klatce i na ekran wysyłane są tylko
+    one (pygame.display.update zamiast pygame.display.flip).
+        :ivar self.layer: Nazwa zapamiętanej warstwy (None - brak, klatki wyświetlane w całości)
+        :type self.layer: string
+        :ivar self.static: Kopia ekranu z nieruchomą częścią obrazu
+        :type self.static: pygame.Surface
+        :ivar self.drawn: Prostokąty narysowane w tej klatce na nieruchomym tle
+        :type self.drawn: List[pygame.Rect]
+        :ivar self.rects: Prostokąty do wysłania na ekran w tej klatce
+        :type self.rects: List[pygame.Rect]
+        :ivar self.full: True jeśli ta klatka ma być wyświetlona w całości
+        :type self.full: bool
     """
 
-    def __init__(self, center, images):
-        super().__init__(center, images)
+    def __init__(self):
+        self.layer = None
+        self.static = None
+        self.drawn = []
+        self.previous = []
+        self.rects = []
+        self.full = True
+
+    def release(self):
+        """
+        :function release: Porzuca zapamiętaną warstwę, następne klatki będą wyświetlane w całości
+        """
+        self.layer = None
+        self.full = True
+        self.drawn = []
+        self.previous = []
+        self.rects = []
+
+    def capture(self, layer, surface):
+        """
+        :function capture: Zapamiętuje aktualny obraz jako nieruchome tło; wszystko rysowane później w tej
+        i następnych klatkach musi zostać zgłoszone przez add()
+        :param layer: Nazwa warstwy (np. ekranu, do którego należy)
+        :type layer: string
+        :param surface: Ekran
+        :type surface: pygame.Surface
+        """
+        if self.static is None or self.static.get_size() != surface.get_size():
+            self.static = surface.copy()
+        else:
+            self.static.blit(surface, (0, 0))
+        self.layer = layer
+        self.full = True
+
+    def begin(self, surface):
+        """
+        :function begin: Odnawia z nieruchomego tła prostokąty narysowane w poprzedniej klatce
+        :param surface: Ekran
+        :type surface: pygame.Surface
+        """
+        for rect in self.previous:
+            surface.blit(self.static, rect, rect)
+        self.rects.extend(self.previous)
+
+    def add(self, rect):
+        """
+        :function add: Zgłasza prostokąt narysowany w tej klatce
+        :param rect: Prostokąt
+        :type rect: pygame.Rect
+        """
+        rect = pygame.Rect(rect)
+        self.drawn.append(rect)
+        self.rects.append(rect)
+
+    def collides(self, rect):
+        """
+        :function collides: Sprawdza czy prostokąt zachodzi na któryś ze zmienionych w tej klatce
+        :rtype: bool
+        """
+        return rect.collidelist(self.rects) != -1
 
-    def update(self, score):
+    def present(self):
         """
-            :function update: Funkcja dziedziczona po pygame.sprite.Sprite, wywoływana co tyknięcie zegara,
-            odpowiedzialna za wydobywanie cyfry jedności ze zmiennej SCORE
+        :function present: Wysyła klatkę na ekran: całą, albo tylko zmienione prostokąty
         """
-        if score < 10:
-            self.rect = self.image.get_rect(center=(self.center[0] - 38, self.center[1]))
-        if 10 <= score < 100:
-            self.rect = self.image.get_rect(center=(self.center[0] - 19, self.center[1]))
-        if 100 <= score < 1000:
-            self.rect = self.image.get_rect(center=self.center)
-        self.number = score % 10
-        self.image = self.images[self.number]
-        self.rect = self.image.get_rect(center=self.rect.center)
+        if self.full or self.layer is None:
+            pygame.display.flip()
+        elif self.rects:
+            pygame.display.update(self.rects)
+        self.previous = self.drawn
+        self.drawn = []
+        self.rects = []
+        self.full = False
 
 
-class ScoreCounterTENS(Numbers):
+""" screen : DirtyScreen
+        Prostokąty ekranu zmienione w klatce, wyświetlane bez odświeżania całego ekranu gdy tło stoi w miejscu
+"""
+screen = DirtyScreen()
+
+
+class RotatedFrame:
     """
-        :class ScoreCounterTENS: Klasa pochodna od klasy Numbers,
-        odpowiadzialna za wyświetlanie cyfr dziesiątek wyniku.
+    :class RotatedFrame: Obrócona klatka animacji (kolizje liczone są z kształtów klatek bez obrotu, zob. collision)
+        :ivar self.image: Obrócony obrazek
+        :type self.image: image.pyi
+        :ivar self.ghost: Półprzezroczysta kopia obrazka (trzmiel przeciwnika), tworzona przy pierwszym użyciu
+        :type self.ghost: image.pyi
     """
 
-    def __init__(self, center, images):
-        super().__init__(center, images)
+    __slots__ = ('image', 'ghost')
 
-    def update(self, score):
+    def __init__(self, image):
+        self.image = image
+        self.ghost = None
+
+    def translucent(self, alpha):
         """
-            :function update: Funkcja dziedziczona po pygame.sprite.Sprite, wywoływana co tyknięcie zegara,
-            odpowiedzialna za wydobywanie cyfry dziesiątek ze zmiennej SCORE
+        :function translucent: Zwraca półprzezroczystą kopię obrazka, tworząc ją tylko za pierwszym razem
+        :param alpha: Nieprzezroczystość kopii (0 - 255)
+        :type alpha: int
+        :rtype: image.pyi
         """
-        if 10 <= score < 100:
-            self.rect = self.image.get_rect(center=(self.center[0] - 19, self.center[1]))
-            ones = score % 10
-            self.number = int((score - ones) / 10)
-            self.image = self.images[self.number]
-            self.rect = self.image.get_rect(center=self.rect.center)
-        if 100 <= score < 1000:
-            self.rect = self.image.get_rect(center=self.center)
-            ones = score % 10
-            self.number = int(((score - ones) % 100) / 10)
-            self.image = self.images[self.number]
-            self.rect = self.image.get_rect(center=self.rect.center)
+        if self.ghost is None:
+            self.ghost = self.image.copy()
+            self.ghost.set_alpha(alpha)
+        return self.ghost
 
 
-class ScoreCounterHUNDREDS(Numbers):
+class RotationCache:
     """
-        :class ScoreCounterHUNDREDS: Klasa pochodna od klasy Numbers,
-        odpowiadzialna za wyświetlanie cyfr setek wyniku.
+    :class RotationCache: Pamięć obróconych klatek animacji, kluczowana numerem klatki i przedziałem kąta.
+    Klatki bez obrotu tworzone są od razu, pozostałe przy pierwszym użyciu, a po przekroczeniu max_size
+    usuwana jest najdawniej używana.
+        :ivar self.images: Oryginalne klatki animacji
+        :type self.images: List[image.pyi]
+        :ivar self.angle_step: Szerokość przedziału kąta w stopniach
+        :type self.angle_step: int
+        :ivar self.max_size: Największa ilość przechowywanych obróconych klatek
+        :type self.max_size: int
     """
 
-    def __init__(self, center, images):
-        super().__init__(center, images)
+    def __init__(self, images, angle_step=5, max_size=128):
+        self.images = images
+        self.angle_step = angle_step
+        self.max_size = max_size
+        self.upright = [RotatedFrame(image) for image in images]
+        self.frames = OrderedDict()
 
-    def update(self, score):
+    def get(self, index, angle):
         """
-            :function update: Funkcja dziedziczona po pygame.sprite.Sprite, wywoływana co tyknięcie zegara,
-            odpowiedzialna za wydobywanie cyfry setek ze zmiennej SCORE
+        :function get: Zwraca klatkę obróconą o kąt zaokrąglony do przedziału
+        :param index: Numer klatki animacji
+        :type index: int
+        :param angle: Kąt obrotu w stopniach
+        :type angle: float
+        :rtype: RotatedFrame
         """
-        if 100 <= score < 1000:
-            ones = score % 10
-            tens = int(((score - ones) % 100) / 10)
-            self.number = int((score - ((tens * 10) + ones)) / 100)
-            self.image = self.images[self.number]
-            self.rect = self.image.get_rect(center=self.rect.center)
+        bucket = round(angle / self.angle_step) % (360 // self.angle_step)
+        if bucket == 0:
+            return self.upright[index]
+        key = (index, bucket)
+        frame = self.frames.get(key)
+        if frame is None:
+            frame = RotatedFrame(pygame.transform.rotate(self.images[index], bucket * self.angle_step))
+            self.frames[key] = frame
+            if len(self.frames) > self.max_size:
+                self.frames.popitem(last=False)
+        else:
+            self.frames.move_to_end(key)
+        return frame
 
 
 class TrzmielSprite(pygame.sprite.Sprite):
     """
-        :class TrzmielSprite: Klasa odpowiedzialna za utworzenie i animacje trzmiela.
-            :ivar self.original_images: Oryginalne obrazki przekazane przy wywołaniu
-            :type self.original_images: List[image.pyi]
+        :class TrzmielSprite: Klasa odpowiedzialna za wyświetlanie trzmiela na podstawie jego stanu z symulacji (Bee).
+            :ivar self.rotations: Obrócone klatki animacji
+            :type self.rotations: RotationCache
+            :ivar self.frame: Aktualna klatka z pamięci obróconych klatek
+            :type self.frame: RotatedFrame
             :ivar self.image: Aktualny obrazek
             :type self.image: image.pyi
             :ivar self.rect: Prostokąt do wyświetlania obrazka
             :type self.rect: pygame.Surface
-            :ivar self.mode: Kierunek zmiany wielkości (powiększanie[+] , zmniejszanie [-])
-            :type self.mode: int
-            :ivar self.grow: Parametr unoszenia co klatkę
-            :type self.grow: int
-            :ivar self.y_move: odległość uniesienia
-            :type self.y_move: int
-            :ivar self.y_velocity: prędkość w pionie
-            :type self.y_velocity: int
         """
 
-    def __init__(self, center, images):
+    def __init__(self, center, rotations):
         super().__init__()
-        self.original_images = images
-        self.images = images
-        self.current_index = 0
-        self.image = images[self.current_index]
+        self.rotations = rotations
+        self.frame = rotations.get(0, 0)
+        self.image = self.frame.image
         self.rect = self.image.get_rect(center=center)
-        self.grow = 0
-        self.mode = 1
-        self.y_move = 5
-        self.y_velocity = 0
-        self.if_jumped = False
-        self.rotation = 0
-        self.collision = False
-        self.stop = False
 
-    def gravitation_pull(self):
+    def show(self, bee, alpha):
         """
-        function gravitational_pull: funckja odpowiedzialna za grawitację - ściąganie trzmiela w dół
+        :function show: Ustawia klatkę animacji, obrót i położenie pomiędzy dwoma ostatnimi krokami symulacji
+        :param bee: Stan trzmiela
+        :type bee: simulation.Bee
+        :param alpha: Ułamek kroku, który upłynął od ostatniego kroku symulacji
+        :type alpha: float
         """
-        self.y_velocity += 1.5
-
-    def change_image(self):
-        """
-        :function change_image: Funkcja zmieniająca obrazek na następny w liście, dodatkowo obracająca go
-        """
-        if not self.stop:
-            self.current_index = (self.current_index + 1) % len(self.images)
-            self.image = pygame.transform.rotate(self.images[self.current_index], self.rotation)
-            self.rect = self.image.get_rect(center=self.rect.center)
-
-    def update(self, keys, move=False):
-        """
-            Funkcja wywoływana co tick zegara, ruch trzmiela góra dół (po osiągnięciu odpowiedniej szybkości zwalniamy)
-            oraz możłiwość skoku trzmiela jeśli został odpalony tryb jednoosobowy,
-            o zadaną wartość jeśli minęły 3 klatki od ostatniego skoku
-        """
-        self.change_image()
-        if not move:
-            if self.collision:
-                if self.rect.centery < src_height - self.image.get_height() / 3:
-                    """ animacja kolizji """
-                    self.rotation += 10
-                    self.gravitation_pull()
-                    center = self.rect.center
-                    self.rect = self.image.get_rect(center=(center[0], center[1] + self.y_velocity))
-                else:
-                    self.stop = True
-                    global open_results
-                    open_results = True
-            else:
-                """ animacja latania góra dół na oknie startowym i w oczekiwaniu na start """
-                if self.grow > self.y_move:
-                    self.mode = -1
-                if self.grow < -self.y_move:
-                    self.mode = 1
-                    """ ^^^ sprawdzanie czy powiększenie osiągneło skalowana wartość """
-                self.grow += 1 * self.mode
-                center = self.rect.center
-                self.rect = self.image.get_rect(center=(center[0], center[1] + self.grow))
-        else:
-            """ sprawdzenie czy nastąpił skok """
-            if (keys[pygame.K_SPACE] or keys[pygame.K_UP]) and not self.if_jumped:
-                self.y_velocity = 0
-                self.y_velocity -= 15
-                pygame.mixer.Channel(jumping_sound_channel).play(game_sounds["jumping_sound"])
-                self.if_jumped = True
-            elif not (keys[pygame.K_SPACE] or keys[pygame.K_UP]):
-                self.if_jumped = False
-            self.gravitation_pull()
-            center = self.rect.center
-            self.rect = self.image.get_rect(center=(center[0], center[1] + self.y_velocity))
+        y = bee.previous_y + (bee.y - bee.previous_y) * alpha
+        self.frame = self.rotations.get(bee.frame, bee.rotation)
+        self.image = self.frame.image
+        self.rect = self.image.get_rect(center=(self.rect.centerx, round(y)))
 
 
 class AnimateSprite(pygame.sprite.Sprite):
@@ -641,20 +859,16 @@ class AnimateSprite(pygame.sprite.Sprite):
         :type self.rect: pygame.Surface
         :ivar self.mode: Kierunek zmiany wielkości (powiększanie[+] , zmniejszanie [-])
         :type self.image: int
-        :ivar self.grow: Parametr zwiększania co klatkę
+        :ivar self.grow: Parametr zwiększania co krok pulsowania (pulse_step)
         :type self.grow: int
+        :ivar self.pulse_acc: Czas, który upłynął od ostatniego kroku pulsowania
+        :type self.pulse_acc: float
         :ivar self.scale: Skala powiększenia
         :type self.scale: int
+        :ivar self.frames: Klatki pulsowania dla kolejnych wartości self.grow
+        :type self.frames: List[image.pyi]
         :ivar self.original_center: Początkowy środek obiektu
         :type self.original_center: Tuple[int, int]
-        :ivar self.on_screen: True jeśli obiekt ma być na ekranie
-        :type self.on_screen: bool
-        :ivar self.disappeared: True jeśli obiekt osiągnął pożądaną pozycję opuszczenia ekranu
-        :type self.disappeared: bool
-        :ivar self.place_to_move: Miejsce do którego ma się przesunąć środek obiektu znikając z ekranu
-        :type self.place_to_move: Tuple[int, int]
-        :ivar self.disappear_speed: Prędkość chowania się elementu
-        :type self.disappear_speed: int
     """
 
     def __init__(self, center, image, scale):
@@ -664,528 +878,1161 @@ class AnimateSprite(pygame.sprite.Sprite):
         self.rect = self.image.get_rect(center=center)
         self.mode = 1
         self.grow = 0
+        self.pulse_acc = 0.0
         self.scale = scale
+        self.frames = pulse_frames(image, scale)
         self.original_center = center
-        self.on_screen = True
-        self.disappeared = False
-        self.place_to_move = center
-        self.disappear_speed = 10
-
-    def update(self):
-        """ Function update: Funkcja odpowiedzzialna za powiększanie lub zmneijszanie obrazku co skok zegara """
-        if self.on_screen:
-            """ jeśli ma być na ekranie """
-            if self.grow > self.scale:
-                self.mode = -1
-            if self.grow < 1:
-                self.mode = 1
-                """ ^^^ sprawdzanie czy powiększenie osiągneło skalowana wartość """
-            self.grow += 1 * self.mode
-
-            orig_x, orig_y = self.original_image.get_size()
-            size_x = orig_x + round(self.grow)
-            size_y = orig_y + (round(self.grow) * 0.5)
-            """ Mechanizm powiększania poprzez dodawanie wartości do rozmiarów obrazka """
-            self.image = pygame.transform.scale(self.original_image, (size_x, size_y))
+
+    def restore(self):
+        """
+        :function restore: Przywraca obiekt na początkowe miejsce na ekranie (po wysunięciu go przez swipe_out)
+        """
+        tweens.cancel(self)
+        self.rect = self.image.get_rect(center=self.original_center)
+
+    def update(self, elapsed):
+        """ Function update: Funkcja odpowiedzzialna za powiększanie lub zmneijszanie obrazku co pulse_step ms """
+        if self not in tweens:
+            """ pulsuje, jeśli nie jest wysuwany z ekranu """
+            self.pulse_acc += elapsed
+            while self.pulse_acc >= pulse_step:
+                self.pulse_acc -= pulse_step
+                if self.grow > self.scale:
+                    self.mode = -1
+                if self.grow < 1:
+                    self.mode = 1
+                    """ ^^^ sprawdzanie czy powiększenie osiągneło skalowana wartość """
+                self.grow += 1 * self.mode
+
+            """ Gotowa klatka dla aktualnego powiększenia """
+            self.image = self.frames[self.grow]
             self.rect = self.image.get_rect(center=self.rect.center)
-        else:
-            """ jeśli nie ma być na ekranie """
-            self.disappeared = move_sprite_to([self], self.place_to_move, self.disappear_speed)
 
 
-def move_sprite_to(sprite, destination, speed):
+class BackgroundLayer:
     """
-    :function move_sprite_to: Funkcja przesuwająca stopniowo Sprite do miejsca docelowego
-    :param sprite: Obiekt do przesuwania
-    :param destination: Miejsce docelowe
-    :param speed: Prędkość (dotyczy mniejszej wartości)
-    :return: True jeśli jest już na miejscu
+    :class BackgroundLayer: Pojedyncza warstwa przewijanego tła
+        :ivar self.image: Obrazek warstwy
+        :type self.image: image.pyi
+        :ivar self.parallax: Mnożnik prędkości warstwy względem prędkości tła (paralaksa)
+        :type self.parallax: float
+        :ivar self.period: Szerokość, po której obrazek się powtarza
+        :type self.period: int
+        :ivar self.position_y: Pozycja y górnej krawędzi warstwy
+        :type self.position_y: int
+        :ivar self.offset: Aktualne przesunięcie warstwy w zakresie [0, period)
+        :type self.offset: float
     """
 
-    """ Pobierz środek i oblicz odległości do pokonania """
-    center = sprite[0].rect.center
-    to_travel = (destination[0] - center[0], destination[1] - center[1])
-    if to_travel != (0, 0):
-        """ Jeśli nie jest na odpowiednim miejscu to przesun w odpowiedni sposob"""
-        if to_travel[0] == 0:
-            if speed < abs(to_travel[1]):
-                movement = [0, speed * to_travel[1] / abs(to_travel[1])]
-            else:
-                movement = to_travel
-        elif to_travel[1] == 0:
-            if speed < abs(to_travel[0]):
-                movement = [speed * to_travel[0] / abs(to_travel[0]), 0]
-            else:
-                movement = to_travel
-        else:
-            closer = min(to_travel)
-            speed_x = (speed if speed < abs(to_travel[0]) else to_travel[0])
-            speed_y = (speed if speed < abs(to_travel[1]) else to_travel[1])
-            movement = [speed_x * to_travel[0] / abs(closer), speed_y * to_travel[1] / abs(closer)]
-        """ Przypisz środek po przesunięciu """
-        sprite[0].rect = sprite[0].image.get_rect(center=(center[0] + movement[0], center[1] + movement[1]))
-        return False
-    else:
-        return True
-
-
-"""Funkcja służąca do wyświetlania liczby (w domyśle punktów)
-    Przyjmuje pozycje cyfr jedności, dziesiątek, setek, w zależności od potrzeb
-    oraz zmienną którą ma wyświetlać, gdzie
-    ones_position -> (int,int)
-    tens_position -> (int,int)
-    hundrets_position -> (int, int)
-    score -> int
-    """
-
-
-def show_number(ones_position, tens_position, hundreds_position, score):
-    """ Utworzenie liczników """
-    ones = ScoreCounterONES(ones_position, game_images['numbers'])
-    tens = ScoreCounterTENS(tens_position, game_images['numbers'])
-    hundreds = ScoreCounterHUNDREDS(hundreds_position, game_images['numbers'])
-    group_ones = pygame.sprite.Group(ones)
-    group_tens = pygame.sprite.Group(tens)
-    group_hundreds = pygame.sprite.Group(hundreds)
-    if score > 999:
-        score = 0
-    group_ones.update(score)
-    group_ones.draw(display_screen_window)
-    if score > 9:
-        group_tens.update(score)
-        group_tens.draw(display_screen_window)
-    if score > 99:
-        group_hundreds.update(score)
-        group_hundreds.draw(display_screen_window)
-
-
-def start_1_player_mode(**info):
-    """
-    :function start_1_player_mode:
-    :param info: Słownik argumentów potrzebnych przy rozpoczynaniu gry jednoosobowej
-        'acc' : wartość acc animacji tła
-        'main_screeen_motion' : wartość przesunięcia tła
-        'trzmiel' : TrzmielSprite
-    :return:
+    def __init__(self, image, parallax=1.0, period=None, position_y=0):
+        self.image = image
+        self.parallax = parallax
+        self.period = period if period else image.get_width()
+        self.position_y = position_y
+        self.offset = 0.0
+
+    def advance(self, distance):
+        """
+        :function advance: Przesuwa warstwę o podaną odległość (w pikselach tła) z zawinięciem do okresu
+        :param distance: Odległość przesunięcia bez uwzględnienia paralaksy
+        :type distance: float
+        """
+        self.offset = (self.offset + distance * self.parallax) % self.period
+
+    def draw(self, surface):
+        """
+        :function draw: Rysuje widoczny fragment warstwy, co najwyżej dwoma wywołaniami blit
+        :param surface: Powierzchnia, na której rysujemy
+        :type surface: pygame.Surface
+        """
+        x = int(self.offset)
+        width = surface.get_width()
+        height = self.image.get_height()
+        """ Fragment od przesunięcia do końca obrazka, a jeśli nie wystarczy to początek obrazka za nim """
+        first = min(width, self.image.get_width() - x)
+        surface.blit(self.image, (0, self.position_y), (x, 0, first, height))
+        if first < width:
+            surface.blit(self.image, (first, self.position_y), (0, 0, width - first, height))
+
+
+class ScrollingBackground:
+    """
+    :class ScrollingBackground: Tło przewijane w pętli, przesuwane na podstawie upływu czasu w jednym kroku
+        :ivar self.layers: Warstwy tła rysowane w kolejności dodania
+        :type self.layers: List[BackgroundLayer]
+        :ivar self.speed: Prędkość przewijania w pikselach na milisekundę
+        :type self.speed: float
     """
 
-    """ to się tyczy przygotowania (zanikanie okna startowego) """
-    global start_disappear
-    start_disappear = True
-    if one_player_mode:
-        """ Tu już się zaczyna konkretny kod dla gry jednoosobowej"""
-
-        """ Poniżej tworze 4 obiekty klasy obstacle, odległe od siebie o 400 px pojawiające się za ekranem
-        obiekty te są dodawane do grupy także można je wszystkie wywoływać i wpływać na nie za pomocą pojedynczych poleceń
-        """
-        obstacle_group = pygame.sprite.Group()
-        for obst in range(3):
-            new_obst = Obstacle([1000 + obst * 400, random.randrange(80, 520)], "images/game/rura.png")
-            obstacle_group.add(new_obst)
-
-        """ move_trzmiel przybiera wartość True kiedy ma zacząć się ruszać """
-        move_trzmiel = False
-        """ start_game przybiera wartość True gdy rozpoczęto grę"""
-        start_game = False
-
-        if not info['trzmiel']:
-            info['trzmiel'] = TrzmielSprite(start_trzmiel_position, game_images['trzmiel'])
-        """ grupa trzmiela """
-        trzmiel_group = pygame.sprite.Group(info['trzmiel'])
-
-        """ Przyciski """
-        button_return = ButtonSprite(game_images['results_return'], results_return_position)
-        button_return.set_on_click(return_to_menu)
-        button_restart = ButtonSprite(game_images['results_restart'], results_restart_position)
-        button_restart.set_on_click(restart_1_player)
-        buttons_group = pygame.sprite.Group(button_restart, button_return)
-        played_results_sound = False
-        while True:
-            global SCORE, click
-            """ naciśnięte klawisze """
-            keys = pygame.key.get_pressed()
-            if not move_trzmiel and not info['trzmiel'].collision and (keys[K_SPACE] or keys[K_UP]):
-                """ rozpocznij ruch trzmiela po naciśnięciu spacji """
-                move_trzmiel = True
-                start_game = True
-            click = False
-            for event in pygame.event.get():
-                """ sprawdzanie czy nie użytkownik nie chce wyjść lub czy nie nacisnął myszki """
-                if event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == MOUSEBUTTONUP:
-                    click = True
-            """ Animacja tła oraz umiejscowienie tytułu """
-            info['acc'] += time_clock.tick(FPS)
-            while info['acc'] >= 1:
-                info['acc'] -= 1
-                if not info['trzmiel'].collision:
-                    info['main_screen_motion'] += 0.1
-                    if info['main_screen_motion'] >= 3202.0:
-                        info['main_screen_motion'] = 0
-                display_screen_window.blit(game_images['start_background'], (-info['main_screen_motion'], 0))
-            """ Rysowanie rur """
-            if start_game:
-                obstacle_group.draw(display_screen_window)
-            if move_trzmiel:
-                obstacle_group.update()
-                """sprawdzanie czy gracz zdobył punkt"""
-                for el in obstacle_group:
-                    pointget(el, info['trzmiel'])
-            """ Trzmiel """
-            trzmiel_group.update(keys, move_trzmiel)
-            trzmiel_group.draw(display_screen_window)
-            """ sprawdzanie wyniku oraz odpowienie wyświetlanie """
-            display_screen_window.blit(game_images['counter_background'], counter_background_positions)
-            show_number(counter_ones_position, counter_tens_position, counter_hundreds_position, SCORE)
-
-            if open_results:
-                if not played_results_sound:
-                    pygame.mixer.Channel(results_sound_channel).play(game_sounds["results_sound"])
-                    played_results_sound = True
-                    HIGHSCORE.update(SCORE)
-                results_window()
-                buttons_group.update()
-                buttons_group.draw(display_screen_window)
-                if keys[K_UP] or keys[K_SPACE]:
-                    restart_1_player()
-
-            """Kolizja"""
-            obstacle = pygame.sprite.spritecollideany(info['trzmiel'], obstacle_group, check_collision)
-            if obstacle:
-                if move_trzmiel:
-                    pygame.mixer.Channel(jumping_sound_channel).play(game_sounds["hit_sound"])
-                move_trzmiel = False
-                info['trzmiel'].collision = True
-
-            """ Uaktualnienie widoku """
-            pygame.display.flip()
-            time_clock.tick(FPS)
+    def __init__(self, image, speed=0.1, period=None):
+        self.layers = [BackgroundLayer(image, period=period)]
+        self.speed = speed
 
-            if RESTART_1_PLAYER or RETURN_TO_MENU:
-                return acc, main_screen_motion
+    @property
+    def main_screen_motion(self):
+        """ Przesunięcie warstwy głównej """
+        return self.layers[0].offset
 
+    def add_layer(self, image, parallax=1.0, period=None, position_y=0):
+        """
+        :function add_layer: Dodaje warstwę paralaksy rysowaną nad dotychczasowymi
+        :param image: Obrazek warstwy
+        :param parallax: Mnożnik prędkości warstwy
+        :param period: Szerokość powtarzania obrazka (domyślnie szerokość obrazka)
+        :param position_y: Pozycja y górnej krawędzi warstwy
+        :return: Utworzona warstwa
+        :rtype: BackgroundLayer
+        """
+        layer = BackgroundLayer(image, parallax, period, position_y)
+        self.layers.append(layer)
+        return layer
 
-"""Funkcja sprawdzająca kolizje trzmiela z przeszkodami
-funckja w celu sprawdzania kolizji wykorzystuje środek trzmiela, z tego względu granice mają postać taką a nie inną ;)
-"""
+    def update(self, elapsed):
+        """
+        :function update: Przesuwa wszystkie warstwy o drogę przebytą w podanym czasie
+        :param elapsed: Czas od poprzedniej klatki w milisekundach
+        :type elapsed: int
+        """
+        distance = elapsed * self.speed
+        for layer in self.layers:
+            layer.advance(distance)
 
+    def draw(self, surface):
+        """
+        :function draw: Rysuje wszystkie warstwy
+        :param surface: Powierzchnia, na której rysujemy
+        :type surface: pygame.Surface
+        """
+        for layer in self.layers:
+            layer.draw(surface)
 
-def check_collision(trzmiel, obstacle):
-    obstacle_borders = (
-        obstacle.rect.centerx - obstacle.image.get_width() / 2, obstacle.rect.centerx + obstacle.image.get_width() / 2)
-    return (obstacle_borders[0] < trzmiel.rect.centerx + trzmiel.image.get_width() / 2) and (
-                trzmiel.rect.centerx - trzmiel.image.get_width() / 2 < obstacle_borders[1]) and abs(
-        trzmiel.rect.center[1] - obstacle.rect.center[1]) > gap / 2
 
+class Scene:
+    """
+    :class Scene: Ekran gry na stosie scen (SceneManager). Obiekty sceny (przyciski, liczniki, przeszkody) tworzone
+    są raz w create(), najpóźniej przy pierwszym wejściu, i zostają na czas działania programu, a enter() tylko
+    przywraca ich stan początkowy - dzięki temu ponowne wejście do sceny (np. restart gry) trwa kilka milisekund.
+        :ivar self.manager: Stos scen, do którego należy scena
+        :type self.manager: SceneManager
+        :ivar self.name: Nazwa sceny w stosie
+        :type self.name: string
+        :ivar self.overlay: True jeśli scena rysowana jest na scenie pod nią, która dalej się animuje,
+            ale nie reaguje na myszkę
+        :type self.overlay: bool
+        :ivar self.warm: True gdy obiekty sceny są już utworzone
+        :type self.warm: bool
+        :ivar self.widgets: Elementy sceny reagujące na myszkę, gdy scena jest na szczycie stosu
+        :type self.widgets: ui.WidgetIndex
+    """
 
-class Obstacle(pygame.sprite.Sprite):
-    """Klasa odpowiedzialna za pojawianie się na ekranie i animację przeszkody
-        oprócz tego pojawia niewidzialny próg na środku przeszkody, którego przekroczenie ma powodować zdobycie punktu
-        (zaimplementowane w funkcji pointget)"""
+    overlay = False
 
-    def __init__(self, pos, picture_path):
-        super().__init__()
-        self.pos = pos
-        self.image = pygame.transform.scale(pygame.image.load(picture_path), (100, 1150))
-        self.rect = self.image.get_rect(center=self.pos)
-        """threshold to rectangle służący do sprawdzania czy gracz zdobył punkt
-        po wyśrodkowaniu grafiki poniżej wartość (self.pos[0],self.pos[1]-53) nalezy zastąpić
-        poprostu self.pos i analogicznie w update center"""
-        self.threshold = pygame.Rect(self.pos, (1, self.image.get_height())).move(0, -self.image.get_height() / 2)
-
-    """funkcja update powoduje pomniejszenie położenia x przeszkody o 5 pikseli zgodnie z zegarem"""
-
-    def update(self):
-        center = self.rect.center
-        self.rect = self.image.get_rect(center=(center[0] - 5, center[1]))
-        self.threshold = pygame.Rect(center, (1, self.image.get_height())).move(0, -self.image.get_height() / 2)
-        """poniższy if zapewnia przenoszenie przeszkód spowrotem na początek po osiągnięciu odległości -200 x"""
-        if center[0] == -200:
-            """ reset położenia x-owego przeszkody musi sie odbywać za pomocą wartości liczbowej, ponieważ przywrócenie
-             oryginalnej wartości powoduje konflikty ze sposobem tworzenia grupy obiektów"""
-            self.rect = self.image.get_rect(center=(1000, random.randrange(80, 520)))
+    def __init__(self, manager, name):
+        self.manager = manager
+        self.name = name
+        self.warm = False
+        self.widgets = WidgetIndex()
 
+    def prewarm(self):
+        """
+        :function prewarm: Tworzy obiekty sceny (tylko za pierwszym razem)
+        """
+        if not self.warm:
+            self.create()
+            self.warm = True
 
-"""
-    funkcja pointget przyjmuje:
-     obst : Obstacle - przeszkoda, w której znajduje sie pole threshold
-     trzmiel : TrzmielSprite - grywalny ptak lotny
-     SCORE - globalna zmienna przechowująca liczbę puntków gracza
-     pointget_acc - akumulator globalny
-
-     Okazuje się że trzmiel koliduje z threshold dokładnie 24 razy przy przelocie przez jedną przeszkodę,
-     w związku z tym funkcja liczy do 24 za pomocą funkcji pointget, aby następnie powiększyć SCORE o 1
-"""
+    def create(self):
+        """
+        :function create: Wczytuje zasoby sceny i tworzy jej obiekty
+        """
 
+    def enter(self, **info):
+        """
+        :function enter: Przygotowuje scenę do wyświetlenia, przywracając stan początkowy jej obiektów
+        :param info: Argumenty przekazane przy przejściu do sceny
+        """
 
-def pointget(obst, trzmiel: TrzmielSprite):
-    global SCORE
-    global pointget_acc
-    if obst.threshold.colliderect(trzmiel):
-        pointget_acc += 1
-        if pointget_acc >= 12:
-            SCORE += 1
-            pointget_acc = 0
-            pygame.mixer.Channel(point_get_sound_channel).play(game_sounds["point_get_sound"])
+    def leave(self):
+        """
+        :function leave: Wywoływana przy zdjęciu sceny ze stosu
+        """
 
+    def poll(self):
+        """
+        :function poll: Wywoływana dla sceny na szczycie stosu po obsłużeniu zdarzeń, przed czekaniem na zegar
+        """
 
-"""Klasa umożliwiająca zapisywanie i wyświetlanie 10 najlepszych wyników"""
+    def frame(self, elapsed, covered):
+        """
+        :function frame: Przesuwa i rysuje jedną klatkę sceny
+        :param elapsed: Czas od poprzedniej klatki w milisekundach
+        :type elapsed: int
+        :param covered: True jeśli nad sceną jest nakładka (scena nie reaguje wtedy na myszkę)
+        :type covered: bool
+        """
 
 
-class Highscores_list:
+class SceneManager:
     """
-    :class Highscores_list: Klasa nadpisująca i wyświetlająca 10 najlepszych wyników
-    :ivar self.best_ten: Lista przechowująca 10 najlepszych wyników
-    :type self.best_ten: List[integer]
+    :class SceneManager: Stos scen i główna pętla gry. Rysowana jest scena na szczycie stosu razem ze scenami pod
+    nią aż do pierwszej, która nie jest nakładką. Zmiany stosu zlecone w trakcie klatki (push, pop, switch)
+    wykonywane są po wyświetleniu klatki.
+        :ivar self.background: Przewijane tło wspólne dla scen
+        :type self.background: ScrollingBackground
+        :ivar self.scenes: Sceny po nazwie
+        :type self.scenes: Dict[string, Scene]
+        :ivar self.stack: Stos aktywnych scen (ostatnia na wierzchu)
+        :type self.stack: List[Scene]
+        :ivar self.changes: Zlecone zmiany stosu
+        :type self.changes: List[Tuple[Callable, tuple]]
+        :ivar self.warming: Sceny do przygotowania w kolejnych klatkach, po jednej na klatkę
+        :type self.warming: deque[Scene]
     """
 
-    def __init__(self, game_highscores):
-        with open(game_highscores, 'r') as f:
-            self.best_ten = []
-            for i, line in enumerate(f):
-                if i in range(10):
-                    if line != 0:
-                        self.best_ten.append(int(line.strip()))
-            f.close()
+    def __init__(self, background):
+        self.background = background
+        self.scenes = {}
+        self.stack = []
+        self.changes = []
+        self.warming = deque()
 
-    def update(self, new_score):
+    def add(self, name, scene_class):
         """
-        :function update: Sprawdza czy nowy wynik nie jest wyższy od któregoś z najlepszych i jeśli tak to go wpisuje
-        :param new_score: Nowy osiągnięty wynik
-        :type new_score: integer
+        :function add: Tworzy scenę (bez jej obiektów - te powstają w Scene.create)
+        :param name: Nazwa sceny
+        :param scene_class: Klasa sceny
+        :rtype: Scene
         """
-        if len(self.best_ten) == 0:
-            self.best_ten.append(new_score)
+        scene = self.scenes[name] = scene_class(self, name)
+        return scene
 
-        for i, elem in enumerate(self.best_ten):
-            if new_score > elem:
-                lower_scores = self.best_ten[i:8]
-                self.best_ten[i] = new_score
-                self.best_ten += lower_scores
-                break
+    @property
+    def top(self):
+        """ Scena na szczycie stosu (None - pusty stos) """
+        return self.stack[-1] if self.stack else None
 
-        with open(game_highscores, 'w') as f:
-            f.truncate(0)
-            for i in self.best_ten:
-                f.write(str(i))
-                f.write("\n")
+    @property
+    def top_name(self):
+        """ Nazwa sceny na szczycie stosu (None - pusty stos) """
+        return self.stack[-1].name if self.stack else None
 
-    def read(self):
+    def push(self, name, **info):
         """
-        :function read: Odczyt 10 najlepszych wyników
+        :function push: Kładzie scenę na stos po zakończeniu klatki
         """
-        return self.best_ten
+        self.changes.append((self.enter, (name, info)))
 
+    def pop(self):
+        """
+        :function pop: Zdejmuje scenę ze szczytu stosu po zakończeniu klatki
+        """
+        self.changes.append((self.leave, ()))
 
-def inactive():
-    global inactive_bool
-    inactive_bool = True
+    def switch(self, name, **info):
+        """
+        :function switch: Zastępuje cały stos jedną sceną po zakończeniu klatki
+        """
+        self.changes.append((self.leave_all, ()))
+        self.changes.append((self.enter, (name, info)))
 
+    def prewarm(self, *names):
+        """
+        :function prewarm: Zleca utworzenie obiektów scen w kolejnych klatkach (np. gry w trakcie wysuwania menu)
+        """
+        self.warming.extend(self.scenes[name] for name in names)
 
-def start_window():
-    """
-    :function start_window: Funkcja odpowiedzialna za działanie okna startowego
-    all_sprites : List[pygame.sprite.Sprite]
-        Tablica przechowywująca wszystkie interaktywne elementy ekranu startowego które mają zniknąć
-    button_* : ButtonSprite
-        Zmienne przechowujące przyciski jako obiekty ButtonSprite (domyślnie powiększające się przy najechaniu)
-    buttons_* : pygame.sprite.Group
-        Grupa przycisków w celu łatwego wywołanie update() na wszystkich
-    """
-    all_sprites = []
-    button_1_player = ButtonSprite(game_images['start_button_1_player'], start_button_1_player_position)
-    button_2_player = ButtonSprite(game_images['start_button_2_player'], start_button_2_player_position)
-    button_settings = ButtonSprite(game_images['start_button_settings'], start_button_settings_position)
-    all_sprites.extend([button_1_player, button_2_player, button_settings])
-    button_sound = ButtonSprite(game_images['settings_button_not_pressed'], settings_button_position_1, sounds_on)
-    button_music = ButtonSprite(game_images['settings_button_not_pressed'], settings_button_position_2, music_on)
-    """ Przypisanie reakcji na nacisniecie """
-    button_settings.set_on_click(toggle_settings_window)
-    button_music.set_image_clicked(game_images['settings_button_pressed'])
-    button_sound.set_image_clicked(game_images['settings_button_pressed'])
-    button_music.set_on_click(toggle_music)
-    button_sound.set_on_click(toggle_sounds)
-    button_1_player.set_on_click(start_1_player_mode)
-    button_2_player.set_on_click(inactive)
-
-    """ Utworzenie trzmiela """
-    trzmiel = TrzmielSprite(start_trzmiel_position, game_images['trzmiel'])
-    trzmiel_group = pygame.sprite.Group(trzmiel)
-
-    """ Utworzenie animacji tytułu """
-    title_animation = AnimateSprite(animation_title_position,
-                                    pygame.image.load(start_title_image), 40)
-    quote_animation = AnimateSprite(quote_positions, game_images['quote'], 40)
-    quote_group = pygame.sprite.Group(quote_animation)
-    all_sprites.append(title_animation)
-    all_sprites.append(quote_animation)
-
-    buttons = pygame.sprite.Group(button_1_player, button_2_player, title_animation)
-    group_button_settings = pygame.sprite.Group(button_settings)
-    buttons_settings = pygame.sprite.Group(button_music, button_sound)
-    """ akumulator wykorzystywany w animacji tła, oraz zmienna wyrażająca szybkość poruszania się tła"""
-    acc = 0.0
-    main_screen_motion = 1
-    """ akumulator wykorzystywany przy wyświetlaniu nieaktywnego przycisku"""
-    inactive_acc = 0
-    while True:
-        """ Dla każdego eventu, jeśli krzyżyk lub ESC to wyjście z gry"""
-        global click, start_disappear, SCORE, one_player_mode, inactive_bool
-        keys = pygame.key.get_pressed()
-        click = False
-        for event in pygame.event.get():
+    def enter(self, name, info):
+        scene = self.scenes[name]
+        self.stack.append(scene)
+        scene.enter(**info)
+
+    def leave(self):
+        self.stack.pop().leave()
+
+    def leave_all(self):
+        while self.stack:
+            self.leave()
+
+    def apply(self):
+        """
+        :function apply: Wykonuje zlecone zmiany stosu (także te zlecone przez enter nowej sceny)
+        """
+        while self.changes:
+            change, args = self.changes.pop(0)
+            change(*args)
+
+    def frame(self):
+        """
+        :function frame: Jedna klatka: zdarzenia, przygotowanie zleconej sceny, czekanie na zegar, klatki widocznych
+        scen od najniższej, wyświetlenie i zmiany stosu. Zdarzenia myszki z całej klatki trafiają naraz do elementów
+        sceny na szczycie stosu.
+        """
+        top = self.top
+        mouse_events = []
+        for event in inputs.collect():
+            track_input(event)
             if event.type == QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
-                quotes.close()
                 pygame.quit()
                 sys.exit()
-            elif event.type == MOUSEBUTTONUP:
-                click = True
-        """ Animacja tła oraz umiejscowienie tytułu """
-        acc += time_clock.tick(FPS)
-        while acc >= 1:
-            acc -= 1
-            main_screen_motion += 0.1
-            if main_screen_motion >= 3202.0:
-                main_screen_motion = 0
-            display_screen_window.blit(game_images['start_background'], (-main_screen_motion, 0))
-        """ update() przyciski oraz wyrysowanie ich na ekran """
-        group_button_settings.update()
-        group_button_settings.draw(display_screen_window)
-        quote_group.update()
-        quote_group.draw(display_screen_window)
-        buttons.draw(display_screen_window)
-        trzmiel_group.update(keys)
-        trzmiel_group.draw(display_screen_window)
-        if start_disappear:
-            swipe_out(all_sprites)
-            start_disappear = False
-        if open_settings:
-            """ jeśli okienko ma być otwarte narysuj je i załącz przyciski od ustawień """
-            settings_window()
-            buttons_settings.update()
-            buttons_settings.draw(display_screen_window)
+            elif event.type in (MOUSEMOTION, MOUSEBUTTONUP):
+                mouse_events.append(event)
+        if mouse_events:
+            top.widgets.dispatch(mouse_events)
+        profiler.mark('events')
+        top.poll()
+        if self.warming:
+            self.warming.popleft().prewarm()
+        profiler.mark('assets')
+        if FPS:
+            """ zdarzenia z czasu czekania odbierane są w chwili nadejścia, zegar dopełnia ostatnią milisekundę """
+            inputs.wait(inputs.frame_time + 1000 / FPS - 1)
+        elapsed = time_clock.tick(FPS)
+        inputs.start_frame()
+        profiler.mark('wait')
+        if tweens:
+            tweens.update(elapsed)
+            profiler.mark('ui')
+        bottom = len(self.stack) - 1
+        while bottom > 0 and self.stack[bottom].overlay:
+            bottom -= 1
+        for scene in self.stack[bottom:]:
+            scene.frame(elapsed, scene is not top)
+        present_frame()
+        self.apply()
+        if self.top is not top:
+            self.hand_over(top)
+
+    def hand_over(self, previous):
+        """
+        :function hand_over: Przekazuje kursor nowej scenie na szczycie stosu. Element obecny w obu scenach
+        (przycisk ustawień pod okienkiem ustawień) zostaje podświetlony bez ponownego hover.
+        :param previous: Scena, która była na szczycie stosu
+        :type previous: Scene
+        """
+        hovered = None
+        if self.top is not None:
+            self.top.widgets.move(mouse_position)
+            hovered = self.top.widgets.hovered
+        previous.widgets.leave(keep=hovered)
+
+    def run(self, name, **info):
+        """
+        :function run: Zaczyna od podanej sceny i wyświetla klatki, dopóki stos nie jest pusty
+        """
+        self.switch(name, **info)
+        self.apply()
+        while self.stack:
+            self.frame()
+
+
+def build_scenes(background):
+    """
+    :function build_scenes: Tworzy stos scen gry i zapisuje go w scenes
+    :param background: Przewijane tło
+    :type background: ScrollingBackground
+    :rtype: SceneManager
+    """
+    global scenes
+    scenes = SceneManager(background)
+    scenes.add('start', StartScene)
+    scenes.add('settings', SettingsScene)
+    scenes.add('game', GameScene)
+    scenes.add('race', RaceScene)
+    scenes.add('results', ResultsScene)
+    return scenes
+
+
+class GameScene(Scene):
+    """
+    :class GameScene: Gra jednoosobowa. Cała rozgrywka toczy się w World, a scena jedynie ją rysuje i odtwarza
+    dźwięki; po zakończeniu gry kładzie na stos okno wyników
+        :ivar self.world: Stan gry, ta sama symulacja używana ponownie w kolejnych grach
+        :type self.world: simulation.World
+        :ivar self.obstacle_sprites: Przeszkody do rysowania z puli, po jednej na każdą przeszkodę w symulacji
+        :type self.obstacle_sprites: List[Obstacle]
+        :ivar self.timestep: Podział czasu klatek na kroki symulacji
+        :type self.timestep: FixedTimestep
+    """
+
+    def create(self):
+        game_images.preload('game')
+        game_sounds.preload('game')
+        self.world = None
+        self.obstacle_sprites = []
+        self.trzmiel = TrzmielSprite(start_trzmiel_position, game_images['trzmiel_rotations'])
+        self.trzmiel_group = pygame.sprite.Group(self.trzmiel)
+        self.counter = ScoreRenderer(game_images['numbers'], counter_position, counter_digit_spacing)
+        self.counter.compose(0)
+        self.hud_rect = game_images['counter_background'].get_rect(topleft=counter_background_positions)
+        self.timestep = FixedTimestep()
+
+    def enter(self, world=None):
+        """
+        :function enter: Zaczyna grę
+        :param world: Gra do kontynuowania (np. z okna startowego), None - nowa gra
+        :type world: simulation.World
+        """
+        self.prewarm()
+        self.world = world if world is not None else new_world(self.world)
+        self.obstacle_sprites = pooled_obstacles(len(self.world.obstacles))
+        self.timestep.accumulator = 0.0
+        """ naciśnięcia sprzed wejścia do gry (np. w menu) nie są skokami """
+        inputs.jump.skip()
+        screen.release()
+
+    def frame(self, elapsed, covered):
+        global SCORE
+        world = self.world
+        """ Kroki symulacji za czas, który upłynął od poprzedniej klatki; każdy krok bierze stan skoku
+        z własnej chwili (symulacja jest za zegarem o czas pozostały w akumulatorze) """
+        self.timestep.advance(elapsed)
+        tick_time = inputs.frame_time - self.timestep.accumulator
+        while self.timestep.step():
+            tick_time += self.timestep.tick_time
+            jump = inputs.jump.sample(tick_time) and not covered
+            for event in step_world(world, jump):
+                if event == JUMP:
+                    audio.play("jumping_sound")
+                    if replay_player is None:
+                        inputs.jumped()
+                elif event == POINT:
+                    audio.play("point_get_sound")
+                elif event == HIT:
+                    audio.play("hit_sound")
+                elif event == LANDED:
+                    """ wynik zapisywany w tle, razem z torem i powtórką (odtwarzane powtórki pomijamy) """
+                    replay_name = finish_recording(world.score)
+                    if replay_player is None:
+                        HIGHSCORE.add(world.score, world.seed, world.difficulty, world.tick, replay_name)
+        SCORE = world.score
+        if world.landed and not covered:
+            self.manager.push('results', restart='game')
+        profiler.mark('simulation')
+        """ Po kolizji tło i rury stoją w miejscu, więc rysowane są raz i zapamiętywane, a w kolejnych klatkach
+        odnawiane są tylko prostokąty, które się zmieniły (trzmiel, licznik, przyciski okna wyników).
+        Przy włączonej nakładce profilera klatki zawsze rysowane są w całości. """
+        layer = None
+        if world.bee.collision and not profiler.overlay:
+            layer = 'results' if covered else 'falling'
+        if layer != screen.layer:
+            screen.release()
+        redraw = screen.layer is None
+        if redraw:
+            """ Animacja tła """
+            if not world.bee.collision:
+                self.manager.background.update(elapsed)
+            self.manager.background.draw(display_screen_window)
+            profiler.mark('background')
+            """ Rysowanie rur i trzmiela w położeniu pomiędzy krokami symulacji """
+            for sprite, obstacle in zip(self.obstacle_sprites, world.obstacles):
+                sprite.show(obstacle, self.timestep.alpha)
+                sprite.draw(display_screen_window)
+            if layer == 'falling':
+                screen.capture(layer, display_screen_window)
+            profiler.mark('obstacles')
         else:
-            buttons.update()
-
-        """ Sprawdzam czy wszystkie obrazki wysunięte """
-        end_start = True
-        for sprite in all_sprites:
-            end_start = end_start and sprite.disappeared
-        """ Jeśli wszystkie zniknęły to mamy tryb jednoosobowy """
-        if end_start:
-            one_player_mode = True
-            return acc, main_screen_motion, trzmiel
-
-        """Nieaktywny przycisk"""
-        if inactive_bool and inactive_acc < 40:
-            display_screen_window.blit(game_images['inactive_button'], pygame.mouse.get_pos())
-            inactive_acc += 1
+            screen.begin(display_screen_window)
+            profiler.mark('background')
+        if screen.layer != 'results':
+            self.trzmiel.show(world.bee, self.timestep.alpha)
+            self.trzmiel_group.draw(display_screen_window)
+            screen.add(self.trzmiel.rect)
+            profiler.mark('bee')
+            """ sprawdzanie wyniku oraz odpowienie wyświetlanie (licznik jest nad trzmielem) """
+            if redraw or screen.collides(self.hud_rect):
+                display_screen_window.blit(game_images['counter_background'], counter_background_positions)
+                self.counter.draw(display_screen_window, SCORE)
+                screen.add(self.hud_rect)
+                screen.add(self.counter.rect)
+            profiler.mark('hud')
+
+
+class RaceScene(Scene):
+    """
+    :class RaceScene: Wyścig dwuosobowy przez sieć (zob. network). Symulację prowadzi serwer, własny trzmiel jest
+    przewidywany lokalnie, a przeciwnik rysowany półprzezroczyście z migawek serwera
+        :ivar self.session: Trwający wyścig (None - brak połączenia)
+        :type self.session: network.RaceSession
+        :ivar self.racing: True od pierwszej klatki po starcie wyścigu
+        :type self.racing: bool
+    """
+
+    def create(self):
+        game_images.preload('game')
+        game_sounds.preload('game')
+        self.session = None
+        self.obstacle_sprites = None
+        self.trzmiel = TrzmielSprite(start_trzmiel_position, game_images['trzmiel_rotations'])
+        self.trzmiel_group = pygame.sprite.Group(self.trzmiel)
+        self.opponent = TrzmielSprite(start_trzmiel_position, game_images['trzmiel_rotations'])
+        self.counter = ScoreRenderer(game_images['numbers'], counter_position, counter_digit_spacing)
+        self.opponent_counter = ScoreRenderer(game_images['numbers'], opponent_counter_position,
+                                              counter_digit_spacing)
+        self.timestep = FixedTimestep()
+
+    def enter(self):
+        """
+        :function enter: Łączy z serwerem i czeka na start wyścigu; bez połączenia wraca do okna startowego
+        """
+        self.prewarm()
+        """ gra z okna startowego nie jest potrzebna, więc jej nagranie jest porzucane """
+        finish_recording(SCORE)
+        self.session = connect_race()
+        if self.session is None:
+            self.manager.switch('start')
+            return
+        self.timestep.accumulator = 0.0
+        self.racing = False
+        self.finished = False
+        screen.release()
+
+    def leave(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def poll(self):
+        if self.session is not None:
+            self.session.poll()
+
+    def frame(self, elapsed, covered):
+        global SCORE
+        session = self.session
+        if session is None:
+            return
+        world = session.world
+        if session.running and not session.closed:
+            if not self.racing:
+                """ pierwsza klatka wyścigu - czas przed startem nie jest symulowany """
+                self.racing = True
+                elapsed = (time.perf_counter() - session.start_at) * 1000
+                inputs.jump.skip()
+            """ klient przyspiesza lub zwalnia o kilka procent, żeby jego skoki docierały na serwer na czas """
+            time_scale = session.time_scale()
+            self.timestep.advance(elapsed * time_scale)
+            tick_time = inputs.frame_time - self.timestep.accumulator / time_scale
+            while self.timestep.step():
+                tick_time += self.timestep.tick_time / time_scale
+                jump = inputs.jump.sample(tick_time) and not covered
+                for event in session.step(jump):
+                    if event == JUMP:
+                        audio.play("jumping_sound")
+                        inputs.jumped()
+                    elif event == POINT:
+                        audio.play("point_get_sound")
+                    elif event == HIT:
+                        audio.play("hit_sound")
+            world = session.world
+        SCORE = world.score if world else 0
+        scores = session.result or session.scores
+        if not self.finished and (session.result is not None or session.closed):
+            self.finished = True
+            if session.result is not None:
+                HIGHSCORE.add(session.result[session.player], world.seed, world.difficulty, world.tick, race=True)
+            self.manager.push('results', restart='race', best=max(scores, default=0), verdict=race_verdict(session),
+                              static=False)
+        profiler.mark('simulation')
+
+        if world is None or not world.bee.collision:
+            self.manager.background.update(elapsed)
+        self.manager.background.draw(display_screen_window)
+        profiler.mark('background')
+        if world is None:
+            draw_status("Czekanie na drugiego gracza...")
+            return
+        if self.obstacle_sprites is None:
+            self.obstacle_sprites = pooled_obstacles(len(world.obstacles))
+        for sprite, obstacle in zip(self.obstacle_sprites, world.obstacles):
+            sprite.show(obstacle, self.timestep.alpha)
+            sprite.draw(display_screen_window)
+        profiler.mark('obstacles')
+        for bee in session.opponents.values():
+            self.opponent.show(bee, session.opponent_alpha)
+            display_screen_window.blit(self.opponent.frame.translucent(opponent_alpha), self.opponent.rect)
+        self.trzmiel.show(world.bee, self.timestep.alpha)
+        self.trzmiel_group.draw(display_screen_window)
+        profiler.mark('bee')
+        display_screen_window.blit(game_images['counter_background'], counter_background_positions)
+        self.counter.draw(display_screen_window, SCORE)
+        """ licznik przeciwnika tylko, gdy ktoś się z nami ściga (serwer może prowadzić wyścig jednoosobowy) """
+        opponent_score = max((score for i, score in enumerate(scores) if i != session.player), default=None)
+        if opponent_score is not None:
+            display_screen_window.blit(game_images['counter_background'], opponent_counter_background_position)
+            self.opponent_counter.draw(display_screen_window, opponent_score)
+        if not session.running:
+            draw_status("Start!")
+        profiler.mark('hud')
+
+
+class ResultsScene(Scene):
+    """
+    :class ResultsScene: Okno wyników rysowane nad zakończoną grą lub wyścigiem
+        :ivar self.restart: Nazwa sceny uruchamianej przyciskiem restartu lub skokiem
+        :type self.restart: string
+        :ivar self.best: Najlepszy wynik do wyświetlenia (None - rekord z bazy wyników)
+        :type self.best: int
+        :ivar self.verdict: Napis z wynikiem wyścigu (None - brak)
+        :type self.verdict: string
+        :ivar self.static: True jeśli gra pod oknem stoi w miejscu i okno może zostać zapamiętane w warstwie ekranu
+        :type self.static: bool
+    """
+
+    overlay = True
+
+    def create(self):
+        game_images.preload('results')
+        game_sounds.preload('results')
+        self.button_return = ButtonSprite(game_images['results_return'], results_return_position)
+        self.button_return.set_on_click(lambda: self.manager.switch('start'))
+        self.button_restart = ButtonSprite(game_images['results_restart'], results_restart_position)
+        self.button_restart.set_on_click(self.restart_game)
+        self.buttons_group = pygame.sprite.Group(self.button_restart, self.button_return)
+        self.widgets.add(self.button_return)
+        self.widgets.add(self.button_restart)
+        self.highscore_counter = ScoreRenderer(game_images['numbers'], highscore_position, results_digit_spacing)
+        self.score_counter = ScoreRenderer(game_images['numbers'], score_position, results_digit_spacing)
+
+    def enter(self, restart='game', best=None, verdict=None, static=True):
+        self.prewarm()
+        self.restart = restart
+        self.best = best
+        self.verdict = verdict
+        self.static = static
+        self.restarting = False
+        audio.play("results_sound")
+
+    def restart_game(self):
+        """
+        :function restart_game: Zaczyna od nowa grę spod okna wyników
+        """
+        if not self.restarting:
+            self.restarting = True
+            self.manager.switch(self.restart)
+
+    def frame(self, elapsed, covered):
+        if screen.layer != 'results':
+            results_window(self.highscore_counter, self.score_counter, self.best)
+            if self.verdict:
+                draw_status(self.verdict, race_result_position)
+            if self.static and not profiler.overlay:
+                screen.capture('results', display_screen_window)
+        self.buttons_group.draw(display_screen_window)
+        for button in self.buttons_group:
+            screen.add(button.rect)
+        if jump_pressed():
+            self.restart_game()
+        profiler.mark('results')
+
+
+def connect_race():
+    """
+    :function connect_race: Łączy z serwerem wyścigów race_host:race_port. Gdy na tym komputerze serwer nie działa,
+    uruchamia wbudowany (w wątku w tle), do którego drugi gracz dołącza opcją --join
+    :return: Sesja wyścigu (None jeśli nie udało się połączyć)
+    :rtype: network.RaceSession
+    """
+    global race_server
+    try:
+        return RaceSession(RaceClient(race_host, race_port))
+    except OSError as error:
+        if race_host not in ('localhost', '127.0.0.1') or race_server is not None:
+            print(f"Couldn't connect to race server {race_host}:{race_port}: {error}")
+            return None
+    try:
+        race_server = serve_in_background(port=race_port, seed=course_seed, difficulty=course_difficulty)
+        return RaceSession(RaceClient(race_host, race_port))
+    except OSError as error:
+        print(f"Couldn't start race server on port {race_port}: {error}")
+        return None
+
+
+def race_verdict(session):
+    """
+    :function race_verdict: Napis z wynikiem wyścigu dla gracza
+    :param session: Zakończony wyścig
+    :type session: network.RaceSession
+    :rtype: string
+    """
+    if session.result is None:
+        return "Rozłączono z serwerem"
+    own = session.result[session.player]
+    best = max((score for i, score in enumerate(session.result) if i != session.player), default=None)
+    if best is None:
+        """ wyścig bez przeciwnika (np. serwer sesji) - tylko własny wynik """
+        return f"Wynik: {own}"
+    if own > best:
+        return "Wygrana!"
+    return "Remis" if own == best else "Przegrana"
+
+
+def draw_status(text, position=status_position):
+    """
+    :function draw_status: Rysuje napis wyśrodkowany na position, tworząc jego obrazek tylko przy pierwszym użyciu
+    :param text: Napis
+    :type text: string
+    :param position: Środek napisu
+    :type position: Tuple[int, int]
+    """
+    global status_font
+    image = status_images.get(text)
+    if image is None:
+        if status_font is None:
+            status_font = pygame.font.Font(None, 48)
+        image = status_images[text] = status_font.render(text, True, quote_color)
+    display_screen_window.blit(image, image.get_rect(center=position))
+
+
+def new_world(world=None):
+    """
+    :function new_world: Zaczyna nową grę z torem według course_seed i course_difficulty i jej nagrywanie,
+    albo grę z powtórki czekającej w replay_source
+    :param world: Symulacja poprzedniej gry, przywracana do stanu początkowego zamiast tworzenia nowej (None - brak)
+    :type world: simulation.World
+    :rtype: simulation.World
+    """
+    global replay_source, replay_player, replay_recorder, SCORE
+    finish_recording(SCORE)
+    SCORE = 0
+    if replay_source is not None:
+        world = replay_source.new_world()
+        replay_player = replay_source.inputs()
+        replay_source = None
+        return world
+    replay_player = None
+    if world is None:
+        world = World(course_seed, difficulty=course_difficulty)
+    else:
+        world.reset(course_seed, difficulty=course_difficulty)
+    if record_replays:
+        os.makedirs(replays_directory, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{world.seed}.trzr"
+        replay_recorder = ReplayWriter.for_world(os.path.join(replays_directory, name), world)
+    return world
+
+
+def finish_recording(score):
+    """
+    :function finish_recording: Kończy nagrywanie gry; gry, w których trzmiel nie wystartował, nie są zapisywane
+    :param score: Wynik gry
+    :type score: int
+    :return: Nazwa pliku zapisanej powtórki (None jeśli nie zapisano)
+    :rtype: string
+    """
+    global replay_recorder
+    recorder, replay_recorder = replay_recorder, None
+    if recorder is None:
+        return None
+    if not recorder.jumps:
+        recorder.discard()
+        return None
+    recorder.close(score)
+    return os.path.basename(recorder.path)
+
+
+def step_world(world, jump=False):
+    """
+    :function step_world: Wykonuje krok symulacji ze skokiem gracza albo z odtwarzanej powtórki i nagrywa go
+    :param world: Stan gry
+    :type world: simulation.World
+    :param jump: True jeśli przycisk skoku jest wciśnięty
+    :type jump: bool
+    :return: Zdarzenia kroku
+    :rtype: List[str]
+    """
+    if replay_player is not None:
+        jump = next(replay_player, False)
+    if replay_recorder is not None:
+        replay_recorder.record(jump)
+    return world.step(jump)
+
+
+def pooled_obstacles(count):
+    """
+    :function pooled_obstacles: Zwraca count przeszkód do rysowania z puli, tworząc brakujące
+    (tylko gdy tor potrzebuje więcej przeszkód niż dotychczasowe)
+    :param count: Ilość przeszkód
+    :type count: int
+    :rtype: List[Obstacle]
+    """
+    while len(obstacle_pool) < count:
+        obstacle_pool.append(Obstacle(game_images['obstacle']))
+    return obstacle_pool[:count]
+
+
+class Obstacle:
+    """
+    :class Obstacle: Klasa odpowiedzialna za wyświetlanie przeszkody na podstawie jej stanu z symulacji
+    (ObstacleState). Górna i dolna część obrazka rysowane są osobno, rozsunięte zależnie od wielkości przerwy,
+    tak jak przy sprawdzaniu kolizji (collision.split_gap).
+        :ivar self.upper: Górna część obrazka (nad przerwą)
+        :type self.upper: pygame.Surface
+        :ivar self.lower: Dolna część obrazka (pod przerwą)
+        :type self.lower: pygame.Surface
+    """
+
+    def __init__(self, image):
+        width, height = image.get_size()
+        """ obrazek dzielony jest w połowie przerwy, żeby części zachowały wygładzone krawędzie """
+        self.split = (obstacle_shape.parts[0][1] + obstacle_shape.parts[1][0] + 1) // 2
+        self.upper = image.subsurface((0, 0, width, self.split))
+        self.lower = image.subsurface((0, self.split, width, height - self.split))
+        self.upper_rect = self.upper.get_rect()
+        self.lower_rect = self.lower.get_rect()
+        """ odległość górnej krawędzi obrazka od środka przerwy """
+        self.top = height // 2
+
+    def show(self, obstacle, alpha):
+        """
+        :function show: Ustawia prostokąt przeszkody pomiędzy dwoma ostatnimi krokami symulacji
+        :param obstacle: Stan przeszkody
+        :type obstacle: simulation.ObstacleState
+        :param alpha: Ułamek kroku, który upłynął od ostatniego kroku symulacji
+        :type alpha: float
+        """
+        x = round(obstacle.previous_x + (obstacle.x - obstacle.previous_x) * alpha)
+        up, down = split_gap(obstacle.gap)
+        top = obstacle.y - self.top
+        self.upper_rect.centerx = self.lower_rect.centerx = x
+        self.upper_rect.top = top - up
+        self.lower_rect.top = top + self.split + down
+
+    def draw(self, surface):
+        """
+        :function draw: Rysuje obie części przeszkody
+        :param surface: Powierzchnia, na której rysujemy
+        :type surface: pygame.Surface
+        """
+        surface.blit(self.upper, self.upper_rect)
+        surface.blit(self.lower, self.lower_rect)
+
+
+class StartScene(Scene):
+    """
+    :class StartScene: Okno startowe. Po wybraniu gry przyciski i napisy wysuwają się z ekranu, a w tym czasie
+    przygotowywana jest następna scena (i okno wyników)
+        :ivar self.all_sprites: Wszystkie interaktywne elementy ekranu startowego, które mają zniknąć
+        :type self.all_sprites: List[pygame.sprite.Sprite]
+        :ivar self.button_*: Przyciski (domyślnie powiększające się przy najechaniu)
+        :type self.button_*: ButtonSprite
+        :ivar self.buttons: Grupa przycisków w celu łatwego wywołanie update() na wszystkich
+        :type self.buttons: pygame.sprite.Group
+        :ivar self.world: Gra, w której unosi się trzmiel, kontynuowana w grze jednoosobowej
+        :type self.world: simulation.World
+        :ivar self.next_scene: Scena wybrana przyciskiem, uruchamiana po wysunięciu okna (None - brak)
+        :type self.next_scene: string
+    """
+
+    def create(self):
+        self.button_1_player = ButtonSprite(game_images['start_button_1_player'], start_button_1_player_position)
+        self.button_2_player = ButtonSprite(game_images['start_button_2_player'], start_button_2_player_position)
+        self.button_settings = ButtonSprite(game_images['start_button_settings'], start_button_settings_position)
+        """ Przypisanie reakcji na nacisniecie """
+        self.button_settings.set_on_click(toggle_settings_window)
+        self.button_1_player.set_on_click(lambda: self.choose('game'))
+        self.button_2_player.set_on_click(lambda: self.choose('race'))
+
+        """ Trzmiel unoszący się w symulacji gry, która zacznie się po zniknięciu okna startowego """
+        self.world = None
+        self.trzmiel = TrzmielSprite(start_trzmiel_position, game_images['trzmiel_rotations'])
+        self.trzmiel_group = pygame.sprite.Group(self.trzmiel)
+
+        """ Utworzenie animacji tytułu """
+        self.title_animation = AnimateSprite(animation_title_position, game_images['start_title'], 40)
+        self.quote_animation = AnimateSprite(quote_positions, game_images['quote'], 40)
+        self.quote_group = pygame.sprite.Group(self.quote_animation)
+        self.all_sprites = [self.button_1_player, self.button_2_player, self.button_settings, self.title_animation,
+                            self.quote_animation]
+
+        self.buttons = pygame.sprite.Group(self.button_1_player, self.button_2_player, self.title_animation)
+        self.group_button_settings = pygame.sprite.Group(self.button_settings)
+        self.timestep = FixedTimestep()
+
+    def enter(self):
+        self.prewarm()
+        for sprite in self.all_sprites:
+            sprite.restore()
+        self.widgets.clear()
+        for button in (self.button_1_player, self.button_2_player, self.button_settings):
+            self.widgets.add(button)
+        self.world = new_world(self.world)
+        self.next_scene = None
+        self.timestep.accumulator = 0.0
+        """ tło menu przewija się cały czas, więc klatki wyświetlane są w całości """
+        screen.release()
+
+    def choose(self, name):
+        """
+        :function choose: Wysuwa okno startowe, po czym uruchamia wybraną scenę
+        :param name: Nazwa sceny ('game' albo 'race')
+        :type name: string
+        """
+        if self.next_scene is None:
+            self.next_scene = name
+            """ wysuwające się przyciski nie reagują już na myszkę """
+            self.widgets.clear()
+            swipe_out(self.all_sprites, self.swiped_out)
+            self.manager.prewarm(name, 'results')
+
+    def swiped_out(self):
+        """
+        :function swiped_out: Po wysunięciu okna startowego uruchamia tryb jednoosobowy albo wyścig
+        """
+        if self.next_scene == 'game':
+            self.manager.switch('game', world=self.world)
         else:
-            inactive_bool = False
-            inactive_acc = 0
+            self.manager.switch(self.next_scene)
+        self.next_scene = None
 
-        """ Uaktualnienie widoku """
-        pygame.display.flip()
-        time_clock.tick(FPS)
+    def poll(self):
+        """ Dokończenie wczytywania zasobów gry odczytanych w tle """
+        game_images.pump()
+        game_sounds.pump()
+
+    def frame(self, elapsed, covered):
+        """ Animacja tła oraz umiejscowienie tytułu """
+        self.manager.background.update(elapsed)
+        self.manager.background.draw(display_screen_window)
+        profiler.mark('background')
+        """ wyrysowanie przycisków na ekran """
+        self.group_button_settings.draw(display_screen_window)
+        self.quote_group.update(elapsed)
+        self.quote_group.draw(display_screen_window)
+        self.buttons.draw(display_screen_window)
+        profiler.mark('ui')
+        self.timestep.advance(elapsed)
+        while self.timestep.step():
+            step_world(self.world)
+        profiler.mark('simulation')
+        self.trzmiel.show(self.world.bee, self.timestep.alpha)
+        self.trzmiel_group.draw(display_screen_window)
+        profiler.mark('bee')
+        """ pod okienkiem ustawień tytuł i przyciski gry stoją w miejscu """
+        if not covered:
+            self.buttons.update(elapsed)
+        profiler.mark('ui')
+
+
+class SettingsScene(Scene):
+    """
+    :class SettingsScene: Okienko ustawień dźwięku i muzyki nad oknem startowym
+    """
+
+    overlay = True
+
+    def create(self):
+        game_images.preload('settings')
+        self.buttons = settings_buttons()
+        for button in self.buttons:
+            self.widgets.add(button)
+
+    def enter(self):
+        self.prewarm()
+        """ przycisk ustawień z okna startowego zamyka okienko """
+        self.widgets.add(self.manager.scenes['start'].button_settings)
+
+    def frame(self, elapsed, covered):
+        settings_window()
+        self.buttons.draw(display_screen_window)
+        profiler.mark('ui')
+
+
+def render_quote():
+    """
+    :function render_quote: Losuje cytat z pliku i tworzy z niego obrazek. Wyszukiwanie czcionki systemowej
+    jest powolne, dlatego funkcja wywoływana jest w tle przez game_images.prefetch
+    :return: Obrazek cytatu (bez konwersji do formatu ekranu)
+    :rtype: pygame.Surface
+    """
+    with open(quotes_file, encoding="utf-8") as quotes:
+        trzmiel_quotes_table = [quote for quote in quotes.read().split('\n') if quote]
+    quote_text = random.choice(trzmiel_quotes_table)
+    font = pygame.font.SysFont(quote_font, 20)
+    font.set_bold(False)
+    font.set_italic(True)
+    return font.render(quote_text, False, quote_color)
+
+
+class StartupTimer:
+    """
+    :class StartupTimer: Zapisuje czasy kolejnych etapów uruchamiania gry
+        :ivar self.start: Czas rozpoczęcia (time.perf_counter)
+        :type self.start: float
+        :ivar self.stages: Nazwy etapów i czasy ich zakończenia w ms od rozpoczęcia
+        :type self.stages: List[Tuple[string, float]]
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages = []
+
+    def mark(self, stage):
+        """
+        :function mark: Zapisuje zakończenie etapu
+        :param stage: Nazwa etapu
+        :type stage: string
+        """
+        self.stages.append((stage, (time.perf_counter() - self.start) * 1000))
+
+    def report(self, slowest_assets=5):
+        """
+        :function report: Zwraca raport z czasami etapów i najwolniej wczytywanych zasobów
+        :param slowest_assets: Ilość najwolniejszych zasobów w raporcie
+        :type slowest_assets: int
+        :rtype: string
+        """
+        lines = ["Startup timing:"]
+        previous = 0.0
+        for stage, at in self.stages:
+            lines.append(f"  {stage:<24}{at:8.1f} ms  (+{at - previous:.1f} ms)")
+            previous = at
+        load_times = {**game_sounds.load_times, **game_images.load_times}
+        lines.append("  slowest assets (main thread):")
+        for name in sorted(load_times, key=load_times.get, reverse=True)[:slowest_assets]:
+            lines.append(f"    {name:<22}{load_times[name]:8.1f} ms")
+        return "\n".join(lines)
+
+
+def loading_window(progress):
+    """
+    :function loading_window: Funkcja rysująca ekran wczytywania z paskiem postępu
+    :param progress: Ułamek wczytanych zasobów
+    :type progress: float
+    """
+    display_screen_window.fill(loading_background_color)
+    bar = pygame.Rect(0, 0, loading_bar_size[0], loading_bar_size[1])
+    bar.center = (src_width // 2, src_height // 2)
+    pygame.draw.rect(display_screen_window, loading_bar_color, bar, 2)
+    bar.width = round(bar.width * progress)
+    pygame.draw.rect(display_screen_window, loading_bar_color, bar)
+
+
+def register_assets():
+    """
+    :function register_assets: Rejestruje obrazki i dźwięki gry w game_images i game_sounds.
+    Zasoby z grup 'settings' i 'results' wczytywane są dopiero przy pierwszym otwarciu tych okien.
+    """
+    game_images.image('start_background', start_background_image, alpha=False)
+    game_images.image('start_button_1_player', start_button_1_player_image)
+    game_images.image('start_button_2_player', start_button_2_player_image)
+    game_images.image('start_title', start_title_image)
+    """ Dodatkowo przeskalowanie ikon """
+    game_images.image('start_button_settings', start_button_settings_image, start_button_settings_size)
+    game_images.images('trzmiel', trzmiel_images, trzmiel_size, smooth=True)
+    game_images.register('trzmiel_rotations', lambda: RotationCache(game_images['trzmiel']))
+    game_images.image('icon', icon_image, icon_size, smooth=True)
+    game_images.register('quote', lambda quote_image: quote_image.convert_alpha(), reader=render_quote)
+
+    game_images.image('obstacle', game_obstacle_image, obstacle_size, group='game')
+    game_images.images('numbers', number_table, number_size, smooth=True, group='game')
+    game_images.image('counter_background', counter_background, counter_background_size, group='game')
+
+    game_images.image('settings_background', settings_background_image, alpha=False, group='settings')
+    game_images.image('settings_title', settings_title_image, settings_title_size, group='settings')
+    game_images.image('settings_button_pressed', settings_button_pressed_image, settings_button_pressed_size,
+                      group='settings')
+    game_images.image('settings_button_not_pressed', settings_button_not_pressed_image,
+                      settings_button_not_pressed_size, group='settings')
+    game_images.image('settings_speaker', settings_speaker_image, settings_speaker_size, group='settings')
+    game_images.image('settings_note', settings_note_image, settings_note_size, group='settings')
+
+    game_images.image('results_background', results_background_image, group='results')
+    game_images.image('results_return', results_return_image, results_return_size, smooth=True, group='results')
+    game_images.image('results_restart', results_restart_image, results_restart_size, smooth=True,
+                      group='results')
+
+    """ Muzyka nie jest wczytywana do pamięci - AudioMixer odtwarza ją strumieniowo (start_music) """
+    game_sounds.sound("click_sound", start_click_sound)
+    game_sounds.sound("on_hover_sound", on_hover_sound)
+    game_sounds.sound("jumping_sound", jumping_sound, group='game')
+    game_sounds.sound("point_get_sound", point_get_sound, group='game')
+    game_sounds.sound("hit_sound", hit_sound, group='game')
+    game_sounds.sound("results_sound", results_sound, group='results')
+
+    """ Efekty: grupa, głośność i priorytet (uderzenie i wyniki nie dadzą się przerwać skokiem) """
+    audio.group('menu')
+    audio.group('game')
+    audio.effect("click_sound", 'menu', 1.0, priority=2)
+    audio.effect("on_hover_sound", 'menu', 1.0, priority=1)
+    audio.effect("jumping_sound", 'game', 0.2, priority=1)
+    audio.effect("point_get_sound", 'game', 0.5, priority=2)
+    audio.effect("hit_sound", 'game', 0.2, priority=3)
+    audio.effect("results_sound", 'game', 0.2, priority=3)
 
 
 if __name__ == "__main__":
+    startup = StartupTimer()
+    """ Najpierw okno, żeby gracz od razu coś widział """
+    pygame.display.init()
+    display_screen_window = pygame.display.set_mode((src_width, src_height))
+    """ Napis na okienku """
+    pygame.display.set_caption('TrzmielIT')
+    loading_window(0)
+    pygame.display.flip()
     try:
-        pyi_splash.update_text("Trzmiel się wykluwa")
+        pyi_splash.close()
     except:
         pass
+    startup.mark("window")
     """ Inicjalizacja gry oraz dźwięków"""
     pygame.mixer.pre_init()
     pygame.mixer.init()
     pygame.init()
+    audio.init()
     time_clock = pygame.time.Clock()
-    """ Napis na okienku """
-    pygame.display.set_caption('TrzmielIT')
-    """ Przypisanie obrazków do game_images na podstawie ich ścieżek """
-    game_images['start_background'] = pygame.image.load(start_background_image).convert()
-    game_images['start_button_1_player'] = pygame.image.load(start_button_1_player_image).convert_alpha()
-    game_images['start_button_2_player'] = pygame.image.load(start_button_2_player_image).convert_alpha()
-    game_images['start_title'] = pygame.image.load(start_title_image).convert_alpha()
-    game_images['settings_background'] = pygame.image.load(settings_background_image).convert()
-    """ Dodatkowo przeskalowanie ikon w ustawieniach """
-    game_images['start_button_settings'] = pygame.transform.scale(
-        pygame.image.load(start_button_settings_image).convert_alpha(), start_button_settings_size)
-    game_images['settings_title'] = pygame.transform.scale(
-        pygame.image.load(settings_title_image).convert_alpha(), settings_title_size)
-    game_images['settings_button_pressed'] = pygame.transform.scale(
-        pygame.image.load(settings_button_pressed_image).convert_alpha(), settings_button_pressed_size)
-    game_images['settings_button_not_pressed'] = pygame.transform.scale(
-        pygame.image.load(settings_button_not_pressed_image).convert_alpha(), settings_button_not_pressed_size)
-    game_images['settings_speaker'] = pygame.transform.scale(
-        pygame.image.load(settings_speaker_image).convert_alpha(), settings_speaker_size)
-    game_images['settings_note'] = pygame.transform.scale(
-        pygame.image.load(settings_note_image).convert_alpha(), settings_note_size)
-    game_images['inactive_button'] = pygame.transform.scale(
-        pygame.image.load(start_inactive_button_image).convert_alpha(), inactive_button_size)
-    game_images['trzmiel'] = [
-        pygame.transform.smoothscale(pygame.image.load(trzmiel_images[x]).convert_alpha(), trzmiel_size) for x in
-        range(4)]
-    game_images['icon'] = pygame.transform.smoothscale(pygame.image.load(icon_image).convert_alpha(), icon_size)
-    game_images['numbers'] = [
-        pygame.transform.smoothscale(pygame.image.load(number_table[x]).convert_alpha(), number_size) for x in
-        range(10)]
-    game_images['counter_background'] = pygame.transform.scale(
-        pygame.image.load(counter_background).convert_alpha(), counter_background_size)
-    game_images['results_background'] = pygame.image.load(results_background_image).convert_alpha()
-    game_images['quote'] = quote_image.convert_alpha()
-    game_images['results_return'] = pygame.transform.smoothscale(
-        pygame.image.load(results_return_image).convert_alpha(), results_return_size)
-    game_images['results_restart'] = pygame.transform.smoothscale(
-        pygame.image.load(results_restart_image).convert_alpha(), results_restart_size)
-
-    """ Przypisanie dźwięków do game_sounds na podstawie ich ścieżek """
-    game_sounds["start_music"] = pygame.mixer.Sound(start_music)
-    game_sounds["click_sound"] = pygame.mixer.Sound(start_click_sound)
-    game_sounds["on_hover_sound"] = pygame.mixer.Sound(on_hover_sound)
-    game_sounds["jumping_sound"] = pygame.mixer.Sound(jumping_sound)
-    game_sounds["point_get_sound"] = pygame.mixer.Sound(point_get_sound)
-    game_sounds["hit_sound"] = pygame.mixer.Sound(hit_sound)
-    game_sounds["results_sound"] = pygame.mixer.Sound(results_sound)
-
-    """Wczytanie najwiekszego wyniku z pliku"""
-    HIGHSCORE = Highscores_list(game_highscores)
+    startup.mark("pygame init")
+    """ Rejestracja zasobów i wczytywanie w tle, najpierw tych potrzebnych w menu, potem w grze """
+    register_assets()
+    game_images.prefetch('start', 'game')
+    game_sounds.prefetch('start', 'game')
+    """ Ekran wczytywania do czasu, aż będą gotowe zasoby menu """
+    while any(name in game_images.pending for name in game_images.group('start')):
+        for event in pygame.event.get():
+            if event.type == QUIT:
+                pygame.quit()
+                sys.exit()
+        game_images.pump()
+        loading_window(game_images.progress('start'))
+        pygame.display.flip()
+        time_clock.tick(FPS)
+    game_images.preload('start')
+    game_sounds.preload('start')
+    startup.mark("menu assets")
+
+    """ Otwarcie bazy wyników, zamykanej (po zapisaniu czekających wyników) przy wyjściu """
+    HIGHSCORE = ScoreStore(game_scores, legacy_path=game_highscores)
+    atexit.register(HIGHSCORE.close)
 
     """ Zmiana ikony programu """
     pygame.display.set_icon(game_images['icon'])
-    """ Rozpoczęcie grania muzyczki w nieskończonej pętli """
-    pygame.mixer.Channel(start_music_channel).play(game_sounds["start_music"], -1)
-    pygame.mixer.Channel(start_music_channel).set_volume(0.2)
-
-    acc = 0.0
-    main_screen_motion = 0.0
-    try:
-        pyi_splash.update_text("Wykluty trzmiel!")
-        pyi_splash.close()
-    except:
-        pass
-    while PROGRAM_RUNNING:
-        trzmiel = None
-        if START_WINDOW:
-            """ Okno startowe """
-            acc, main_screen_motion, trzmiel = start_window()
-
-        """ Gra jednoosobowa """
-        if one_player_mode:
-            acc, main_screen_motion = start_1_player_mode(acc=acc, main_screen_motion=main_screen_motion,
-                                                          trzmiel=trzmiel)
-        if RETURN_TO_MENU:
-            START_WINDOW = True
-            one_player_mode = False
-        elif RESTART_1_PLAYER:
-            START_WINDOW = False
-            one_player_mode = True
-
-        open_results = False
-        start_disappear = False
-        SCORE = 0
-        pointget_acc = 0
-        RETURN_TO_MENU = False
-        RESTART_1_PLAYER = False
-
+    """ Rozpoczęcie grania muzyczki w nieskończonej pętli (bez pliku muzyki gra jest cicha) """
+    if not audio.play_music(start_music, volume=0.2):
+        print(f"Couldn't play music {start_music!r}")
+
+    """ Tło przewijane w menu i w grze, obrazek powtarza się co 3202 piksele """
+    background = ScrollingBackground(game_images['start_background'], speed=0.05, period=3202)
+    build_scenes(background)
+    startup.mark("menu ready")
+    if "--startup-report" in sys.argv:
+        print(startup.report())
+    if "--seed" in sys.argv:
+        course_seed = int(sys.argv[sys.argv.index("--seed") + 1])
+    if "--difficulty" in sys.argv:
+        course_difficulty = sys.argv[sys.argv.index("--difficulty") + 1]
+        if course_difficulty not in DIFFICULTIES:
+            sys.exit(f"Unknown difficulty {course_difficulty!r}, choose from: {', '.join(DIFFICULTIES)}")
+    if "--no-replays" in sys.argv:
+        record_replays = False
+    if "--join" in sys.argv:
+        """ Wyścig na serwerze innego komputera: --join host albo --join host:port """
+        race_host, _, port = sys.argv[sys.argv.index("--join") + 1].partition(':')
+        race_port = int(port or DEFAULT_PORT)
+    if "--replay" in sys.argv:
+        """ Odtworzenie nagranej gry od razu, bez okna startowego """
+        replay_source = ReplayReader(sys.argv[sys.argv.index("--replay") + 1])
+    """ Zapis nagrywanej gry, jeśli okno zostanie zamknięte w jej trakcie """
+    atexit.register(lambda: finish_recording(SCORE))
+    if "--profile-output" in sys.argv:
+        """ Zapis czasów etapów ostatnich klatek przy wyjściu z gry (.json lub .csv) """
+        atexit.register(profiler.dump, sys.argv[sys.argv.index("--profile-output") + 1])
+    """ Okno startowe, a z --replay od razu gra """
+    scenes.run('game' if replay_source is not None else 'start')
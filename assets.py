@@ -0,0 +1,213 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+"""
+    assets
+    ======
+    Wspólne zasoby gry (obrazki, dźwięki i obiekty z nich wyliczane) wczytywane, konwertowane i skalowane raz.
+    Zasoby rejestruje się z funkcją wczytującą i nazwą grupy (ekranu, na którym są używane);
+    wczytywane są przy pierwszym użyciu albo całą grupą przez AssetManager.preload.
+    Wczytywanie może być dwuetapowe: odczyt z dysku i dekodowanie (reader) może odbywać się w tle
+    (AssetManager.prefetch), a konwersja do formatu ekranu (loader) zawsze w głównym wątku.
+"""
+
+
+def read_image(path, size=None, smooth=False):
+    """
+    :function read_image: Wczytuje i dekoduje obrazek z dysku, opcjonalnie skalując go, bez konwersji do formatu
+    ekranu (można wywołać w tle)
+    :param path: Adres obrazka
+    :type path: string
+    :param size: Docelowy rozmiar (None - bez skalowania)
+    :type size: Tuple[int, int]
+    :param smooth: True jeśli skalowanie ma być wygładzone
+    :type smooth: bool
+    :rtype: pygame.Surface
+    """
+    image = pygame.image.load(path)
+    if size:
+        image = pygame.transform.smoothscale(image, size) if smooth else pygame.transform.scale(image, size)
+    return image
+
+
+def prepare_image(image, alpha=True):
+    """
+    :function prepare_image: Konwertuje obrazek do formatu ekranu (tylko w głównym wątku)
+    :param image: Wczytany obrazek
+    :type image: pygame.Surface
+    :param alpha: True jeśli obrazek ma przezroczystość
+    :type alpha: bool
+    :rtype: image.pyi
+    """
+    return image.convert_alpha() if alpha else image.convert()
+
+
+def load_image(path, size=None, alpha=True, smooth=False):
+    """
+    :function load_image: Wczytuje obrazek z dysku, opcjonalnie skaluje i konwertuje do formatu ekranu
+    :param path: Adres obrazka
+    :type path: string
+    :rtype: image.pyi
+    """
+    return prepare_image(read_image(path, size, smooth), alpha)
+
+
+def load_sound(path):
+    """
+    :function load_sound: Wczytuje dźwięk z dysku
+    :param path: Adres dźwięku
+    :type path: string
+    :rtype: pygame.mixer.Sound
+    """
+    return pygame.mixer.Sound(path)
+
+
+class AssetManager:
+    """
+    :class AssetManager: Słownik zasobów wczytujący każdy zasób raz, przy pierwszym odwołaniu.
+    Wszystkie obiekty gry dostają ten sam obiekt zasobu.
+        :ivar self.loaders: Funkcje wczytujące zasoby: (reader, loader, grupa)
+        :type self.loaders: Dict[string, Tuple[Callable, Callable, string]]
+        :ivar self.assets: Wczytane zasoby
+        :type self.assets: Dict[string, Any]
+        :ivar self.pending: Odczyty zlecone w tle, w kolejności zlecenia
+        :type self.pending: Dict[string, concurrent.futures.Future]
+        :ivar self.load_times: Czas wczytywania każdego zasobu w głównym wątku (ms)
+        :type self.load_times: Dict[string, float]
+    """
+
+    def __init__(self):
+        self.loaders = {}
+        self.assets = {}
+        self.pending = {}
+        self.load_times = {}
+        self.executor = None
+
+    def register(self, name, loader, group='start', reader=None):
+        """
+        :function register: Rejestruje zasób bez wczytywania go
+        :param name: Nazwa zasobu
+        :type name: string
+        :param loader: Funkcja zwracająca zasób; jeśli podano reader, dostaje jego wynik jako argument
+        :type loader: Callable
+        :param group: Nazwa grupy zasobu
+        :type group: string
+        :param reader: Funkcja bez argumentów wykonująca część wczytywania, którą można zrobić w tle
+        :type reader: Callable
+        """
+        self.loaders[name] = (reader, loader, group)
+        self.assets.pop(name, None)
+
+    def image(self, name, path, size=None, alpha=True, smooth=False, group='start'):
+        """
+        :function image: Rejestruje obrazek (parametry jak w load_image)
+        """
+        self.register(name, lambda image: prepare_image(image, alpha), group,
+                      lambda: read_image(path, size, smooth))
+
+    def images(self, name, paths, size=None, alpha=True, smooth=False, group='start'):
+        """
+        :function images: Rejestruje listę obrazków (np. klatki animacji) jako jeden zasób
+        """
+        self.register(name, lambda images: [prepare_image(image, alpha) for image in images], group,
+                      lambda: [read_image(path, size, smooth) for path in paths])
+
+    def sound(self, name, path, group='start'):
+        """
+        :function sound: Rejestruje dźwięk, wczytywany w całości w tle
+        """
+        self.register(name, lambda sound: sound, group, lambda: load_sound(path))
+
+    def load(self, name):
+        """
+        :function load: Wczytuje zasób, czekając na odczyt w tle jeśli został zlecony
+        :rtype: Any
+        """
+        reader, loader, _ = self.loaders[name]
+        future = self.pending.pop(name, None)
+        start = time.perf_counter()
+        if reader is None:
+            asset = loader()
+        else:
+            asset = loader(future.result() if future else reader())
+        self.load_times[name] = (time.perf_counter() - start) * 1000
+        self.assets[name] = asset
+        return asset
+
+    def __getitem__(self, name):
+        asset = self.assets.get(name)
+        if asset is None:
+            asset = self.load(name)
+        return asset
+
+    def __setitem__(self, name, asset):
+        self.assets[name] = asset
+
+    def __contains__(self, name):
+        return name in self.assets or name in self.loaders
+
+    def is_loaded(self, name):
+        """
+        :function is_loaded: Sprawdza czy zasób został już wczytany
+        :rtype: bool
+        """
+        return name in self.assets
+
+    def group(self, group):
+        """
+        :function group: Zwraca nazwy zasobów należących do grupy
+        :rtype: List[string]
+        """
+        return [name for name, (_, _, asset_group) in self.loaders.items() if asset_group == group]
+
+    def preload(self, *groups):
+        """
+        :function preload: Wczytuje od razu wszystkie zasoby z podanych grup
+        :param groups: Nazwy grup
+        """
+        for group in groups:
+            for name in self.group(group):
+                self[name]
+
+    def prefetch(self, *groups, workers=2):
+        """
+        :function prefetch: Zleca odczyt zasobów z podanych grup w tle, w kolejności grup i rejestracji
+        :param groups: Nazwy grup w kolejności ważności
+        :param workers: Ilość wątków odczytujących
+        """
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(workers, thread_name_prefix='assets')
+        for group in groups:
+            for name in self.group(group):
+                reader = self.loaders[name][0]
+                if reader and name not in self.assets and name not in self.pending:
+                    self.pending[name] = self.executor.submit(reader)
+
+    def pump(self, time_budget=4.0):
+        """
+        :function pump: Kończy wczytywanie zasobów odczytanych już w tle (w kolejności zlecenia),
+        dopóki nie minie time_budget milisekund
+        :param time_budget: Czas na wczytywanie w jednym wywołaniu (ms)
+        :type time_budget: float
+        :return: Ilość zasobów, które jeszcze czekają
+        :rtype: int
+        """
+        deadline = time.perf_counter() + time_budget / 1000
+        for name, future in list(self.pending.items()):
+            if time.perf_counter() > deadline:
+                break
+            if future.done():
+                self.load(name)
+        return len(self.pending)
+
+    def progress(self, *groups):
+        """
+        :function progress: Zwraca ułamek wczytanych zasobów z podanych grup
+        :rtype: float
+        """
+        names = [name for group in groups for name in self.group(group)]
+        if not names:
+            return 1.0
+        return sum(name in self.assets for name in names) / len(names)
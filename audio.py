@@ -0,0 +1,271 @@
+import os
+import time
+
+import pygame
+
+"""
+    audio
+    =====
+    Dźwięk gry. Muzyka odtwarzana jest strumieniowo z dysku przez pygame.mixer.music (w pamięci jest tylko
+    bieżący fragment utworu, a brak pliku muzyki wyłącza muzykę zamiast przerywać grę). Krótkie efekty leżą
+    w pamięci jako wczytane wcześniej pygame.mixer.Sound (assets.AssetManager) i grane są na kanałach z puli
+    VOICES kanałów wybieranych w chwili odtworzenia: wolny kanał, a gdy wszystkie grają - kanał z dźwiękiem
+    o najniższym priorytecie (najstarszym spośród równych), jeśli nowy dźwięk nie jest od niego mniej ważny.
+    Głośność i wyciszenie ustawiane są dla grup dźwięków (muzyka, menu, gra) w jednym miejscu - AudioMixer.
+"""
+
+"""
+    Stałe dźwięku
+    -------------
+    VOICES : int
+        Ilość kanałów miksera na efekty
+    MUSIC : string
+        Nazwa grupy muzyki
+"""
+VOICES = 8
+MUSIC = 'music'
+
+
+class SoundGroup:
+    """
+    :class SoundGroup: Grupa dźwięków o wspólnej głośności i wyciszeniu
+        :ivar self.volume: Głośność grupy (0.0 - 1.0)
+        :type self.volume: float
+        :ivar self.muted: True jeśli grupa jest wyciszona
+        :type self.muted: bool
+    """
+
+    __slots__ = ('volume', 'muted')
+
+    def __init__(self, volume=1.0, muted=False):
+        self.volume = volume
+        self.muted = muted
+
+    @property
+    def gain(self):
+        """ Mnożnik głośności dźwięków grupy """
+        return 0.0 if self.muted else self.volume
+
+
+class Effect:
+    """
+    :class Effect: Efekt dźwiękowy zarejestrowany w AudioMixer
+        :ivar self.asset: Nazwa dźwięku w AssetManager
+        :type self.asset: string
+        :ivar self.group: Nazwa grupy
+        :type self.group: string
+        :ivar self.volume: Głośność efektu względem grupy
+        :type self.volume: float
+        :ivar self.priority: Priorytet - dźwięk może zająć kanał dźwięku o priorytecie nie wyższym niż własny
+        :type self.priority: int
+    """
+
+    __slots__ = ('asset', 'group', 'volume', 'priority')
+
+    def __init__(self, asset, group, volume=1.0, priority=0):
+        self.asset = asset
+        self.group = group
+        self.volume = volume
+        self.priority = priority
+
+
+class Voice:
+    """
+    :class Voice: Kanał miksera z puli razem z efektem, który ostatnio na nim zagrano
+        :ivar self.channel: Kanał miksera
+        :type self.channel: pygame.mixer.Channel
+        :ivar self.effect: Ostatnio zagrany efekt (None - kanał nieużywany)
+        :type self.effect: Effect
+        :ivar self.started: Czas rozpoczęcia efektu (time.perf_counter)
+        :type self.started: float
+    """
+
+    __slots__ = ('channel', 'effect', 'started')
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.effect = None
+        self.started = 0.0
+
+
+class AudioMixer:
+    """
+    :class AudioMixer: Muzyka, pula kanałów efektów i głośności grup
+        :ivar self.sounds: Wczytane dźwięki efektów
+        :type self.sounds: assets.AssetManager
+        :ivar self.groups: Grupy dźwięków po nazwie
+        :type self.groups: Dict[string, SoundGroup]
+        :ivar self.effects: Efekty po nazwie
+        :type self.effects: Dict[string, Effect]
+        :ivar self.voices: Pula kanałów (pusta do wywołania init())
+        :type self.voices: List[Voice]
+        :ivar self.music: Adres granego utworu (None - brak muzyki)
+        :type self.music: string
+        :ivar self.music_volume: Głośność muzyki względem grupy MUSIC
+        :type self.music_volume: float
+        :ivar self.stolen: Ilość efektów, które przerwały inny efekt
+        :type self.stolen: int
+        :ivar self.dropped: Ilość efektów pominiętych, bo wszystkie kanały grały ważniejsze dźwięki
+        :type self.dropped: int
+    """
+
+    def __init__(self, sounds):
+        self.sounds = sounds
+        self.groups = {MUSIC: SoundGroup()}
+        self.effects = {}
+        self.voices = []
+        self.music = None
+        self.music_volume = 1.0
+        self.stolen = 0
+        self.dropped = 0
+
+    def init(self, voices=VOICES):
+        """
+        :function init: Przydziela pulę kanałów (po pygame.mixer.init()); bez miksera dźwięk jest wyłączony
+        :param voices: Ilość kanałów na efekty
+        :type voices: int
+        """
+        if not pygame.mixer.get_init():
+            return
+        pygame.mixer.set_num_channels(voices)
+        self.voices = [Voice(pygame.mixer.Channel(index)) for index in range(voices)]
+
+    def group(self, name, volume=1.0):
+        """
+        :function group: Dodaje grupę dźwięków
+        :param name: Nazwa grupy
+        :param volume: Głośność grupy
+        :rtype: SoundGroup
+        """
+        group = self.groups[name] = SoundGroup(volume)
+        return group
+
+    def effect(self, name, group, volume=1.0, priority=0, asset=None):
+        """
+        :function effect: Rejestruje efekt dźwiękowy
+        :param name: Nazwa efektu
+        :param group: Nazwa grupy
+        :param volume: Głośność efektu względem grupy
+        :param priority: Priorytet przy braku wolnego kanału
+        :param asset: Nazwa dźwięku w AssetManager (domyślnie taka jak nazwa efektu)
+        """
+        self.effects[name] = Effect(asset or name, group, volume, priority)
+
+    def play(self, name):
+        """
+        :function play: Odtwarza efekt na wolnym kanale albo zabiera kanał mniej ważnemu dźwiękowi.
+        Efekty wyciszonej grupy nie zajmują kanałów.
+        :param name: Nazwa efektu
+        :return: Kanał, na którym gra efekt (None - efekt pominięty)
+        :rtype: pygame.mixer.Channel
+        """
+        effect = self.effects[name]
+        gain = self.groups[effect.group].gain
+        if not self.voices or gain == 0.0:
+            return None
+        voice = self.find_voice(effect.priority)
+        if voice is None:
+            self.dropped += 1
+            return None
+        voice.channel.play(self.sounds[effect.asset])
+        voice.channel.set_volume(effect.volume * gain)
+        voice.effect = effect
+        voice.started = time.perf_counter()
+        return voice.channel
+
+    def find_voice(self, priority):
+        """
+        :function find_voice: Wybiera kanał dla dźwięku: wolny albo grający dźwięk o najniższym priorytecie
+        (najdawniej rozpoczęty spośród równych), jeśli ten priorytet nie jest wyższy niż priority
+        :param priority: Priorytet nowego dźwięku
+        :type priority: int
+        :rtype: Voice
+        """
+        victim = None
+        for voice in self.voices:
+            if not voice.channel.get_busy():
+                return voice
+            if victim is None or (voice.effect.priority, voice.started) < (victim.effect.priority, victim.started):
+                victim = voice
+        if victim is None or victim.effect.priority > priority:
+            return None
+        victim.channel.stop()
+        self.stolen += 1
+        return victim
+
+    def set_volume(self, group, volume):
+        """
+        :function set_volume: Zmienia głośność grupy, także dla dźwięków, które właśnie grają
+        :param group: Nazwa grupy
+        :param volume: Głośność (0.0 - 1.0)
+        """
+        self.groups[group].volume = volume
+        self.apply(group)
+
+    def set_muted(self, group, muted):
+        """
+        :function set_muted: Wycisza albo przywraca grupę. Wyciszona muzyka jest zatrzymywana (nie jest wtedy
+        odczytywana z dysku) i zaczyna się od początku po przywróceniu.
+        :param group: Nazwa grupy
+        :param muted: True - wyciszona
+        """
+        self.groups[group].muted = muted
+        self.apply(group)
+
+    def is_muted(self, group):
+        """
+        :function is_muted: Sprawdza czy grupa jest wyciszona
+        :rtype: bool
+        """
+        return self.groups[group].muted
+
+    def apply(self, group):
+        """
+        :function apply: Ustawia głośność grających dźwięków grupy (i muzyki, jeśli to grupa MUSIC)
+        :param group: Nazwa grupy
+        """
+        gain = self.groups[group].gain
+        for voice in self.voices:
+            if voice.effect is not None and voice.effect.group == group and voice.channel.get_busy():
+                voice.channel.set_volume(voice.effect.volume * gain)
+        if group == MUSIC and self.music and self.voices:
+            if gain == 0.0:
+                pygame.mixer.music.stop()
+            else:
+                if not pygame.mixer.music.get_busy():
+                    pygame.mixer.music.play(-1)
+                pygame.mixer.music.set_volume(self.music_volume * gain)
+
+    def play_music(self, path, volume=1.0):
+        """
+        :function play_music: Odtwarza utwór w pętli, strumieniowo z dysku. Brak pliku (albo miksera) oznacza
+        grę bez muzyki.
+        :param path: Adres utworu
+        :type path: string
+        :param volume: Głośność utworu względem grupy MUSIC
+        :type volume: float
+        :return: True jeśli muzyka gra albo zagra po przywróceniu grupy
+        :rtype: bool
+        """
+        if not self.voices or not os.path.exists(path):
+            self.music = None
+            return False
+        try:
+            pygame.mixer.music.load(path)
+        except pygame.error:
+            self.music = None
+            return False
+        self.music = path
+        self.music_volume = volume
+        pygame.mixer.music.stop()
+        self.apply(MUSIC)
+        return True
+
+    def stop(self):
+        """
+        :function stop: Zatrzymuje muzykę i wszystkie efekty
+        """
+        if self.voices:
+            pygame.mixer.music.stop()
+            for voice in self.voices:
+                voice.channel.stop()
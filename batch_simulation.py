@@ -0,0 +1,241 @@
+import random
+
+import numpy as np
+
+import collision
+from collision import collides_part, REACH, DY_LIMIT, GAP_SIZE, COLUMNS, ROWS, UNKNOWN, HIT
+from simulation import (BEE_START_Y, BEE_X, OBSTACLE_RECYCLE_X, GRAVITY, JUMP_VELOCITY, OBSTACLE_SPEED,
+                        ANIMATION_TICKS, BEE_FRAMES, BOB_RANGE, CourseGenerator, ObstacleState)
+
+"""
+    batch_simulation
+    ================
+    Symulacja wielu niezależnych trzmieli naraz, z całym stanem trzymanym w tablicach NumPy.
+    Reguły są te same co w simulation.World (skok, grawitacja, przesuwanie przeszkód, punkty i kolizje),
+    ale jeden krok przesuwa wszystkie trzmiele kilkoma operacjami na tablicach.
+    Trzmiel z własnym torem i ziarnem seed rozgrywa dokładnie tę samą grę co World(seed, difficulty=difficulty)
+    przy tych samych skokach - przeszkody ustawia ten sam simulation.CourseGenerator.
+"""
+
+""" hit_table : np.ndarray
+        Wyniki collision.collides_part dla (klatka, część, dx + REACH - 1, dy + DY_LIMIT) - widok na
+        collision.hit_table (ta sama pamięć), uzupełniany w trakcie symulacji
+"""
+hit_table = np.frombuffer(collision.hit_table, dtype=np.uint8).reshape(BEE_FRAMES, 2, COLUMNS, ROWS)
+
+
+def lookup_part(frame, part, columns, dy):
+    """
+    :function lookup_part: Wektorowa wersja collision.collides_part dla jednej klatki animacji i części przeszkody
+    :param columns: dx + REACH - 1
+    :type columns: np.ndarray
+    :param dy: Położenia środków trzmieli względem środka części przeszkody na obrazku w pionie
+    :type dy: np.ndarray
+    :rtype: np.ndarray
+    """
+    rows = np.clip(dy, -DY_LIMIT, DY_LIMIT) + DY_LIMIT
+    table = hit_table[frame, part]
+    values = table[columns, rows]
+    unknown = values == UNKNOWN
+    if unknown.any():
+        """ collides_part zapisuje wynik we wspólnej tablicy """
+        for column, row in set(zip(columns[unknown].tolist(), rows[unknown].tolist())):
+            collides_part(frame, part, column - (REACH - 1), row - DY_LIMIT)
+        values = table[columns, rows]
+    return values == HIT
+
+
+def lookup_collisions(frame, dx, dy, gap):
+    """
+    :function lookup_collisions: Wektorowa wersja collision.collides dla jednej klatki animacji
+    :param frame: Numer klatki animacji trzmieli
+    :type frame: int
+    :param dx: Położenia środków przeszkód względem trzmieli w poziomie, wszystkie w przedziale (-REACH, REACH)
+    :type dx: np.ndarray
+    :param dy: Położenia środków trzmieli względem środków przerw w pionie
+    :type dy: np.ndarray
+    :param gap: Wysokości przerw
+    :type gap: np.ndarray
+    :rtype: np.ndarray
+    """
+    columns = dx + (REACH - 1)
+    """ rozsunięcie części przeszkody jak w collision.split_gap """
+    up = (gap - GAP_SIZE) // 2
+    down = gap - GAP_SIZE - up
+    return lookup_part(frame, 0, columns, dy + up) | lookup_part(frame, 1, columns, dy - down)
+
+
+class BatchWorld:
+    """
+    :class BatchWorld: Stan N gier jednoosobowych przesuwany jednym wektorowym krokiem
+        :ivar self.count: Ilość trzmieli
+        :type self.count: int
+        :ivar self.shared_course: True jeśli wszystkie trzmiele lecą przez te same przeszkody
+        :type self.shared_course: bool
+        :ivar self.y: Położenie środków trzmieli w pionie, kształt (N,)
+        :type self.y: np.ndarray
+        :ivar self.y_velocity: Prędkości trzmieli w pionie, kształt (N,)
+        :type self.y_velocity: np.ndarray
+        :ivar self.started: True dla trzmieli, które lecą, kształt (N,)
+        :type self.started: np.ndarray
+        :ivar self.alive: False dla trzmieli po kolizji, kształt (N,)
+        :type self.alive: np.ndarray
+        :ivar self.score: Wyniki, kształt (N,)
+        :type self.score: np.ndarray
+        :ivar self.next_obstacle: Indeks najbliższej jeszcze nie minętej przeszkody każdego trzmiela, kształt (N,)
+        :type self.next_obstacle: np.ndarray
+        :ivar self.courses: Generatory torów
+        :type self.courses: List[simulation.CourseGenerator]
+        :ivar self.obstacle_x: Położenia środków przeszkód, kształt (tory, ilość przeszkód w puli)
+        :type self.obstacle_x: np.ndarray
+        :ivar self.obstacle_y: Położenia środków przerw, kształt (tory, ilość przeszkód w puli)
+        :type self.obstacle_y: np.ndarray
+        :ivar self.obstacle_gap: Wysokości przerw, kształt (tory, ilość przeszkód w puli)
+        :type self.obstacle_gap: np.ndarray
+        :ivar self.tick: Numer kroku symulacji
+        :type self.tick: int
+    """
+
+    def __init__(self, count, seeds=None, shared_course=False, bee_y=BEE_START_Y, difficulty='classic'):
+        """
+        :param count: Ilość trzmieli
+        :type count: int
+        :param seeds: Ziarna torów (jedno przy wspólnym torze, count przy osobnych), None - losowe
+        :type seeds: Optional[Sequence[int]]
+        :param shared_course: True jeśli wszystkie trzmiele mają lecieć przez te same przeszkody,
+            wtedy przeszkody ruszają od razu, a trzmiele zaczynają lot w pierwszym kroku
+        :type shared_course: bool
+        :param bee_y: Początkowe położenie trzmieli w pionie
+        :type bee_y: float
+        :param difficulty: Krzywa trudności torów (jak w simulation.World)
+        :type difficulty: string
+        """
+        self.count = count
+        self.shared_course = shared_course
+        self.difficulty = difficulty
+        """ przeszkoda, na której generator ustawia kolejne przeszkody przed skopiowaniem do tablic """
+        self.placed = ObstacleState()
+        self.reset(seeds, bee_y)
+
+    def reset(self, seeds=None, bee_y=BEE_START_Y):
+        """
+        :function reset: Przywraca stan początkowy wszystkich gier
+        :param seeds: Ziarna torów, None - losowe
+        :param bee_y: Początkowe położenie trzmieli w pionie
+        """
+        count = self.count
+        courses = 1 if self.shared_course else count
+        if seeds is None:
+            seeds = [None] * courses
+        if len(seeds) != courses:
+            raise ValueError(f"Expected {courses} seeds, got {len(seeds)}")
+        self.seeds = [random.randrange(2 ** 32) if seed is None else seed for seed in seeds]
+        self.courses = [CourseGenerator(seed, self.difficulty) for seed in self.seeds]
+        """ indeks toru, przez który leci każdy trzmiel """
+        self.course = np.zeros(count, dtype=np.intp) if self.shared_course else np.arange(count)
+
+        self.y = np.full(count, float(bee_y))
+        self.y_velocity = np.zeros(count)
+        self.grow = np.zeros(count, dtype=np.int64)
+        self.mode = np.ones(count, dtype=np.int64)
+        self.if_jumped = np.zeros(count, dtype=bool)
+        self.started = np.full(count, self.shared_course)
+        self.alive = np.ones(count, dtype=bool)
+        self.score = np.zeros(count, dtype=np.int64)
+        self.next_obstacle = np.zeros(count, dtype=np.intp)
+
+        pool = self.courses[0].difficulty.obstacle_count
+        self.obstacle_x = np.zeros((courses, pool))
+        self.obstacle_y = np.zeros((courses, pool), dtype=np.int64)
+        self.obstacle_gap = np.zeros((courses, pool), dtype=np.int64)
+        for course in range(courses):
+            for index in range(pool):
+                self.place_obstacle(course, index, None if index == 0 else self.obstacle_x[course, index - 1])
+        self.tick = 0
+
+    def step(self, jump):
+        """
+        :function step: Wykonuje jeden krok symulacji wszystkich trzmieli
+        :param jump: True dla trzmieli, których przycisk skoku jest wciśnięty, kształt (N,) lub pojedyncza wartość
+        :type jump: np.ndarray
+        :return: Tablice (skoki, punkty, kolizje) z True dla trzmieli, u których zdarzenie zaszło w tym kroku
+        :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray]
+        """
+        jump = np.broadcast_to(np.asarray(jump, dtype=bool), (self.count,))
+        self.tick += 1
+        self.started |= jump & self.alive
+        flying = self.started & self.alive
+
+        """ Przeszkody: wspólny tor jedzie zawsze, osobne tylko gdy ich trzmiel leci """
+        moving = np.ones(1, dtype=bool) if self.shared_course else flying
+        self.obstacle_x[moving] -= OBSTACLE_SPEED
+        self.recycle_obstacles()
+
+        """ Skok i grawitacja """
+        jumps = flying & jump & ~self.if_jumped
+        self.y_velocity[jumps] = JUMP_VELOCITY
+        self.if_jumped = np.where(jump, self.if_jumped | jumps, False)
+        self.y_velocity += GRAVITY * flying
+        self.y += self.y_velocity * flying
+
+        """ Unoszenie się w oczekiwaniu na start """
+        if self.tick % ANIMATION_TICKS == 0:
+            waiting = ~self.started & self.alive
+            self.mode[self.grow > BOB_RANGE] = -1
+            self.mode[self.grow < -BOB_RANGE] = 1
+            self.grow += self.mode * waiting
+            self.y += self.grow * waiting
+
+        """ Kolizje: dokładny test tylko dla przeszkód zachodzących na trzmiela w poziomie """
+        dx = np.round(self.obstacle_x[self.course]).astype(np.int64) - BEE_X
+        near = (np.abs(dx) < REACH) & self.alive[:, None]
+        hit = np.zeros(self.count, dtype=bool)
+        if near.any():
+            bees, obstacles = np.nonzero(near)
+            dy = np.round(self.y[bees]).astype(np.int64) - self.obstacle_y[self.course[bees], obstacles]
+            gap = self.obstacle_gap[self.course[bees], obstacles]
+            frame = self.tick // ANIMATION_TICKS % BEE_FRAMES
+            hit[bees[lookup_collisions(frame, dx[bees, obstacles], dy, gap)]] = True
+        hits = hit & flying
+        self.alive &= ~hit
+        self.started &= self.alive
+
+        """ Punkty: środek trzmiela minął środek najbliższej przeszkody (jak World.score_passed) """
+        points = (self.obstacle_x[self.course, self.next_obstacle] <= BEE_X) & self.started
+        self.score += points
+        self.next_obstacle[points] = (self.next_obstacle[points] + 1) % self.obstacle_x.shape[1]
+        return jumps, points, hits
+
+    def place_obstacle(self, course, index, previous_x):
+        """
+        :function place_obstacle: Ustawia przeszkodę toru jako następną z jego generatora
+        :param course: Indeks toru
+        :param index: Indeks przeszkody w puli
+        :param previous_x: Położenie poprzedniej przeszkody na torze (None - pierwsza przeszkoda)
+        """
+        placed = self.placed
+        self.courses[course].place(placed, previous_x)
+        self.obstacle_x[course, index] = placed.x
+        self.obstacle_y[course, index] = placed.y
+        self.obstacle_gap[course, index] = placed.gap
+
+    def recycle_obstacles(self):
+        """
+        :function recycle_obstacles: Przenosi przeszkody za lewą krawędzią na koniec toru, za poprzednią w puli,
+        z położeniem i przerwą z generatora toru, jak w World
+        """
+        courses, indexes = np.nonzero(self.obstacle_x <= OBSTACLE_RECYCLE_X)
+        for course, index in zip(courses.tolist(), indexes.tolist()):
+            self.place_obstacle(course, index, float(self.obstacle_x[course, index - 1]))
+
+    def next_obstacles(self):
+        """
+        :function next_obstacles: Zwraca najbliższe jeszcze nie minięte przeszkody każdego trzmiela
+        :return: Tablice (x, y) środków przeszkód i ich przerw, kształt (N,)
+        :rtype: Tuple[np.ndarray, np.ndarray]
+        """
+        x = self.obstacle_x[self.course]
+        ahead = np.where(x + REACH > BEE_X, x, np.inf)
+        index = ahead.argmin(axis=1)
+        rows = np.arange(self.count)
+        return x[rows, index], self.obstacle_y[self.course][rows, index]
@@ -0,0 +1,383 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pygame
+from pygame.locals import *
+
+import TrzmielIT as game
+from profiler import FrameProfiler
+from simulation import World, BEE_X, BEE_SIZE, OBSTACLE_SIZE, LANDED
+from stats import percentile
+
+"""
+    benchmark
+    =========
+    Pomiar czasu klatki menu, rozgrywki i okna wyników. Każda scena działa bez ograniczenia ilości klatek na sekundę
+    przez zadaną ilość klatek, sterowana zdarzeniami wstawianymi do kolejki (ruchy myszki, skoki autopilota).
+    Dla każdej sceny podawany jest średni czas klatki i percentyle p50, p95, p99 oraz pamięć przydzielana
+    w jednej klatce, a wyniki można zapisać do pliku JSON i porównać z wcześniejszym pomiarem:
+
+        python benchmark.py --frames 2000 --output before.json
+        python benchmark.py --frames 2000 --output after.json --compare before.json
+"""
+
+""" Bez okna i bez dźwięku - sterowniki są czytane przy inicjalizacji pygame w setup() """
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+""" Położenia myszki odwiedzane po kolei w menu i w oknie wyników """
+menu_mouse_path = [game.start_button_1_player_position, (600, 300), game.start_button_2_player_position,
+                   game.start_button_settings_position, (700, 100)]
+results_mouse_path = [game.results_return_position, (400, 500), game.results_restart_position, (700, 100)]
+""" Ilość klatek, przez które myszka stoi w jednym miejscu """
+mouse_path_frames = 30
+""" Co ile klatek w menu otwierane lub zamykane jest okienko ustawień """
+settings_toggle_frames = 150
+""" Zapas nad środkiem przerwy, poniżej którego autopilot skacze """
+autopilot_margin = 38
+
+
+class SceneFinished(Exception):
+    """ Zgłaszany przez FrameRecorder po ostatniej mierzonej klatce, przerywa pętlę sceny """
+
+
+class FrameRecorder:
+    """
+    :class FrameRecorder: Funkcja wywoływana po każdej klatce (TrzmielIT.frame_hook), zapisująca czasy klatek
+    i wstawiająca zdarzenia skryptu sterującego sceną
+        :ivar self.frames: Ilość mierzonych klatek
+        :type self.frames: int
+        :ivar self.warmup: Ilość pomijanych klatek na początku sceny
+        :type self.warmup: int
+        :ivar self.script: Funkcja wywoływana z numerem klatki, wstawiająca zdarzenia przed następną klatką
+        :type self.script: Callable[[int], None]
+        :ivar self.trace_memory: True jeśli zamiast czasu mierzona jest pamięć przydzielana w klatce (tracemalloc)
+        :type self.trace_memory: bool
+        :ivar self.samples: Czasy klatek w ms albo ilości przydzielonych w klatce KiB
+        :type self.samples: List[float]
+    """
+
+    def __init__(self, frames, warmup, script, trace_memory=False):
+        self.frames = frames
+        self.warmup = warmup
+        self.script = script
+        self.trace_memory = trace_memory
+        self.samples = []
+        self.frame = 0
+        self.start = None
+
+    def __call__(self):
+        if self.start is not None and self.frame > self.warmup:
+            if self.trace_memory:
+                """ najwyższe zużycie pamięci w tej klatce ponad stan z jej początku """
+                current, peak = tracemalloc.get_traced_memory()
+                self.samples.append((peak - self.start) / 1024)
+            else:
+                self.samples.append((time.perf_counter() - self.start) * 1000)
+        self.frame += 1
+        if len(self.samples) >= self.frames:
+            raise SceneFinished
+        self.script(self.frame)
+        """ czas skryptu nie wlicza się do klatki """
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            self.start = tracemalloc.get_traced_memory()[0]
+        else:
+            self.start = time.perf_counter()
+
+
+def post_key(key, down):
+    """
+    :function post_key: Wstawia do kolejki wciśnięcie lub puszczenie klawisza
+    """
+    pygame.event.post(pygame.event.Event(KEYDOWN if down else KEYUP, key=key, mod=0, unicode='', scancode=0))
+
+
+def post_mouse(position, click=False):
+    """
+    :function post_mouse: Wstawia do kolejki ruch myszki, a jeśli click to również kliknięcie
+    """
+    pygame.event.post(pygame.event.Event(MOUSEMOTION, pos=position, rel=(0, 0), buttons=(0, 0, 0)))
+    if click:
+        pygame.event.post(pygame.event.Event(MOUSEBUTTONDOWN, pos=position, button=1))
+        pygame.event.post(pygame.event.Event(MOUSEBUTTONUP, pos=position, button=1))
+
+
+def mouse_path_script(path):
+    """
+    :function mouse_path_script: Skrypt przesuwający myszkę po kolejnych punktach ścieżki
+    :rtype: Callable[[int], None]
+    """
+    def script(frame):
+        if frame % mouse_path_frames == 0:
+            post_mouse(path[frame // mouse_path_frames % len(path)])
+    return script
+
+
+def menu_script(frame):
+    """
+    :function menu_script: Skrypt menu: myszka nad kolejnymi przyciskami, co jakiś czas otwarcie lub zamknięcie
+    okienka ustawień (przyciski samej gry nie są klikane, żeby menu nie znikało)
+    """
+    if frame % settings_toggle_frames == 0:
+        post_mouse(game.start_button_settings_position, click=True)
+    elif frame % mouse_path_frames == 0:
+        post_mouse(menu_mouse_path[frame // mouse_path_frames % len(menu_mouse_path)])
+
+
+def autopilot_script(worlds):
+    """
+    :function autopilot_script: Skrypt rozgrywki: skok, gdy trzmiel spada poniżej przerwy najbliższej przeszkody
+    :param worlds: Lista, której ostatni element to aktualnie rysowany stan gry
+    :type worlds: List[simulation.World]
+    :rtype: Callable[[int], None]
+    """
+    def script(frame):
+        world = worlds[-1]
+        bee = world.bee
+        ahead = [obstacle for obstacle in world.obstacles
+                 if obstacle.x + (OBSTACLE_SIZE[0] + BEE_SIZE[0]) / 2 > BEE_X]
+        gap_y = min(ahead, key=lambda obstacle: obstacle.x).y
+        jump = not world.started or (bee.y > gap_y + autopilot_margin and bee.y_velocity >= 0)
+        if jump != game.jump_pressed():
+            post_key(K_SPACE, jump)
+    return script
+
+
+def game_script():
+    """
+    :function game_script: Autopilot razem z listą stanów gry, do której game_scene dopisuje kolejne gry
+    """
+    worlds = []
+    return autopilot_script(worlds), (worlds,)
+
+
+def reset_flow():
+    """
+    :function reset_flow: Przywraca zmienne przebiegu gry do stanu z uruchomienia programu
+    """
+    game.SCORE = 0
+    game.course_seed = None
+    game.held_keys.clear()
+    game.inputs = game.InputQueue()
+    pygame.event.clear()
+
+
+def menu_scene(background, seed):
+    """
+    :function menu_scene: Okno startowe
+    """
+    game.build_scenes(background).run('start')
+
+
+def game_scene(background, seed, worlds):
+    """
+    :function game_scene: Rozgrywka, po przegranej kolejne gry (restart skokiem w oknie wyników) na tym samym torze
+    """
+    game.course_seed = seed
+    worlds.append(World(seed))
+    game.build_scenes(background).run('game', world=worlds[-1])
+
+
+def results_scene(background, seed):
+    """
+    :function results_scene: Okno wyników po grze zakończonej od razu po starcie
+    """
+    world = World(seed)
+    world.step(True)
+    while LANDED not in world.step():
+        pass
+    game.build_scenes(background).run('game', world=world)
+
+
+def run_scene(scene, script_factory, background, frames, warmup, seed, trace_memory):
+    """
+    :function run_scene: Uruchamia scenę i zwraca zebrane próbki
+    :param scene: Funkcja sceny, wywoływana z (background, seed, *argumenty skryptu)
+    :param script_factory: Funkcja zwracająca (skrypt, argumenty dla sceny)
+    :return: Próbki i średnie czasy etapów klatki z profilera z ostatnich frames klatek
+    :rtype: Tuple[List[float], Dict[string, float]]
+    """
+    reset_flow()
+    script, scene_args = script_factory()
+    recorder = FrameRecorder(frames, warmup, script, trace_memory)
+    game.profiler = FrameProfiler(game.profile_stages, frames, idle=('wait',))
+    game.frame_hook = recorder
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        scene(background, seed, *scene_args)
+    except SceneFinished:
+        pass
+    finally:
+        game.frame_hook = None
+        if trace_memory:
+            tracemalloc.stop()
+    stages = {stage: stats['mean_ms'] for stage, stats in game.profiler.summary().items() if stage != 'frame'}
+    return recorder.samples, stages
+
+
+def summarize(times, allocations, stages):
+    """
+    :function summarize: Statystyki jednej sceny
+    :param times: Czasy klatek w ms
+    :param allocations: Pamięć przydzielana w klatkach w KiB
+    :param stages: Średnie czasy etapów klatki w ms (tylko etapy występujące w scenie)
+    :rtype: Dict[string, Any]
+    """
+    times = sorted(times)
+    allocations = sorted(allocations)
+    mean = sum(times) / len(times)
+    return {
+        'frames': len(times),
+        'mean_ms': mean,
+        'p50_ms': percentile(times, 0.50),
+        'p95_ms': percentile(times, 0.95),
+        'p99_ms': percentile(times, 0.99),
+        'max_ms': times[-1],
+        'fps': 1000 / mean if mean else 0.0,
+        'alloc_kib_per_frame': sum(allocations) / len(allocations) if allocations else None,
+        'alloc_kib_p95': percentile(allocations, 0.95) if allocations else None,
+        'stages_mean_ms': {stage: value for stage, value in stages.items() if value},
+    }
+
+
+def setup():
+    """
+    :function setup: Inicjalizacja pygame i wczytanie wszystkich zasobów przed pomiarami
+    :return: Przewijane tło wspólne dla scen
+    :rtype: TrzmielIT.ScrollingBackground
+    """
+    pygame.display.init()
+    game.display_screen_window = pygame.display.set_mode((game.src_width, game.src_height))
+    pygame.mixer.init()
+    pygame.init()
+    game.audio.init()
+    game.time_clock = pygame.time.Clock()
+    """ bez ograniczenia ilości klatek na sekundę """
+    game.FPS = 0
+    game.register_assets()
+    game.game_images.preload('start', 'game', 'settings', 'results')
+    for name in list(game.game_sounds.loaders):
+        try:
+            game.game_sounds.load(name)
+        except FileNotFoundError:
+            """ brakujący plik dźwięku nie przeszkadza w pomiarach, o ile scena go nie odtwarza """
+            print(f"Missing sound: {name}", file=sys.stderr)
+    """ Wyniki zapisywane do bazy tymczasowej, żeby nie zmieniać najlepszych wyników gracza """
+    game.game_scores = os.path.join(tempfile.mkdtemp(prefix='trzmiel-benchmark-'), 'scores.sqlite3')
+    game.HIGHSCORE = game.ScoreStore(game.game_scores)
+    """ bez nagrywania powtórek przewijanych scen """
+    game.record_replays = False
+    return game.ScrollingBackground(game.game_images['start_background'], speed=0.05, period=3202)
+
+
+def revision():
+    """
+    :function revision: Zwraca opis wersji kodu z gita (None jeśli niedostępny)
+    :rtype: Optional[string]
+    """
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+""" Sceny: nazwa -> (funkcja sceny, funkcja zwracająca (skrypt, argumenty sceny)) """
+SCENES = {
+    'menu': (menu_scene, lambda: (menu_script, ())),
+    'game': (game_scene, game_script),
+    'results': (results_scene, lambda: (mouse_path_script(results_mouse_path), ())),
+}
+
+
+def run(scenes, frames, warmup, seed, memory=True):
+    """
+    :function run: Mierzy wybrane sceny
+    :param scenes: Nazwy scen
+    :param frames: Ilość mierzonych klatek w każdej scenie
+    :param warmup: Ilość pomijanych klatek na początku sceny
+    :param seed: Ziarno torów gry
+    :param memory: True jeśli ma być mierzona pamięć przydzielana w klatce (osobny przebieg)
+    :return: Wyniki w postaci gotowej do zapisu jako JSON
+    :rtype: Dict[string, Any]
+    """
+    background = setup()
+    results = {
+        'revision': revision(),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'frames': frames,
+        'warmup': warmup,
+        'seed': seed,
+        'scenes': {},
+    }
+    for name in scenes:
+        scene, script_factory = SCENES[name]
+        times, stages = run_scene(scene, script_factory, background, frames, warmup, seed, False)
+        """ tracemalloc spowalnia klatki, dlatego pamięć mierzona jest w osobnym przebiegu """
+        allocations = (run_scene(scene, script_factory, background, frames, warmup, seed, True)[0]
+                       if memory else [])
+        results['scenes'][name] = summarize(times, allocations, stages)
+    return results
+
+
+def format_report(results, baseline=None):
+    """
+    :function format_report: Tabela wyników, a jeśli podano baseline to ze zmianą względem niego
+    :rtype: string
+    """
+    lines = [f"{'scene':<10}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'fps':>9}{'KiB/frame':>11}"]
+    for name, stats in results['scenes'].items():
+        allocated = stats['alloc_kib_per_frame']
+        lines.append(f"{name:<10}{stats['mean_ms']:>9.3f}{stats['p50_ms']:>9.3f}{stats['p95_ms']:>9.3f}"
+                     f"{stats['p99_ms']:>9.3f}{stats['fps']:>9.0f}"
+                     f"{'-' if allocated is None else format(allocated, '.2f'):>11}")
+        before = baseline['scenes'].get(name) if baseline else None
+        if before:
+            changes = [f"{(stats[key] / before[key] - 1) * 100:+8.1f}%" if before[key] else f"{'-':>9}"
+                       for key in ('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms')]
+            lines.append(f"{'  vs base':<10}{''.join(changes)}")
+        slowest = sorted(stats['stages_mean_ms'].items(), key=lambda item: item[1], reverse=True)[:4]
+        lines.append(f"{'':<10}" + ", ".join(f"{stage} {value:.3f}" for stage, value in slowest))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Frame-time benchmark of TrzmielIT scenes (headless).")
+    parser.add_argument('--frames', type=int, default=1000, help="measured frames per scene")
+    parser.add_argument('--warmup', type=int, default=60, help="frames skipped at the start of each scene")
+    parser.add_argument('--scenes', nargs='+', choices=list(SCENES), default=list(SCENES))
+    parser.add_argument('--seed', type=int, default=0, help="seed of the game courses")
+    parser.add_argument('--no-memory', action='store_true', help="skip the allocation pass")
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--compare', help="JSON file of an earlier run to compare with")
+    args = parser.parse_args(argv)
+
+    """ wyniki, z którymi porównujemy, czytane od razu - plik może być tym samym co --output """
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    results = run(args.scenes, args.frames, args.warmup, args.seed, not args.no_memory)
+    print(format_report(results, baseline))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    game.HIGHSCORE.close()
+    shutil.rmtree(os.path.dirname(game.game_scores))
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
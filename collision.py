@@ -0,0 +1,233 @@
+import json
+import os
+
+"""
+    collision
+    =========
+    Dokładne co do piksela kolizje trzmiela z przeszkodą, bez pygame.
+    Kształty obrazków (trzmiela w każdej klatce animacji i przeszkody) zapisane są w data/collision_shapes.json
+    jako listy odcinków nieprzezroczystych pikseli w każdym wierszu. Przeszkoda składa się z dwóch części
+    (górnej i dolnej) rozdzielonych przerwą, które można rozsunąć, żeby zmienić wielkość przerwy.
+    Plik tworzy się z obrazków gry poleceniem
+        python collision.py
+    po każdej zmianie obrazków trzmiela lub przeszkody. Wynik testu dla danej klatki i przesunięcia
+    zapisywany jest w tablicy hit_table (jeden bajt na położenie, razem kilka MB niezależnie od długości gry),
+    więc każde położenie liczone jest tylko raz.
+"""
+
+SHAPES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'collision_shapes.json')
+
+
+class Shape:
+    """
+    :class Shape: Kształt obrazka jako odcinki nieprzezroczystych pikseli w kolejnych wierszach,
+    we współrzędnych względem środka obrazka (tak jak pygame.Rect(center=...))
+        :ivar self.width: Szerokość obrazka
+        :type self.width: int
+        :ivar self.height: Wysokość obrazka
+        :type self.height: int
+        :ivar self.top: Położenie pierwszego wiersza względem środka
+        :type self.top: int
+        :ivar self.rows: Odcinki (x od, x do włącznie) w każdym wierszu, względem środka
+        :type self.rows: Tuple[Tuple[Tuple[int, int], ...], ...]
+        :ivar self.parts: Części obrazka - przedziały (pierwszy, ostatni) niepustych wierszy
+        :type self.parts: List[Tuple[int, int]]
+        :ivar self.left: Najmniejsze x nieprzezroczystego piksela względem środka
+        :type self.left: int
+        :ivar self.right: Największe x nieprzezroczystego piksela względem środka
+        :type self.right: int
+    """
+
+    def __init__(self, width, height, rows):
+        self.width = width
+        self.height = height
+        self.top = -(height // 2)
+        center_x = width // 2
+        self.rows = tuple(tuple((left - center_x, right - center_x) for left, right in row) for row in rows)
+        self.parts = []
+        for i, row in enumerate(self.rows):
+            if not row:
+                continue
+            if self.parts and self.parts[-1][1] == i - 1:
+                self.parts[-1] = (self.parts[-1][0], i)
+            else:
+                self.parts.append((i, i))
+        spans = [span for row in self.rows for span in row]
+        self.left = min(left for left, _ in spans)
+        self.right = max(right for _, right in spans)
+
+    @classmethod
+    def from_mask(cls, mask):
+        """
+        :function from_mask: Tworzy kształt z maski obrazka
+        :param mask: Maska (np. pygame.mask.Mask)
+        :rtype: Shape
+        """
+        width, height = mask.get_size()
+        rows = []
+        for y in range(height):
+            row = []
+            x = 0
+            while x < width:
+                if mask.get_at((x, y)):
+                    start = x
+                    while x < width and mask.get_at((x, y)):
+                        x += 1
+                    row.append((start, x - 1))
+                else:
+                    x += 1
+            rows.append(row)
+        return cls(width, height, rows)
+
+    def to_json(self):
+        """
+        :function to_json: Zwraca kształt w postaci do zapisu (odcinki we współrzędnych obrazka)
+        :rtype: Dict[string, Any]
+        """
+        center_x = self.width // 2
+        return {'size': [self.width, self.height],
+                'rows': [[[left + center_x, right + center_x] for left, right in row] for row in self.rows]}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data['size'][0], data['size'][1], [[tuple(span) for span in row] for row in data['rows']])
+
+
+def load_shapes(path=SHAPES_FILE):
+    """
+    :function load_shapes: Wczytuje kształty trzmiela i przeszkody
+    :return: Kształty klatek trzmiela i kształt przeszkody
+    :rtype: Tuple[List[Shape], Shape]
+    """
+    with open(path) as f:
+        data = json.load(f)
+    return [Shape.from_json(frame) for frame in data['bee']], Shape.from_json(data['obstacle'])
+
+
+bee_shapes, obstacle_shape = load_shapes()
+""" REACH : int
+        Najmniejsza odległość środków w poziomie, przy której trzmiel i przeszkoda na pewno się nie stykają
+    DY_LIMIT : int
+        Odległość środków w pionie, poza którą wynik testu już się nie zmienia
+    GAP_SIZE : int
+        Wysokość przerwy pomiędzy częściami przeszkody na obrazku
+"""
+REACH = max(max(shape.right for shape in bee_shapes) - obstacle_shape.left,
+            obstacle_shape.right - min(shape.left for shape in bee_shapes)) + 1
+DY_LIMIT = obstacle_shape.height + max(shape.height for shape in bee_shapes)
+GAP_SIZE = obstacle_shape.parts[1][0] - obstacle_shape.parts[0][1] - 1
+""" COLUMNS, ROWS : int
+        Ilość przesunięć w poziomie (dx od -REACH + 1 do REACH - 1) i w pionie (dy od -DY_LIMIT do DY_LIMIT)
+    UNKNOWN, MISS, HIT : int
+        Wartości w hit_table: jeszcze nie policzone, brak kolizji, kolizja
+    hit_table : bytearray
+        Wyniki collides_part dla kolejnych (klatka, część, dx + REACH - 1, dy + DY_LIMIT), uzupełniane przy
+        pierwszym użyciu; batch_simulation czyta tę samą tablicę jako tablicę NumPy
+"""
+COLUMNS = 2 * REACH - 1
+ROWS = 2 * DY_LIMIT + 1
+UNKNOWN, MISS, HIT = 0, 1, 2
+hit_table = bytearray(len(bee_shapes) * 2 * COLUMNS * ROWS)
+
+
+def split_gap(gap):
+    """
+    :function split_gap: Zwraca przesunięcia części przeszkody przy danej wielkości przerwy
+    :param gap: Wysokość przerwy
+    :type gap: int
+    :return: Przesunięcie górnej części w górę i dolnej w dół względem obrazka
+    :rtype: Tuple[int, int]
+    """
+    extra = gap - GAP_SIZE
+    return extra // 2, extra - extra // 2
+
+
+def collides(frame, dx, dy, gap=GAP_SIZE):
+    """
+    :function collides: Sprawdza czy trzmiel styka się z przeszkodą, piksel po pikselu
+    :param frame: Numer klatki animacji trzmiela
+    :type frame: int
+    :param dx: Położenie środka przeszkody względem środka trzmiela w poziomie
+    :type dx: int
+    :param dy: Położenie środka trzmiela względem środka przerwy w pionie
+    :type dy: int
+    :param gap: Wysokość przerwy
+    :type gap: int
+    :rtype: bool
+    """
+    up, down = split_gap(gap)
+    return collides_part(frame, 0, dx, dy + up) or collides_part(frame, 1, dx, dy - down)
+
+
+def collides_part(frame, part, dx, dy):
+    """
+    :function collides_part: Sprawdza czy trzmiel styka się z częścią przeszkody (0 - górna, 1 - dolna).
+    Górna część jest nieskończona w górę, a dolna w dół - wiersze poza obrazkiem są takie jak skrajne.
+    Wynik brany jest z hit_table, a liczony (test_part) tylko przy pierwszym użyciu położenia.
+    :param frame: Numer klatki animacji trzmiela
+    :type frame: int
+    :param part: Numer części przeszkody
+    :type part: int
+    :param dx: Położenie środka przeszkody względem środka trzmiela w poziomie
+    :type dx: int
+    :param dy: Położenie środka trzmiela względem środka przeszkody na obrazku w pionie
+    :type dy: int
+    :rtype: bool
+    """
+    if not -REACH < dx < REACH:
+        return False
+    dy = max(-DY_LIMIT, min(DY_LIMIT, dy))
+    index = ((frame * 2 + part) * COLUMNS + dx + REACH - 1) * ROWS + dy + DY_LIMIT
+    value = hit_table[index]
+    if value == UNKNOWN:
+        value = hit_table[index] = HIT if test_part(frame, part, dx, dy) else MISS
+    return value == HIT
+
+
+def test_part(frame, part, dx, dy):
+    """
+    :function test_part: Test piksel po pikselu dla collides_part (dx w przedziale (-REACH, REACH),
+    dy w przedziale [-DY_LIMIT, DY_LIMIT])
+    :rtype: bool
+    """
+    bee = bee_shapes[frame]
+    obstacle = obstacle_shape
+    first_row, last_row = obstacle.parts[part]
+    """ wiersz przeszkody odpowiadający pierwszemu wierszowi trzmiela """
+    offset = bee.top + dy - obstacle.top
+    for first, end in bee.parts:
+        for i in range(first, end + 1):
+            row = offset + i
+            if part == 0:
+                row = max(row, first_row)
+            else:
+                row = min(row, last_row)
+            if not first_row <= row <= last_row:
+                continue
+            for left, right in bee.rows[i]:
+                for pipe_left, pipe_right in obstacle.rows[row]:
+                    if left <= pipe_right + dx and pipe_left + dx <= right:
+                        return True
+    return False
+
+
+def build_shapes(path=SHAPES_FILE):
+    """
+    :function build_shapes: Tworzy plik kształtów z obrazków gry, w rozmiarach, w jakich są rysowane (wymaga pygame)
+    :param path: Adres pliku wynikowego
+    :type path: string
+    """
+    import pygame
+    import TrzmielIT as game
+    from assets import read_image
+
+    bee = [Shape.from_mask(pygame.mask.from_surface(read_image(image, game.trzmiel_size, smooth=True)))
+           for image in game.trzmiel_images]
+    obstacle = Shape.from_mask(pygame.mask.from_surface(read_image(game.game_obstacle_image, game.obstacle_size)))
+    with open(path, 'w') as f:
+        json.dump({'bee': [shape.to_json() for shape in bee], 'obstacle': obstacle.to_json()}, f,
+                  separators=(',', ':'))
+
+
+if __name__ == "__main__":
+    build_shapes()
@@ -0,0 +1,183 @@
+import time
+from collections import deque
+
+import pygame
+
+"""
+    controls
+    ========
+    Wejście z dokładnością do kroku symulacji. Zdarzenia odbierane są także w trakcie czekania na zegar klatki
+    (pygame.event.wait), a każde dostaje czas nadejścia, więc wiadomo, pomiędzy którymi krokami symulacji
+    przyszło. Zmiany stanu klawisza skoku trafiają na oś czasu (JumpTimeline), z której każdy krok bierze stan
+    z własnej chwili - naciśnięcie krótsze niż klatka, a nawet krótsze niż krok, nie ginie, a skok wykonywany
+    jest w pierwszym kroku po naciśnięciu, a nie w pierwszym kroku klatki.
+    Dla skoków gracza mierzony jest czas od nadejścia naciśnięcia do wyświetlenia klatki, w której trzmiel
+    już skoczył (opóźnienie wejścia).
+    Czasy w milisekundach według time.perf_counter.
+"""
+
+"""
+    Stałe wejścia
+    -------------
+    JUMP_KEYS : Tuple[int, ...]
+        Klawisze skoku
+    TIMELINE_LENGTH : int
+        Ilość pamiętanych zmian stanu skoku, gdy żadna scena ich nie odczytuje (np. w menu)
+"""
+JUMP_KEYS = (pygame.K_SPACE, pygame.K_UP)
+TIMELINE_LENGTH = 64
+
+
+def now_ms():
+    """
+    :function now_ms: Aktualny czas w milisekundach
+    :rtype: float
+    """
+    return time.perf_counter() * 1000
+
+
+class JumpTimeline:
+    """
+    :class JumpTimeline: Oś czasu stanu skoku (wciśnięty którykolwiek z JUMP_KEYS)
+        :ivar self.keys: Aktualnie wciśnięte klawisze skoku
+        :type self.keys: Set[int]
+        :ivar self.changes: Nieodczytane zmiany stanu skoku (czas, wciśnięty), od najstarszej
+        :type self.changes: deque[Tuple[float, bool]]
+        :ivar self.held: Stan skoku po ostatniej odczytanej zmianie
+        :type self.held: bool
+        :ivar self.press_time: Czas naciśnięcia odczytanego w ostatnim sample (None - krok bez nowego naciśnięcia)
+        :type self.press_time: float
+    """
+
+    def __init__(self):
+        self.keys = set()
+        self.changes = deque(maxlen=TIMELINE_LENGTH)
+        self.held = False
+        self.press_time = None
+
+    def record(self, stamp, key, down):
+        """
+        :function record: Zapisuje naciśnięcie lub puszczenie klawisza skoku
+        :param stamp: Czas nadejścia zdarzenia
+        :type stamp: float
+        :param key: Klawisz
+        :type key: int
+        :param down: True - naciśnięcie
+        :type down: bool
+        """
+        was_down = bool(self.keys)
+        if down:
+            self.keys.add(key)
+        else:
+            self.keys.discard(key)
+        if bool(self.keys) != was_down:
+            self.changes.append((stamp, not was_down))
+
+    def sample(self, tick_time):
+        """
+        :function sample: Stan skoku dla kroku symulacji w chwili tick_time. Naciśnięcie od poprzedniego kroku
+        liczy się jako skok, nawet jeśli klawisz został już puszczony.
+        :param tick_time: Chwila kroku
+        :type tick_time: float
+        :return: True jeśli skok jest wciśnięty
+        :rtype: bool
+        """
+        changes = self.changes
+        self.press_time = None
+        pressed = self.held
+        while changes and changes[0][0] <= tick_time:
+            stamp, self.held = changes.popleft()
+            if self.held:
+                pressed = True
+                if self.press_time is None:
+                    self.press_time = stamp
+        return pressed
+
+    def skip(self):
+        """
+        :function skip: Odrzuca nieodczytane zmiany (np. z menu przed rozpoczęciem gry), zostawiając stan klawiszy
+        """
+        self.changes.clear()
+        self.held = bool(self.keys)
+        self.press_time = None
+
+
+class InputQueue:
+    """
+    :class InputQueue: Zdarzenia pygame z czasem nadejścia i pomiar opóźnienia wejścia
+        :ivar self.jump: Oś czasu skoku
+        :type self.jump: JumpTimeline
+        :ivar self.pending: Zdarzenia odebrane w trakcie czekania na zegar, do obsłużenia w następnej klatce
+        :type self.pending: List[pygame.event.Event]
+        :ivar self.frame_time: Chwila rozpoczęcia bieżącej klatki (po czekaniu na zegar)
+        :type self.frame_time: float
+        :ivar self.shown_press: Czas naciśnięcia, po którym trzmiel skoczył, a klatka nie została jeszcze
+            wyświetlona (None - brak)
+        :type self.shown_press: float
+    """
+
+    def __init__(self):
+        self.jump = JumpTimeline()
+        self.pending = []
+        self.frame_time = now_ms()
+        self.shown_press = None
+
+    def receive(self, event, stamp):
+        """
+        :function receive: Zapisuje zdarzenie razem z czasem nadejścia
+        """
+        if event.type in (pygame.KEYDOWN, pygame.KEYUP) and event.key in JUMP_KEYS:
+            self.jump.record(stamp, event.key, event.type == pygame.KEYDOWN)
+        self.pending.append(event)
+
+    def collect(self):
+        """
+        :function collect: Odbiera czekające zdarzenia
+        :return: Zdarzenia od poprzedniego collect, w kolejności nadejścia
+        :rtype: List[pygame.event.Event]
+        """
+        stamp = now_ms()
+        for event in pygame.event.get():
+            self.receive(event, stamp)
+        events, self.pending = self.pending, []
+        return events
+
+    def wait(self, deadline):
+        """
+        :function wait: Czeka do chwili deadline (z dokładnością do milisekundy), odbierając zdarzenia w chwili
+        nadejścia
+        :param deadline: Chwila końca czekania
+        :type deadline: float
+        """
+        while True:
+            remaining = int(deadline - now_ms())
+            if remaining < 1:
+                return
+            event = pygame.event.wait(remaining)
+            if event.type != pygame.NOEVENT:
+                self.receive(event, now_ms())
+
+    def start_frame(self):
+        """
+        :function start_frame: Zapamiętuje chwilę rozpoczęcia klatki (po czekaniu na zegar)
+        """
+        self.frame_time = now_ms()
+
+    def jumped(self):
+        """
+        :function jumped: Wywoływana, gdy trzmiel skoczył w kroku odczytanym z self.jump
+        """
+        if self.shown_press is None and self.jump.press_time is not None:
+            self.shown_press = self.jump.press_time
+
+    def presented(self):
+        """
+        :function presented: Wywoływana po wyświetleniu klatki
+        :return: Opóźnienie wejścia w ms, jeśli wyświetlona klatka pierwsza pokazuje skok (inaczej None)
+        :rtype: float
+        """
+        if self.shown_press is None:
+            return None
+        latency = now_ms() - self.shown_press
+        self.shown_press = None
+        return latency
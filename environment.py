@@ -0,0 +1,515 @@
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from collision import REACH
+from simulation import (World, TICK_RATE, WORLD_WIDTH, WORLD_HEIGHT, BEE_X, JUMP_VELOCITY, POINT, DIFFICULTIES,
+                        OBSTACLE_SIZE, BEE_SIZE)
+
+try:
+    import gymnasium
+    from gymnasium import spaces
+except ImportError:
+    gymnasium = None
+
+"""
+    environment
+    ===========
+    Środowisko do uczenia botów (API w stylu Gymnasium) działające na simulation.World, bez okna i bez pygame.
+    reset(seed) zaczyna nową grę, a step(action) przesuwa ją o ticks_per_step kroków symulacji z wciśniętym
+    (action = 1) albo puszczonym (action = 0) przyciskiem skoku. Nagrodą jest ilość punktów zdobytych w kroku,
+    gra kończy się (terminated) w chwili uderzenia w przeszkodę.
+    VectorEnv rozkłada wiele środowisk na procesy robocze. Obserwacje, nagrody i flagi końca gry leżą w pamięci
+    współdzielonej, więc w jednym kroku przez potoki przechodzą tylko krótkie polecenia, a nie tablice.
+    Obrazy gry (render) są rysowane tylko na żądanie, a pygame i obrazki wczytywane są przy pierwszym rysowaniu.
+    Gymnasium nie jest wymagane - gdy jest zainstalowane, TrzmielEnv dziedziczy po gymnasium.Env i ma opisane
+    przestrzenie obserwacji i akcji.
+    Pomiar szybkości (kroki na sekundę) i średniego wyniku autopilota:
+        python environment.py [--envs 64] [--workers 4] [--steps 2000] [--render frame.png]
+"""
+
+"""
+    Stałe środowiska
+    ----------------
+    OBSERVATION_SIZE : int
+        Długość obserwacji: y trzmiela, prędkość trzmiela (w jednostkach prędkości skoku) oraz (odległość w poziomie,
+        środek przerwy, wysokość przerwy) dla dwóch najbliższych przeszkód, w które trzmiel może jeszcze uderzyć;
+        położenia i wymiary w ułamkach szerokości lub wysokości świata gry
+    OBSTACLES_AHEAD : int
+        Ilość przeszkód opisanych w obserwacji
+    TICKS_PER_STEP : int
+        Domyślna ilość kroków symulacji na jeden krok środowiska (30 decyzji na sekundę gry, jak w oknie gry)
+    RENDER_FPS : int
+        Ilość klatek na sekundę gry przy domyślnym ticks_per_step
+"""
+OBSTACLES_AHEAD = 2
+OBSERVATION_SIZE = 2 + 3 * OBSTACLES_AHEAD
+TICKS_PER_STEP = 4
+RENDER_FPS = TICK_RATE // TICKS_PER_STEP
+
+
+def observe(world, out):
+    """
+    :function observe: Zapisuje obserwację gry do tablicy
+    :param world: Gra
+    :type world: simulation.World
+    :param out: Tablica o długości OBSERVATION_SIZE
+    :type out: np.ndarray
+    """
+    bee = world.bee
+    out[0] = bee.y / WORLD_HEIGHT
+    out[1] = bee.y_velocity / -JUMP_VELOCITY
+    obstacles = world.obstacles
+    """ przeszkody leżą w puli po kolei, a next_obstacle to najbliższa, za którą trzmiel nie dostał jeszcze punktu;
+        ostatnio minięta liczy się, dopóki trzmiel może w nią uderzyć """
+    first = world.next_obstacle
+    if BEE_X - REACH < obstacles[first - 1].x <= BEE_X:
+        first -= 1
+    for i in range(OBSTACLES_AHEAD):
+        obstacle = obstacles[(first + i) % len(obstacles)]
+        out[2 + 3 * i] = (obstacle.x - BEE_X) / WORLD_WIDTH
+        out[3 + 3 * i] = obstacle.y / WORLD_HEIGHT
+        out[4 + 3 * i] = obstacle.gap / WORLD_HEIGHT
+
+
+def autopilot(observation, margin=35):
+    """
+    :function autopilot: Prosty gracz działający na obserwacji - skacze, gdy trzmiel spada poniżej środka przerwy
+    najbliższej przeszkody (jak network.autopilot)
+    :param observation: Obserwacja środowiska
+    :type observation: np.ndarray
+    :param margin: Zapas pod środkiem przerwy w pikselach
+    :type margin: int
+    :return: Akcja (1 - skok, 0 - brak skoku)
+    :rtype: int
+    """
+    return int(observation[0] * WORLD_HEIGHT > observation[3] * WORLD_HEIGHT + margin and observation[1] > 0)
+
+
+class FrameRenderer:
+    """
+    :class FrameRenderer: Rysuje stan gry poza oknem tymi samymi klasami co gra (TrzmielIT.Obstacle,
+    TrzmielIT.TrzmielSprite) i zwraca go jako tablicę RGB
+        :ivar self.surface: Powierzchnia o rozmiarze świata gry
+        :type self.surface: pygame.Surface
+        :ivar self.background: Warstwa tła przesuwana razem z krokami gry
+        :type self.background: TrzmielIT.BackgroundLayer
+        :ivar self.obstacles: Obiekty rysujące przeszkody, po jednym na przeszkodę w puli gry
+        :type self.obstacles: List[TrzmielIT.Obstacle]
+        :ivar self.trzmiel: Obiekt rysujący trzmiela
+        :type self.trzmiel: TrzmielIT.TrzmielSprite
+    """
+
+    def __init__(self):
+        import pygame
+        import TrzmielIT as game
+        from assets import read_image
+        self.surface = pygame.Surface((WORLD_WIDTH, WORLD_HEIGHT))
+        """ tło przesuwa się jak w grze (ScrollingBackground w oknie gry), ale zależnie od numeru kroku """
+        self.background = game.BackgroundLayer(read_image(game.start_background_image), period=3202)
+        self.speed = 0.05 * 1000 / TICK_RATE
+        self.obstacle_image = read_image(game.game_obstacle_image, OBSTACLE_SIZE)
+        self.obstacles = []
+        images = [read_image(path, BEE_SIZE, smooth=True) for path in game.trzmiel_images]
+        self.trzmiel = game.TrzmielSprite((BEE_X, 0), game.RotationCache(images))
+        self.Obstacle = game.Obstacle
+        self.pixels = pygame.surfarray.pixels3d
+
+    def render(self, world):
+        """
+        :function render: Rysuje grę
+        :param world: Gra
+        :type world: simulation.World
+        :return: Obraz o kształcie (WORLD_HEIGHT, WORLD_WIDTH, 3)
+        :rtype: np.ndarray
+        """
+        while len(self.obstacles) < len(world.obstacles):
+            self.obstacles.append(self.Obstacle(self.obstacle_image))
+        self.background.offset = (world.tick * self.speed) % self.background.period
+        self.background.draw(self.surface)
+        for sprite, obstacle in zip(self.obstacles, world.obstacles):
+            sprite.show(obstacle, 1.0)
+            sprite.draw(self.surface)
+        self.trzmiel.show(world.bee, 1.0)
+        self.surface.blit(self.trzmiel.image, self.trzmiel.rect)
+        """ surfarray ma osie (x, y), a obrazy RGB (wiersz, kolumna) """
+        return np.array(self.pixels(self.surface).transpose(1, 0, 2))
+
+
+class TrzmielEnv(gymnasium.Env if gymnasium else object):
+    """
+    :class TrzmielEnv: Jedna gra jako środowisko do uczenia
+        :ivar self.world: Gra
+        :type self.world: simulation.World
+        :ivar self.difficulty: Nazwa krzywej trudności z DIFFICULTIES
+        :type self.difficulty: string
+        :ivar self.ticks_per_step: Ilość kroków symulacji na jeden krok środowiska
+        :type self.ticks_per_step: int
+        :ivar self.max_ticks: Ilość kroków symulacji, po której gra jest przerywana (truncated), None - bez limitu
+        :type self.max_ticks: int
+        :ivar self.render_mode: 'rgb_array' albo None (bez rysowania)
+        :type self.render_mode: string
+        :ivar self.random: Generator ziaren kolejnych gier, ustawiany przez reset(seed)
+        :type self.random: random.Random
+        :ivar self.observation: Ostatnia obserwacja
+        :type self.observation: np.ndarray
+    """
+
+    metadata = {'render_modes': ['rgb_array'], 'render_fps': RENDER_FPS}
+
+    def __init__(self, difficulty='classic', render_mode=None, ticks_per_step=TICKS_PER_STEP, max_ticks=None):
+        if render_mode not in (None, 'rgb_array'):
+            raise ValueError(f"Unsupported render mode {render_mode!r}")
+        self.difficulty = difficulty
+        self.render_mode = render_mode
+        self.ticks_per_step = ticks_per_step
+        self.max_ticks = max_ticks
+        self.random = random.Random()
+        self.world = World(difficulty=difficulty)
+        self.observation = np.zeros(OBSERVATION_SIZE, dtype=np.float32)
+        self.renderer = None
+        if gymnasium:
+            self.observation_space = spaces.Box(-np.inf, np.inf, (OBSERVATION_SIZE,), np.float32)
+            self.action_space = spaces.Discrete(2)
+
+    def reset(self, seed=None, options=None):
+        """
+        :function reset: Zaczyna nową grę; trzmiel od razu leci (bez czekania na pierwszy skok)
+        :param seed: Ziarno generatora torów - ta sama wartość daje ten sam ciąg gier w kolejnych reset()
+            (None - następna gra z dotychczasowego generatora)
+        :type seed: int
+        :param options: Nieużywane (zgodność z Gymnasium)
+        :return: Obserwacja i informacje o grze
+        :rtype: Tuple[np.ndarray, dict]
+        """
+        if seed is not None:
+            self.random.seed(seed)
+        self.world.reset(self.random.randrange(2 ** 32), difficulty=self.difficulty)
+        self.world.start()
+        observe(self.world, self.observation)
+        return self.observation.copy(), self.info()
+
+    def step(self, action):
+        """
+        :function step: Przesuwa grę o ticks_per_step kroków symulacji. Przycisk skoku jest wciśnięty przez cały
+        krok środowiska, a trzmiel skacze tylko przy wciśnięciu (przytrzymanie nie daje kolejnych skoków)
+        :param action: 1 - przycisk skoku wciśnięty, 0 - puszczony
+        :type action: int
+        :return: Obserwacja, nagroda (ilość zdobytych punktów), terminated (uderzenie w przeszkodę),
+            truncated (przekroczony max_ticks) i informacje o grze
+        :rtype: Tuple[np.ndarray, float, bool, bool, dict]
+        """
+        world = self.world
+        jump = bool(action)
+        reward = 0
+        for _ in range(self.ticks_per_step):
+            reward += world.step(jump).count(POINT)
+            if world.bee.collision:
+                break
+        observe(world, self.observation)
+        terminated = world.bee.collision
+        truncated = not terminated and self.max_ticks is not None and world.tick >= self.max_ticks
+        return self.observation.copy(), float(reward), terminated, truncated, self.info()
+
+    def info(self):
+        """
+        :function info: Informacje o grze zwracane przez reset() i step()
+        :rtype: dict
+        """
+        return {'score': self.world.score, 'tick': self.world.tick, 'seed': self.world.seed}
+
+    def render(self):
+        """
+        :function render: Rysuje aktualny stan gry (tylko w trybie 'rgb_array')
+        :return: Obraz RGB o kształcie (WORLD_HEIGHT, WORLD_WIDTH, 3) albo None
+        :rtype: np.ndarray
+        """
+        if self.render_mode != 'rgb_array':
+            return None
+        if self.renderer is None:
+            self.renderer = FrameRenderer()
+        return self.renderer.render(self.world)
+
+    def close(self):
+        """
+        :function close: Zwalnia obiekty do rysowania
+        """
+        self.renderer = None
+
+
+class SharedBuffers:
+    """
+    :class SharedBuffers: Tablice NumPy środowiska wektorowego w pamięci współdzielonej między procesami
+        :ivar self.memory: Blok pamięci współdzielonej
+        :type self.memory: multiprocessing.shared_memory.SharedMemory
+        :ivar self.observations: Obserwacje, kształt (N, OBSERVATION_SIZE)
+        :type self.observations: np.ndarray
+        :ivar self.rewards: Nagrody z ostatniego kroku, kształt (N,)
+        :type self.rewards: np.ndarray
+        :ivar self.terminated: Flagi uderzenia w przeszkodę w ostatnim kroku, kształt (N,)
+        :type self.terminated: np.ndarray
+        :ivar self.truncated: Flagi przerwania gry w ostatnim kroku, kształt (N,)
+        :type self.truncated: np.ndarray
+        :ivar self.actions: Akcje na następny krok, kształt (N,)
+        :type self.actions: np.ndarray
+    """
+
+    def __init__(self, count, name=None):
+        layout = [('observations', np.float32, (count, OBSERVATION_SIZE)), ('rewards', np.float32, (count,)),
+                  ('terminated', np.bool_, (count,)), ('truncated', np.bool_, (count,)),
+                  ('actions', np.int8, (count,))]
+        size = sum(np.dtype(dtype).itemsize * int(np.prod(shape)) for _, dtype, shape in layout)
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        offset = 0
+        for field, dtype, shape in layout:
+            array = np.ndarray(shape, dtype, self.memory.buf, offset)
+            setattr(self, field, array)
+            offset += array.nbytes
+
+    def close(self):
+        """
+        :function close: Odłącza tablice od pamięci współdzielonej (po tym nie wolno ich używać)
+        """
+        self.observations = self.rewards = self.terminated = self.truncated = self.actions = None
+        self.memory.close()
+
+
+def run_worker(connection, memory_name, count, start, stop, arguments):
+    """
+    :function run_worker: Pętla procesu roboczego VectorEnv - prowadzi środowiska o indeksach [start, stop)
+    i wykonuje polecenia z potoku: ('reset', ziarna), ('step',), ('render', indeks), ('close',).
+    Wyniki kroków zapisuje do pamięci współdzielonej, a potokiem odsyła tylko informacje o skończonych grach
+    :param connection: Koniec potoku procesu roboczego
+    :type connection: multiprocessing.connection.Connection
+    :param memory_name: Nazwa bloku pamięci współdzielonej
+    :param count: Ilość wszystkich środowisk
+    :param arguments: Argumenty TrzmielEnv
+    :type arguments: dict
+    """
+    buffers = SharedBuffers(count, memory_name)
+    envs = [TrzmielEnv(**arguments) for _ in range(start, stop)]
+    try:
+        while True:
+            command = connection.recv()
+            if command[0] == 'step':
+                finished = {}
+                for index, env in enumerate(envs, start):
+                    observation, reward, terminated, truncated, info = env.step(buffers.actions[index])
+                    buffers.rewards[index] = reward
+                    buffers.terminated[index] = terminated
+                    buffers.truncated[index] = truncated
+                    if terminated or truncated:
+                        """ nowa gra zaczyna się od razu, a obserwacja końca gry trafia do informacji """
+                        info['final_observation'] = observation
+                        finished[index] = info
+                        observation, _ = env.reset()
+                    buffers.observations[index] = observation
+                connection.send(finished)
+            elif command[0] == 'reset':
+                seeds = command[1]
+                for index, env in enumerate(envs, start):
+                    observation, _ = env.reset(seeds[index - start])
+                    buffers.observations[index] = observation
+                buffers.rewards[start:stop] = 0
+                buffers.terminated[start:stop] = False
+                buffers.truncated[start:stop] = False
+                connection.send(None)
+            elif command[0] == 'render':
+                connection.send(envs[command[1] - start].render())
+            else:
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        buffers.close()
+        connection.close()
+
+
+class VectorEnv:
+    """
+    :class VectorEnv: Wiele środowisk TrzmielEnv rozłożonych po równo na procesy robocze, krokowanych razem.
+    Gra, która się skończyła, zaczyna się od nowa w tym samym kroku (jej ostatnia obserwacja i wynik są
+    w informacjach kroku pod indeksem środowiska).
+        :ivar self.count: Ilość środowisk
+        :type self.count: int
+        :ivar self.buffers: Tablice w pamięci współdzielonej
+        :type self.buffers: SharedBuffers
+        :ivar self.workers: Procesy robocze
+        :type self.workers: List[multiprocessing.Process]
+        :ivar self.connections: Potoki do procesów roboczych
+        :type self.connections: List[multiprocessing.connection.Connection]
+        :ivar self.ranges: Zakresy indeksów środowisk (start, stop) kolejnych procesów roboczych
+        :type self.ranges: List[Tuple[int, int]]
+    """
+
+    def __init__(self, count, workers=None, difficulty='classic', render_mode=None, ticks_per_step=TICKS_PER_STEP,
+                 max_ticks=None):
+        self.count = count
+        workers = max(1, min(count, workers or os.cpu_count() or 1))
+        arguments = {'difficulty': difficulty, 'render_mode': render_mode, 'ticks_per_step': ticks_per_step,
+                     'max_ticks': max_ticks}
+        self.buffers = SharedBuffers(count)
+        self.workers = []
+        self.connections = []
+        self.ranges = []
+        context = multiprocessing.get_context('spawn')
+        for worker in range(workers):
+            start, stop = count * worker // workers, count * (worker + 1) // workers
+            connection, child = context.Pipe()
+            process = context.Process(target=run_worker, daemon=True,
+                                      args=(child, self.buffers.memory.name, count, start, stop, arguments))
+            process.start()
+            child.close()
+            self.workers.append(process)
+            self.connections.append(connection)
+            self.ranges.append((start, stop))
+        if gymnasium:
+            self.single_observation_space = spaces.Box(-np.inf, np.inf, (OBSERVATION_SIZE,), np.float32)
+            self.single_action_space = spaces.Discrete(2)
+
+    def reset(self, seed=None):
+        """
+        :function reset: Zaczyna nowe gry we wszystkich środowiskach
+        :param seed: Ziarno - środowisko i dostaje seed + i (None - losowe ziarna)
+        :type seed: int
+        :return: Obserwacje, kształt (N, OBSERVATION_SIZE)
+        :rtype: np.ndarray
+        """
+        for connection, (start, stop) in zip(self.connections, self.ranges):
+            seeds = [None if seed is None else seed + index for index in range(start, stop)]
+            connection.send(('reset', seeds))
+        for connection in self.connections:
+            connection.recv()
+        return self.buffers.observations.copy()
+
+    def step(self, actions):
+        """
+        :function step: Wykonuje jeden krok we wszystkich środowiskach
+        :param actions: Akcje środowisk, kształt (N,)
+        :type actions: np.ndarray
+        :return: Obserwacje, nagrody, terminated, truncated i informacje o grach skończonych w tym kroku
+            (słownik indeks środowiska -> informacje z ostatniego kroku gry razem z 'final_observation')
+        :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[int, dict]]
+        """
+        self.buffers.actions[:] = actions
+        for connection in self.connections:
+            connection.send(('step',))
+        infos = {}
+        for connection in self.connections:
+            infos.update(connection.recv())
+        buffers = self.buffers
+        return (buffers.observations.copy(), buffers.rewards.copy(), buffers.terminated.copy(),
+                buffers.truncated.copy(), infos)
+
+    def render(self, index=0):
+        """
+        :function render: Rysuje grę jednego środowiska (środowiska muszą mieć render_mode 'rgb_array')
+        :param index: Indeks środowiska
+        :type index: int
+        :rtype: np.ndarray
+        """
+        for connection, (start, stop) in zip(self.connections, self.ranges):
+            if start <= index < stop:
+                connection.send(('render', index))
+                return connection.recv()
+        raise IndexError(f"No environment {index}")
+
+    def close(self):
+        """
+        :function close: Kończy procesy robocze i zwalnia pamięć współdzieloną
+        """
+        if not self.workers:
+            return
+        for connection in self.connections:
+            try:
+                connection.send(('close',))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for connection in self.connections:
+            connection.close()
+        self.workers = []
+        self.buffers.close()
+        self.buffers.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def play(env, steps):
+    """
+    :function play: Gra autopilotem w jednym środowisku przez zadaną ilość kroków
+    :return: Wyniki skończonych gier
+    :rtype: List[int]
+    """
+    scores = []
+    observation, _ = env.reset(seed=0)
+    for _ in range(steps):
+        observation, _, terminated, truncated, info = env.step(autopilot(observation))
+        if terminated or truncated:
+            scores.append(info['score'])
+            observation, _ = env.reset()
+    return scores
+
+
+def play_vector(env, steps):
+    """
+    :function play_vector: Gra autopilotem we wszystkich środowiskach wektorowych przez zadaną ilość kroków
+    :return: Wyniki skończonych gier
+    :rtype: List[int]
+    """
+    scores = []
+    observations = env.reset(seed=0)
+    for _ in range(steps):
+        actions = [autopilot(observation) for observation in observations]
+        observations, _, _, _, infos = env.step(actions)
+        scores.extend(info['score'] for info in infos.values())
+    return scores
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="TrzmielIT learning environment benchmark")
+    parser.add_argument('--envs', type=int, default=64, help="environments in the vector environment")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per core)")
+    parser.add_argument('--steps', type=int, default=2000, help="environment steps to run")
+    parser.add_argument('--difficulty', default='classic', choices=sorted(DIFFICULTIES))
+    parser.add_argument('--render', help="save a rendered frame of a single environment to this PNG file")
+    args = parser.parse_args(argv)
+    env = TrzmielEnv(args.difficulty, render_mode='rgb_array' if args.render else None)
+    started = time.perf_counter()
+    scores = play(env, args.steps)
+    seconds = time.perf_counter() - started
+    print(f"single env: {args.steps / seconds:.0f} steps/s, {len(scores)} games, "
+          f"mean score {np.mean(scores) if scores else 0:.1f}")
+    if args.render:
+        import pygame
+        frame = env.render()
+        pygame.image.save(pygame.surfarray.make_surface(frame.transpose(1, 0, 2)), args.render)
+        print(f"frame saved to {args.render}")
+    with VectorEnv(args.envs, args.workers, args.difficulty) as vector_env:
+        started = time.perf_counter()
+        scores = play_vector(vector_env, args.steps)
+        seconds = time.perf_counter() - started
+        print(f"vector env: {args.envs} envs on {len(vector_env.workers)} workers, "
+              f"{args.envs * args.steps / seconds:.0f} steps/s, {len(scores)} games, "
+              f"mean score {np.mean(scores) if scores else 0:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,912 @@
+import argparse
+import asyncio
+import copy
+import queue
+import random
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+
+from collision import REACH
+from simulation import World, FixedTimestep, Bee, TICK_RATE, BEE_X, DIFFICULTIES
+
+"""
+    network
+    =======
+    Wyścig dwóch (lub więcej) graczy przez sieć. Serwer prowadzi rozstrzygającą symulację: każdy gracz ma własny
+    simulation.World z tym samym ziarnem toru, wszystkie ruszają w tym samym kroku, a serwer przesuwa je
+    ze stałą częstotliwością TICK_RATE, niezależnie od klientów.
+    Klient wysyła tylko stany przycisku skoku (jeden bit na krok), a serwer co SNAPSHOT_TICKS kroków odsyła
+    migawkę: skoki, które naprawdę zastosował dla tego gracza, oraz stany trzmieli zakodowane różnicowo
+    (tylko pola zmienione od poprzedniej migawki wysłanej temu klientowi).
+    Własny trzmiel jest przewidywany u klienta bez czekania na serwer. Symulacja jest deterministyczna, więc klient
+    przesuwa potwierdzoną kopię gry skokami z migawek, a gdy serwer zastosował inny skok niż przewidziany (spóźniony
+    pakiet), przelicza od niej jeszcze niepotwierdzone kroki. Trzmiel przeciwnika rysowany jest pomiędzy migawkami.
+    Ruch w wyścigu dwóch graczy to poniżej 1 KB/s od serwera i ok. 0.3 KB/s do serwera na klienta.
+    Uruchomienie:
+        python network.py server [--port 5555] [--players 2] [--seed N] [--difficulty classic]
+        python network.py bot [--host localhost] [--port 5555] [--latency ms] [--jitter ms]
+        python network.py selftest      (serwer w osobnym procesie i dwa boty przez localhost)
+"""
+
+"""
+    Stałe protokołu
+    ---------------
+    PROTOCOL_VERSION : int
+        Wersja protokołu, klient i serwer muszą mieć tę samą
+    DEFAULT_PORT : int
+        Domyślny port serwera
+    SNAPSHOT_TICKS : int
+        Co ile kroków serwer wysyła migawkę (20 razy na sekundę)
+    INPUT_TICKS : int
+        Co ile kroków klient wysyła swoje skoki (30 razy na sekundę)
+    START_DELAY : float
+        Czas od wysłania START do pierwszego kroku wyścigu (w sekundach)
+    LEAD_TICKS : Tuple[int, int]
+        Zakres, o ile kroków ostatni skok odebrany od klienta powinien wyprzedzać serwer - mniej oznacza spóźnione
+        skoki (skoki wysyłane są po INPUT_TICKS, więc najstarszy w paczce ma wyprzedzenie mniejsze o INPUT_TICKS - 1),
+        więcej niepotrzebne opóźnienie potwierdzeń
+    MAX_LEAD : int
+        Skoki dalej w przyszłości niż tyle kroków są odrzucane
+    MAX_BUFFERED : int
+        Ilość bajtów czekających na wysłanie do klienta, po przekroczeniu której klient jest rozłączany
+        (nie odbiera danych, a serwer nie może trzymać dla niego coraz dłuższej kolejki migawek)
+"""
+PROTOCOL_VERSION = 1
+DEFAULT_PORT = 5555
+SNAPSHOT_TICKS = 6
+INPUT_TICKS = 4
+START_DELAY = 1.0
+LEAD_TICKS = (INPUT_TICKS + 2, INPUT_TICKS + 10)
+MAX_LEAD = 10 * TICK_RATE
+MAX_BUFFERED = 64 * 1024
+
+""" Rodzaje wiadomości. Każda wiadomość to nagłówek (rodzaj, długość danych) i dane. """
+HEADER = struct.Struct('<BH')
+HELLO, WELCOME, PING, PONG, START, INPUT, SNAPSHOT, RESULT, BUSY = range(1, 10)
+HELLO_DATA = struct.Struct('<B')
+WELCOME_DATA = struct.Struct('<BBQB')
+PING_DATA = struct.Struct('<d')
+START_DATA = struct.Struct('<H')
+INPUT_DATA = struct.Struct('<IB')
+SNAPSHOT_DATA = struct.Struct('<IbB')
+SCORE_DATA = struct.Struct('<H')
+
+""" Pola stanu trzmiela w migawce - w tej kolejności, każde z bitem w masce zmienionych pól """
+BEE_FIELDS = [struct.Struct(fmt) for fmt in ('<d', '<d', '<f', '<B', '<H', '<B')]
+FLAG_STARTED, FLAG_COLLISION, FLAG_STOP = 1, 2, 4
+
+
+class ProtocolError(ValueError):
+    """Niepoprawna wiadomość albo inna wersja protokołu po drugiej stronie"""
+
+
+def message(kind, payload=b''):
+    """
+    :function message: Składa wiadomość do wysłania
+    :param kind: Rodzaj wiadomości
+    :type kind: int
+    :param payload: Dane
+    :type payload: bytes
+    :rtype: bytes
+    """
+    return HEADER.pack(kind, len(payload)) + payload
+
+
+async def read_message(reader):
+    """
+    :function read_message: Czyta jedną wiadomość
+    :param reader: Strumień połączenia
+    :type reader: asyncio.StreamReader
+    :return: Rodzaj wiadomości i dane
+    :rtype: Tuple[int, bytes]
+    """
+    kind, size = HEADER.unpack(await reader.readexactly(HEADER.size))
+    return kind, await reader.readexactly(size)
+
+
+def pack_bits(bits):
+    """
+    :function pack_bits: Pakuje stany skoku po 8 w bajcie (pierwszy w najmłodszym bicie, jak w replay)
+    :param bits: Stany skoku
+    :type bits: Sequence[bool]
+    :rtype: bytes
+    """
+    data = bytearray((len(bits) + 7) // 8)
+    for i, bit in enumerate(bits):
+        if bit:
+            data[i >> 3] |= 1 << (i & 7)
+    return bytes(data)
+
+
+def unpack_bits(data, count, offset=0):
+    """
+    :function unpack_bits: Odwrotność pack_bits
+    :param data: Dane
+    :param count: Ilość stanów
+    :param offset: Położenie pierwszego bajtu w danych
+    :rtype: List[bool]
+    """
+    return [bool(data[offset + (i >> 3)] >> (i & 7) & 1) for i in range(count)]
+
+
+def bee_values(world):
+    """
+    :function bee_values: Stan trzmiela wysyłany w migawce
+    :param world: Gra gracza
+    :type world: simulation.World
+    :return: Wartości pól z BEE_FIELDS
+    :rtype: Tuple
+    """
+    bee = world.bee
+    flags = (FLAG_STARTED if world.started else 0) | (FLAG_COLLISION if bee.collision else 0) | \
+            (FLAG_STOP if bee.stop else 0)
+    return bee.y, bee.y_velocity, bee.rotation, bee.frame, min(world.score, 0xFFFF), flags
+
+
+def encode_bee(values, previous):
+    """
+    :function encode_bee: Koduje stan trzmiela jako maskę zmienionych pól i ich wartości
+    :param values: Aktualne wartości pól
+    :param previous: Wartości wysłane poprzednio (None - wszystkie pola)
+    :rtype: bytes
+    """
+    mask = 0
+    parts = []
+    for i, (field, value) in enumerate(zip(BEE_FIELDS, values)):
+        if previous is None or previous[i] != value:
+            mask |= 1 << i
+            parts.append(field.pack(value))
+    return bytes((mask,)) + b''.join(parts)
+
+
+def decode_bee(data, offset, previous):
+    """
+    :function decode_bee: Odwrotność encode_bee
+    :param data: Dane migawki
+    :param offset: Położenie stanu trzmiela w danych
+    :param previous: Poprzednie wartości pól (None - brak, wtedy wszystkie muszą być w danych)
+    :return: Wartości pól i położenie za stanem trzmiela
+    :rtype: Tuple[List, int]
+    """
+    mask = data[offset]
+    offset += 1
+    values = list(previous) if previous is not None else [None] * len(BEE_FIELDS)
+    for i, field in enumerate(BEE_FIELDS):
+        if mask >> i & 1:
+            values[i], = field.unpack_from(data, offset)
+            offset += field.size
+        elif previous is None:
+            raise ProtocolError("First snapshot must contain every field")
+    return values, offset
+
+
+class RacePlayer:
+    """
+    :class RacePlayer: Gracz wyścigu po stronie serwera
+        :ivar self.index: Numer gracza
+        :type self.index: int
+        :ivar self.world: Gra gracza
+        :type self.world: simulation.World
+        :ivar self.inputs: Odebrane skoki na przyszłe kroki {krok: skok}
+        :type self.inputs: Dict[int, bool]
+        :ivar self.last_input: Ostatnio zastosowany skok, powtarzany gdy skok na dany krok nie dotarł na czas
+        :type self.last_input: bool
+        :ivar self.latest_tick: Najpóźniejszy krok, na który dotarł skok
+        :type self.latest_tick: int
+        :ivar self.applied: Skoki zastosowane od ostatniej migawki
+        :type self.applied: List[bool]
+        :ivar self.sent: Stany trzmieli wysłane temu graczowi w ostatniej migawce
+        :type self.sent: List[Tuple]
+        :ivar self.late: Ilość kroków, na które skok nie dotarł na czas
+        :type self.late: int
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.index = None
+        self.race = None
+        self.world = None
+        self.inputs = {}
+        self.last_input = False
+        self.latest_tick = 0
+        self.applied = []
+        self.sent = None
+        self.late = 0
+        self.bytes_sent = 0
+        self.connected = True
+
+    def send(self, kind, payload=b''):
+        """
+        :function send: Wysyła wiadomość (rozłączonym graczom nic nie jest wysyłane). Gracz, dla którego czeka
+        więcej niż MAX_BUFFERED bajtów, jest rozłączany, a jego trzmiel leci dalej bez skoków.
+        """
+        if self.connected:
+            data = message(kind, payload)
+            self.bytes_sent += len(data)
+            self.writer.write(data)
+            if self.writer.transport.get_write_buffer_size() > MAX_BUFFERED:
+                self.connected = False
+                self.writer.transport.abort()
+
+    def receive_inputs(self, payload, tick):
+        """
+        :function receive_inputs: Zapamiętuje skoki z wiadomości INPUT; skoki na kroki, które już minęły, są pomijane
+        :param payload: Dane wiadomości
+        :param tick: Aktualny krok serwera
+        """
+        first, count = INPUT_DATA.unpack_from(payload)
+        if len(payload) < INPUT_DATA.size + (count + 7) // 8:
+            raise ProtocolError("Truncated input")
+        for i, bit in enumerate(unpack_bits(payload, count, INPUT_DATA.size)):
+            input_tick = first + i
+            if tick < input_tick <= tick + MAX_LEAD:
+                self.inputs[input_tick] = bit
+                self.latest_tick = max(self.latest_tick, input_tick)
+
+    def next_input(self, tick):
+        """
+        :function next_input: Skok gracza w danym kroku - odebrany albo, gdy nie dotarł, taki jak w poprzednim
+        :param tick: Numer kroku
+        :rtype: bool
+        """
+        jump = self.inputs.pop(tick, None)
+        if jump is None:
+            jump = self.last_input if self.connected else False
+            self.late += 1
+        self.last_input = jump
+        self.applied.append(jump)
+        return jump
+
+
+class RaceServer:
+    """
+    :class RaceServer: Serwer wyścigów - zbiera graczy w poczekalni, a gdy jest ich players, rozgrywa między nimi
+    wyścig. Kolejni gracze czekają na następny wyścig.
+        :ivar self.players: Ilość graczy w wyścigu
+        :type self.players: int
+        :ivar self.seed: Ziarno toru (None - losowe w każdym wyścigu)
+        :type self.seed: int
+        :ivar self.difficulty: Krzywa trudności toru
+        :type self.difficulty: string
+        :ivar self.waiting: Gracze w poczekalni
+        :type self.waiting: List[RacePlayer]
+        :ivar self.port: Port, na którym serwer słucha (znany po start())
+        :type self.port: int
+        :ivar self.races: Trwające wyścigi
+        :type self.races: Set[asyncio.Task]
+    """
+
+    def __init__(self, players=2, seed=None, difficulty='classic', verbose=False):
+        if difficulty not in DIFFICULTIES:
+            raise ValueError(f"Unknown difficulty {difficulty!r}")
+        self.players = players
+        self.seed = seed
+        self.difficulty = difficulty
+        self.verbose = verbose
+        self.waiting = []
+        self.races = set()
+        self.server = None
+        self.port = None
+
+    async def start(self, host='', port=DEFAULT_PORT, reuse_port=False):
+        """
+        :function start: Zaczyna przyjmować połączenia
+        :param host: Adres, na którym serwer słucha ('' - wszystkie)
+        :param port: Port (0 - dowolny wolny)
+        :param reuse_port: True jeśli na tym samym porcie mogą słuchać inne procesy (SO_REUSEPORT, Linux)
+        """
+        self.server = await asyncio.start_server(self.handle, host or None, port, reuse_port=reuse_port or None)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.log(f"listening on port {self.port}")
+
+    async def serve(self, host='', port=DEFAULT_PORT, reuse_port=False):
+        """
+        :function serve: Uruchamia serwer do przerwania
+        """
+        await self.start(host, port, reuse_port)
+        async with self.server:
+            await self.server.serve_forever()
+
+    def log(self, text):
+        if self.verbose:
+            print(f"[server] {text}", flush=True)
+
+    async def handle(self, reader, writer):
+        """
+        :function handle: Obsługa połączenia jednego gracza
+        """
+        writer.get_extra_info('socket').setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        player = RacePlayer(reader, writer)
+        try:
+            kind, payload = await read_message(reader)
+            if kind != HELLO or HELLO_DATA.unpack_from(payload)[0] != PROTOCOL_VERSION:
+                raise ProtocolError("Expected HELLO with protocol version %d" % PROTOCOL_VERSION)
+            if not self.join(player):
+                player.send(BUSY)
+                await writer.drain()
+                return
+            while True:
+                kind, payload = await read_message(reader)
+                if kind == PING:
+                    player.send(PONG, payload)
+                elif kind == INPUT and player.world is not None:
+                    player.receive_inputs(payload, player.race.tick)
+        except (asyncio.IncompleteReadError, ConnectionError, ProtocolError, struct.error) as error:
+            if not isinstance(error, asyncio.IncompleteReadError):
+                self.log(f"player dropped: {error}")
+        finally:
+            player.connected = False
+            if player in self.waiting:
+                self.waiting.remove(player)
+            writer.close()
+
+    def join(self, player):
+        """
+        :function join: Dodaje gracza do poczekalni i zaczyna wyścig, gdy zbierze się players graczy
+        :param player: Nowy gracz
+        :type player: RacePlayer
+        :return: False jeśli gracz nie może dołączyć (serwer odsyła BUSY i rozłącza go)
+        :rtype: bool
+        """
+        self.waiting.append(player)
+        if len(self.waiting) >= self.players:
+            race = Race(self, self.waiting[:self.players])
+            del self.waiting[:self.players]
+            task = asyncio.ensure_future(race.run())
+            self.races.add(task)
+            task.add_done_callback(self.races.discard)
+        return True
+
+
+def serve_in_background(host='', port=DEFAULT_PORT, players=2, seed=None, difficulty='classic'):
+    """
+    :function serve_in_background: Uruchamia serwer wyścigów w wątku w tle (serwer wbudowany w grę)
+    :return: Działający serwer
+    :rtype: RaceServer
+    :raises OSError: Gdy port jest zajęty
+    """
+    server = RaceServer(players, seed, difficulty)
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name='race-server', daemon=True).start()
+    asyncio.run_coroutine_threadsafe(server.start(host, port), loop).result()
+    return server
+
+
+class Race:
+    """
+    :class Race: Jeden wyścig na serwerze
+        :ivar self.tick: Numer ostatniego wykonanego kroku
+        :type self.tick: int
+        :ivar self.start: Czas pętli asyncio, w którym zaczyna się pierwszy krok (znany po begin())
+        :type self.start: float
+    """
+
+    def __init__(self, server, players):
+        self.server = server
+        self.players = players
+        self.tick = 0
+        self.start = None
+        self.seed = random.randrange(2 ** 32) if server.seed is None else server.seed
+        for index, player in enumerate(players):
+            player.index = index
+            player.race = self
+            player.world = World(self.seed, difficulty=server.difficulty)
+            player.world.start()
+
+    async def run(self):
+        """
+        :function run: Rozgrywa wyścig ze stałą częstotliwością kroków i wysyła wyniki, gdy wszyscy wylądują
+        """
+        loop = asyncio.get_event_loop()
+        self.begin(loop.time())
+        while not self.finished:
+            delay = self.deadline - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.step()
+        await self.finish()
+
+    def begin(self, now):
+        """
+        :function begin: Wysyła graczom tor i sygnał startu; pierwszy krok nastąpi START_DELAY później
+        :param now: Aktualny czas pętli asyncio
+        :type now: float
+        """
+        name = self.server.difficulty.encode()
+        for player in self.players:
+            player.send(WELCOME, WELCOME_DATA.pack(player.index, len(self.players), self.seed, len(name)) + name)
+            player.send(START, START_DATA.pack(round(START_DELAY * 1000)))
+        self.server.log(f"race started, seed {self.seed}")
+        self.start = now + START_DELAY
+
+    @property
+    def deadline(self):
+        """ Czas pętli asyncio, w którym należy wykonać następny krok """
+        return self.start + (self.tick + 1) / TICK_RATE
+
+    @property
+    def finished(self):
+        """ True gdy wszyscy gracze wylądowali """
+        return all(player.world.landed for player in self.players)
+
+    def step(self):
+        """
+        :function step: Wykonuje jeden krok wszystkich gier i co SNAPSHOT_TICKS kroków wysyła migawki
+        """
+        self.tick += 1
+        for player in self.players:
+            player.world.step(player.next_input(self.tick))
+        if self.tick % SNAPSHOT_TICKS == 0:
+            self.send_snapshots()
+
+    async def finish(self):
+        """
+        :function finish: Wysyła ostatnią migawkę i wyniki, po czym zamyka połączenia
+        """
+        self.send_snapshots()
+        scores = b''.join(SCORE_DATA.pack(min(player.world.score, 0xFFFF)) for player in self.players)
+        duration = self.tick / TICK_RATE
+        for player in self.players:
+            player.send(RESULT, scores)
+            self.server.log(f"player {player.index}: score {player.world.score}, "
+                            f"{player.bytes_sent / duration:.0f} B/s sent, {player.late} late ticks")
+            if player.connected:
+                try:
+                    await player.writer.drain()
+                except ConnectionError:
+                    pass
+            player.writer.close()
+
+    def send_snapshots(self):
+        """
+        :function send_snapshots: Wysyła każdemu graczowi migawkę: skoki zastosowane od poprzedniej
+        i różnicowe stany trzmieli wszystkich graczy
+        """
+        values = [bee_values(player.world) for player in self.players]
+        for player in self.players:
+            lead = max(-128, min(127, player.latest_tick - self.tick))
+            applied = player.applied
+            parts = [SNAPSHOT_DATA.pack(self.tick, lead, len(applied)), pack_bits(applied)]
+            for i, state in enumerate(values):
+                parts.append(encode_bee(state, player.sent[i] if player.sent else None))
+            player.send(SNAPSHOT, b''.join(parts))
+            player.applied = []
+            player.sent = values
+
+
+class RaceClient:
+    """
+    :class RaceClient: Połączenie z serwerem wyścigów. Sieć obsługuje pętla asyncio w osobnym wątku,
+    a odebrane wiadomości czekają w kolejce, opróżnianej w pętli gry.
+        :ivar self.messages: Odebrane wiadomości (rodzaj, dane); None oznacza koniec połączenia
+        :type self.messages: queue.Queue
+        :ivar self.latency: Sztuczne opóźnienie wysyłanych wiadomości w sekundach (do testów)
+        :type self.latency: float
+        :ivar self.jitter: Losowy rozrzut sztucznego opóźnienia w sekundach
+        :type self.jitter: float
+        :ivar self.bytes_sent: Ilość wysłanych bajtów
+        :type self.bytes_sent: int
+        :ivar self.bytes_received: Ilość odebranych bajtów
+        :type self.bytes_received: int
+    """
+
+    def __init__(self, host='localhost', port=DEFAULT_PORT, latency=0.0, jitter=0.0, timeout=3.0):
+        """
+        :param host: Adres serwera
+        :param port: Port serwera
+        :param latency: Sztuczne opóźnienie wysyłanych wiadomości w sekundach
+        :param jitter: Rozrzut sztucznego opóźnienia w sekundach
+        :param timeout: Czas oczekiwania na połączenie w sekundach
+        :raises OSError: Gdy nie udało się połączyć
+        """
+        self.messages = queue.Queue()
+        self.latency = latency
+        self.jitter = jitter
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.writer = None
+        """ wiadomości z rozrzutem opóźnienia nie mogą się wyprzedzać, jak w TCP """
+        self.send_after = 0.0
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='race-client', daemon=True)
+        self.thread.start()
+        try:
+            asyncio.run_coroutine_threadsafe(self.open(host, port), self.loop).result(timeout)
+        except BaseException:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            raise
+
+    async def open(self, host, port):
+        reader, self.writer = await asyncio.open_connection(host, port)
+        self.writer.get_extra_info('socket').setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.writer.write(message(HELLO, HELLO_DATA.pack(PROTOCOL_VERSION)))
+        self.loop.create_task(self.receive(reader))
+
+    async def receive(self, reader):
+        try:
+            while True:
+                kind, payload = await read_message(reader)
+                self.bytes_received += HEADER.size + len(payload)
+                self.messages.put((kind, payload))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.messages.put(None)
+
+    def send(self, kind, payload=b''):
+        """
+        :function send: Wysyła wiadomość (bezpieczne z dowolnego wątku)
+        """
+        data = message(kind, payload)
+        self.bytes_sent += len(data)
+        self.loop.call_soon_threadsafe(self.write, data)
+
+    def write(self, data):
+        if self.latency or self.jitter:
+            now = self.loop.time()
+            self.send_after = max(self.send_after, now + self.latency + random.uniform(0, self.jitter))
+            self.loop.call_at(self.send_after, self.writer.write, data)
+        else:
+            self.writer.write(data)
+
+    def close(self):
+        """
+        :function close: Zamyka połączenie i kończy wątek sieci
+        """
+        def stop():
+            self.writer.close()
+            for task in asyncio.all_tasks(self.loop):
+                task.cancel()
+            self.loop.call_soon(self.loop.stop)
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(stop)
+            self.thread.join(1.0)
+
+
+class RaceSession:
+    """
+    :class RaceSession: Wyścig po stronie klienta - poczekalnia, odliczanie, przewidywanie własnego trzmiela
+    i trzmiele przeciwników z migawek. Nie zależy od pygame, używana w grze i przez boty.
+        :ivar self.client: Połączenie z serwerem
+        :type self.client: RaceClient
+        :ivar self.player: Numer gracza (None do WELCOME)
+        :type self.player: int
+        :ivar self.world: Przewidywana gra gracza, rysowana i sterowana bez czekania na serwer
+        :type self.world: simulation.World
+        :ivar self.confirmed: Gra przesunięta skokami potwierdzonymi przez serwer
+        :type self.confirmed: simulation.World
+        :ivar self.pending: Skoki z kroków po self.confirmed.tick, jeszcze niepotwierdzone
+        :type self.pending: Deque[bool]
+        :ivar self.opponents: Trzmiele pozostałych graczy z dwóch ostatnich migawek {numer: Bee}
+        :type self.opponents: Dict[int, simulation.Bee]
+        :ivar self.scores: Wyniki graczy z ostatniej migawki
+        :type self.scores: List[int]
+        :ivar self.result: Wyniki końcowe od serwera (None - wyścig trwa)
+        :type self.result: List[int]
+        :ivar self.corrections: Ilość przeliczeń przewidywania po skoku innym niż przewidziany
+        :type self.corrections: int
+        :ivar self.lead: Ostatnio zgłoszone przez serwer wyprzedzenie skoków klienta (w krokach)
+        :type self.lead: int
+        :ivar self.closed: True po rozłączeniu
+        :type self.closed: bool
+        :ivar self.busy: True jeśli serwer odrzucił połączenie z powodu obciążenia
+        :type self.busy: bool
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.player = None
+        self.players = 0
+        self.world = None
+        self.confirmed = None
+        self.pending = deque()
+        self.unsent = []
+        self.opponents = {}
+        self.states = {}
+        self.scores = []
+        self.result = None
+        self.corrections = 0
+        self.lead = LEAD_TICKS[0]
+        self.rtt = None
+        self.start_received = None
+        self.start_at = None
+        self.snapshot_time = None
+        self.closed = False
+        self.busy = False
+        self.ping_sent = time.perf_counter()
+        client.send(PING, PING_DATA.pack(self.ping_sent))
+
+    @property
+    def running(self):
+        """ True od chwili startu wyścigu """
+        if self.start_at is None and self.start_received is not None and self.rtt is not None:
+            """ serwer wykona pierwszy krok po START_DELAY od wysłania START, a skoki muszą do niego dotrzeć
+            przed jego krokami - klient startuje wcześniej o czas w obie strony i zapas LEAD_TICKS[0] kroków """
+            self.start_at = self.start_received - self.rtt - LEAD_TICKS[0] / TICK_RATE
+        return self.start_at is not None and time.perf_counter() >= self.start_at
+
+    def poll(self):
+        """
+        :function poll: Obsługuje wszystkie odebrane wiadomości
+        """
+        while not self.closed:
+            try:
+                item = self.client.messages.get_nowait()
+            except queue.Empty:
+                return
+            if item is None:
+                self.closed = True
+                return
+            kind, payload = item
+            try:
+                self.receive(kind, payload)
+            except (ProtocolError, struct.error, IndexError) as error:
+                """ błędna wiadomość od serwera kończy wyścig jak rozłączenie, a nie całą grę """
+                print(f"Server message rejected: {error}", file=sys.stderr)
+                self.closed = True
+                self.client.close()
+
+    def receive(self, kind, payload):
+        """
+        :function receive: Obsługuje jedną wiadomość od serwera
+        :raises ProtocolError: Gdy wiadomość nie pasuje do stanu wyścigu
+        :raises struct.error: Gdy wiadomość jest za krótka
+        """
+        if kind == WELCOME:
+            self.welcome(payload)
+        elif kind == PONG:
+            self.rtt = time.perf_counter() - PING_DATA.unpack_from(payload)[0]
+        elif kind == START:
+            self.start_received = time.perf_counter() + START_DATA.unpack_from(payload)[0] / 1000
+        elif kind == SNAPSHOT:
+            if self.confirmed is None:
+                raise ProtocolError("SNAPSHOT before WELCOME")
+            self.snapshot(payload)
+        elif kind == BUSY:
+            self.busy = True
+        elif kind == RESULT:
+            if self.player is None or len(payload) != self.players * SCORE_DATA.size:
+                raise ProtocolError(f"RESULT of {len(payload)} bytes for {self.players} players")
+            self.result = [SCORE_DATA.unpack_from(payload, i * SCORE_DATA.size)[0] for i in range(self.players)]
+
+    def welcome(self, payload):
+        self.player, self.players, seed, size = WELCOME_DATA.unpack_from(payload)
+        if self.player >= self.players:
+            raise ProtocolError(f"Player {self.player} of {self.players}")
+        difficulty = payload[WELCOME_DATA.size:WELCOME_DATA.size + size].decode('utf-8', 'replace')
+        if difficulty not in DIFFICULTIES:
+            raise ProtocolError(f"Unknown difficulty {difficulty!r}")
+        self.confirmed = World(seed, difficulty=difficulty)
+        self.confirmed.start()
+        self.world = copy.deepcopy(self.confirmed)
+        self.opponents = {index: Bee(self.world.bee.y) for index in range(self.players) if index != self.player}
+        self.scores = [0] * self.players
+
+    def step(self, jump):
+        """
+        :function step: Przewiduje krok własnej gry i co INPUT_TICKS kroków wysyła skoki na serwer
+        :param jump: True jeśli przycisk skoku jest wciśnięty
+        :return: Zdarzenia kroku w przewidywanej grze
+        :rtype: List[str]
+        """
+        self.pending.append(jump)
+        self.unsent.append(jump)
+        events = self.world.step(jump)
+        if len(self.unsent) >= INPUT_TICKS:
+            self.send_inputs()
+        return events
+
+    def send_inputs(self):
+        """
+        :function send_inputs: Wysyła skoki z kroków, które nie zostały jeszcze wysłane
+        """
+        if self.unsent:
+            first = self.world.tick - len(self.unsent) + 1
+            self.client.send(INPUT, INPUT_DATA.pack(first, len(self.unsent)) + pack_bits(self.unsent))
+            self.unsent = []
+
+    def snapshot(self, payload):
+        """
+        :function snapshot: Potwierdza skoki zastosowane przez serwer (przeliczając przewidywanie, gdy się różnią)
+        i uaktualnia trzmiele przeciwników
+        """
+        tick, self.lead, count = SNAPSHOT_DATA.unpack_from(payload)
+        offset = SNAPSHOT_DATA.size
+        applied = unpack_bits(payload, count, offset)
+        offset += (count + 7) // 8
+        mismatch = False
+        for jump in applied:
+            predicted = self.pending.popleft() if self.pending else None
+            mismatch = mismatch or predicted != jump
+            self.confirmed.step(jump)
+        if mismatch:
+            """ serwer zastosował inny skok niż przewidziany albo wyprzedził klienta - przeliczamy od potwierdzonej gry """
+            self.corrections += 1
+            self.send_inputs()
+            self.world = copy.deepcopy(self.confirmed)
+            for jump in self.pending:
+                self.world.step(jump)
+        for index in range(self.players):
+            values, offset = decode_bee(payload, offset, self.states.get(index))
+            self.states[index] = values
+            self.scores[index] = values[4]
+            if index in self.opponents:
+                bee = self.opponents[index]
+                bee.previous_y = bee.y
+                bee.y, bee.y_velocity, bee.rotation, bee.frame, _, flags = values
+                bee.collision = bool(flags & FLAG_COLLISION)
+                bee.stop = bool(flags & FLAG_STOP)
+        self.snapshot_time = time.perf_counter()
+
+    @property
+    def opponent_alpha(self):
+        """ Ułamek odstępu między migawkami, który upłynął od ostatniej - do rysowania przeciwników """
+        if self.snapshot_time is None:
+            return 1.0
+        return min(1.0, (time.perf_counter() - self.snapshot_time) * TICK_RATE / SNAPSHOT_TICKS)
+
+    def time_scale(self):
+        """
+        :function time_scale: Mnożnik czasu klatki dla klienta: przyspiesza, gdy jego skoki docierają na serwer
+        zbyt późno, i zwalnia, gdy wyprzedzają go bardziej niż potrzeba
+        :rtype: float
+        """
+        if self.lead < LEAD_TICKS[0]:
+            return 1.05
+        if self.lead > LEAD_TICKS[1]:
+            return 0.95
+        return 1.0
+
+    def close(self):
+        self.client.close()
+
+
+def autopilot(world):
+    """
+    :function autopilot: Prosty gracz dla botów - skacze, gdy trzmiel spada poniżej środka najbliższej przerwy
+    :param world: Gra
+    :type world: simulation.World
+    :rtype: bool
+    """
+    ahead = [obstacle for obstacle in world.obstacles if obstacle.x + REACH > BEE_X]
+    target = min(ahead, key=lambda obstacle: obstacle.x)
+    return world.bee.y > target.y + 35 and world.bee.y_velocity > 0
+
+
+def run_bot(host='localhost', port=DEFAULT_PORT, latency=0.0, jitter=0.0, points=None, report=None):
+    """
+    :function run_bot: Rozgrywa jeden wyścig bez okna, sterując trzmielem autopilotem
+    :param points: Wynik, po którym bot przestaje skakać (None - leci, dopóki się nie pomyli)
+    :param report: Słownik, do którego trafiają statystyki (None - wypisywane)
+    :return: Sesja po zakończeniu wyścigu
+    :rtype: RaceSession
+    """
+    client = RaceClient(host, port, latency / 1000, jitter / 1000)
+    session = RaceSession(client)
+    timestep = FixedTimestep()
+    started = None
+    previous = time.perf_counter()
+    while session.result is None and not session.closed:
+        time.sleep(0.004)
+        session.poll()
+        now = time.perf_counter()
+        elapsed = (now - previous) * 1000
+        previous = now
+        if not session.running:
+            continue
+        if started is None:
+            started = now
+            """ pierwszy krok wyścigu - czas przed startem nie jest symulowany """
+            elapsed = (now - session.start_at) * 1000
+        timestep.advance(elapsed * session.time_scale())
+        while timestep.step():
+            world = session.world
+            session.step((points is None or world.score < points) and autopilot(world))
+    session.close()
+    duration = time.perf_counter() - (started or time.perf_counter())
+    stats = {
+        'player': session.player,
+        'score': session.world.score if session.world else None,
+        'confirmed': session.confirmed.score if session.confirmed else None,
+        'result': session.result,
+        'received': client.bytes_received / duration if duration else 0,
+        'sent': client.bytes_sent / duration if duration else 0,
+        'corrections': session.corrections,
+        'seconds': duration,
+    }
+    if report is None:
+        print(f"player {stats['player']}: predicted score {stats['score']}, server result {stats['result']}, "
+              f"{stats['received']:.0f} B/s down, {stats['sent']:.0f} B/s up, {stats['corrections']} corrections")
+    else:
+        report.update(stats)
+    return session
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+
+
+def selftest(seed=None, difficulty='classic'):
+    """
+    :function selftest: Uruchamia serwer w osobnym procesie i rozgrywa wyścig dwóch botów przez localhost,
+    jednego z opóźnieniem 60-80 ms (boty kończą lot po 8 i 5 punktach). Sprawdza, czy wyniki przewidziane u klientów zgadzają się z serwerem.
+    :return: Kod wyjścia - 0 jeśli wszystko się zgadza
+    :rtype: int
+    """
+    port = free_port()
+    command = [sys.executable, __file__, 'server', '--port', str(port), '--difficulty', difficulty, '--verbose']
+    if seed is not None:
+        command += ['--seed', str(seed)]
+    server = subprocess.Popen(command)
+    try:
+        for _ in range(50):
+            try:
+                socket.create_connection(('localhost', port), 0.1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        reports = [{}, {}]
+        bots = [threading.Thread(target=run_bot, kwargs=dict(port=port, points=8, report=reports[0])),
+                threading.Thread(target=run_bot, kwargs=dict(port=port, latency=60, jitter=20, points=5,
+                                                             report=reports[1]))]
+        for bot in bots:
+            bot.start()
+        for bot in bots:
+            bot.join()
+    finally:
+        server.terminate()
+        server.wait()
+    status = 0
+    for report in reports:
+        result = report['result'][report['player']] if report.get('result') else None
+        ok = result is not None and report['score'] == report['confirmed'] == result
+        status = status or not ok
+        print(f"player {report['player']}: predicted {report['score']}, server {result} "
+              f"{'OK' if ok else 'MISMATCH'}, {report['received']:.0f} B/s down, {report['sent']:.0f} B/s up, "
+              f"{report['corrections']} corrections, {report['seconds']:.1f} s")
+    return int(status)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="TrzmielIT race server and test clients")
+    commands = parser.add_subparsers(dest='command', required=True)
+    server = commands.add_parser('server', help="run a race server")
+    server.add_argument('--host', default='')
+    server.add_argument('--port', type=int, default=DEFAULT_PORT)
+    server.add_argument('--players', type=int, default=2)
+    server.add_argument('--seed', type=int)
+    server.add_argument('--difficulty', default='classic', choices=sorted(DIFFICULTIES))
+    server.add_argument('--verbose', action='store_true')
+    bot = commands.add_parser('bot', help="play one race with an autopilot")
+    bot.add_argument('--host', default='localhost')
+    bot.add_argument('--port', type=int, default=DEFAULT_PORT)
+    bot.add_argument('--latency', type=float, default=0.0, help="extra delay of sent inputs in ms")
+    bot.add_argument('--jitter', type=float, default=0.0, help="random extra delay of sent inputs in ms")
+    bot.add_argument('--points', type=int, help="stop jumping after this score")
+    test = commands.add_parser('selftest', help="race two bots through a local server process")
+    test.add_argument('--seed', type=int)
+    test.add_argument('--difficulty', default='classic', choices=sorted(DIFFICULTIES))
+    args = parser.parse_args(argv)
+    if args.command == 'server':
+        race_server = RaceServer(args.players, args.seed, args.difficulty, verbose=args.verbose)
+        try:
+            asyncio.run(race_server.serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    if args.command == 'bot':
+        session = run_bot(args.host, args.port, args.latency, args.jitter, args.points)
+        return 0 if session.result is not None else 1
+    return selftest(args.seed, args.difficulty)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
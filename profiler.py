@@ -0,0 +1,252 @@
+import csv
+import json
+import time
+from array import array
+
+import pygame
+
+from stats import percentile
+
+"""
+    profiler
+    ========
+    Pomiar czasu poszczególnych etapów klatki (zdarzenia, symulacja, tło, przeszkody, trzmiel, licznik, ...).
+    Czasy ostatnich klatek trzymane są w buforze cyklicznym o stałym rozmiarze, więc pomiar nie przydziela pamięci
+    w trakcie gry. Nakładka rysuje wykres czasów klatek z podziałem na etapy, a po zakończeniu gry bufor można
+    zapisać do pliku CSV lub JSON. Osobny bufor cykliczny trzyma opóźnienia wejścia (od naciśnięcia klawisza
+    do wyświetlenia klatki z jego skutkiem).
+"""
+
+""" Kolory etapów na wykresie, kolejne etapy dostają kolejne kolory """
+stage_colors = [(231, 76, 60), (46, 204, 113), (52, 152, 219), (241, 196, 15), (155, 89, 182), (26, 188, 156),
+                (230, 126, 34), (236, 240, 241), (149, 165, 166), (211, 84, 0), (41, 128, 185), (192, 57, 43)]
+""" Kolor etapów oczekiwania (nie są pracą programu) """
+idle_color = (70, 70, 70)
+overlay_background = (0, 0, 0, 160)
+""" Wysokość wykresu w ms - czas klatki 60 FPS wypada w połowie """
+graph_range_ms = 33.3
+
+
+class FrameProfiler:
+    """
+    :class FrameProfiler: Mierzy czas etapów klatki. Każde wywołanie mark(etap) przypisuje etapowi czas,
+    który upłynął od poprzedniego wywołania, więc suma etapów to pełny czas klatki.
+        :ivar self.stages: Nazwy etapów w kolejności kolumn
+        :type self.stages: Tuple[string, ...]
+        :ivar self.idle: Etapy oczekiwania (np. na zegar), rysowane na wykresie szarym kolorem
+        :type self.idle: Set[string]
+        :ivar self.capacity: Ilość pamiętanych klatek
+        :type self.capacity: int
+        :ivar self.samples: Bufor cykliczny czasów etapów w ms, po len(stages) kolumn w wierszu; o jeden wiersz
+            więcej niż capacity, bo ostatni wiersz to mierzona właśnie klatka
+        :type self.samples: array.array
+        :ivar self.count: Ilość zmierzonych klatek od początku (lub od reset)
+        :type self.count: int
+        :ivar self.overlay: True jeśli nakładka z wykresem ma być rysowana
+        :type self.overlay: bool
+        :ivar self.latencies: Bufor cykliczny ostatnich opóźnień wejścia w ms
+        :type self.latencies: array.array
+        :ivar self.latency_count: Ilość zmierzonych opóźnień wejścia od początku (lub od reset)
+        :type self.latency_count: int
+    """
+
+    def __init__(self, stages, capacity=600, idle=(), latency_capacity=256):
+        self.stages = tuple(stages)
+        self.index = {stage: i for i, stage in enumerate(self.stages)}
+        self.idle = set(idle)
+        self.capacity = capacity
+        self.rows = capacity + 1
+        self.samples = array('d', bytes(8 * self.rows * len(self.stages)))
+        self.latencies = array('d', bytes(8 * latency_capacity))
+        self.overlay = False
+        self.graph = None
+        self.shade = None
+        self.summary_image = None
+        self.font = None
+        self.reset()
+
+    def reset(self):
+        """
+        :function reset: Czyści bufor i zaczyna pomiar od nowej klatki
+        """
+        for i in range(len(self.samples)):
+            self.samples[i] = 0.0
+        self.count = 0
+        self.row = 0
+        self.latency_count = 0
+        self.last = time.perf_counter()
+        if self.graph:
+            self.graph.fill((0, 0, 0, 0))
+
+    def mark(self, stage):
+        """
+        :function mark: Kończy etap, przypisując mu czas od poprzedniego wywołania mark (lub od początku klatki)
+        :param stage: Nazwa etapu
+        :type stage: string
+        """
+        now = time.perf_counter()
+        self.samples[self.row + self.index[stage]] += (now - self.last) * 1000
+        self.last = now
+
+    def add_latency(self, latency):
+        """
+        :function add_latency: Zapisuje zmierzone opóźnienie wejścia
+        :param latency: Czas od zdarzenia wejścia do wyświetlenia klatki z jego skutkiem w ms
+        :type latency: float
+        """
+        self.latencies[self.latency_count % len(self.latencies)] = latency
+        self.latency_count += 1
+
+    def latency_summary(self):
+        """
+        :function latency_summary: Ilość, mediana, p95, p99 i największe z zapamiętanych opóźnień wejścia
+        :rtype: Dict[string, float]
+        """
+        values = sorted(self.latencies[:min(self.latency_count, len(self.latencies))])
+        return {'count': len(values),
+                'p50_ms': percentile(values, 0.50),
+                'p95_ms': percentile(values, 0.95),
+                'p99_ms': percentile(values, 0.99),
+                'max_ms': values[-1] if values else 0.0}
+
+    def end_frame(self):
+        """
+        :function end_frame: Kończy klatkę i zaczyna następną w kolejnym wierszu bufora
+        """
+        if self.overlay:
+            self.draw_column()
+        self.count += 1
+        self.row = self.count % self.rows * len(self.stages)
+        for i in range(self.row, self.row + len(self.stages)):
+            self.samples[i] = 0.0
+
+    def frames(self):
+        """
+        :function frames: Zwraca czasy etapów zapamiętanych klatek, od najstarszej
+        :rtype: List[List[float]]
+        """
+        width = len(self.stages)
+        kept = min(self.count, self.capacity)
+        first = self.count - kept
+        return [list(self.samples[(frame % self.rows) * width:(frame % self.rows + 1) * width])
+                for frame in range(first, self.count)]
+
+    def summary(self):
+        """
+        :function summary: Średni czas, p95 i największy czas każdego etapu oraz całej klatki
+        :rtype: Dict[string, Dict[string, float]]
+        """
+        frames = self.frames()
+        columns = list(zip(*frames)) if frames else [()] * len(self.stages)
+        result = {}
+        for stage, values in zip(self.stages + ('frame',), columns + [[sum(frame) for frame in frames]]):
+            values = sorted(values)
+            result[stage] = {'mean_ms': sum(values) / len(values) if values else 0.0,
+                             'p95_ms': percentile(values, 0.95),
+                             'max_ms': values[-1] if values else 0.0}
+        return result
+
+    def dump(self, path):
+        """
+        :function dump: Zapisuje zapamiętane klatki do pliku, JSON jeśli nazwa kończy się na .json, inaczej CSV
+        :param path: Adres pliku
+        :type path: string
+        """
+        frames = self.frames()
+        first = self.count - len(frames)
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump({'stages': list(self.stages), 'first_frame': first, 'frames': frames,
+                           'summary': self.summary(), 'input_latency': self.latency_summary()}, f, indent=1)
+        else:
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['frame', 'total_ms'] + [f'{stage}_ms' for stage in self.stages])
+                for number, frame in enumerate(frames, first):
+                    writer.writerow([number, f'{sum(frame):.4f}'] + [f'{value:.4f}' for value in frame])
+
+    def toggle_overlay(self):
+        """
+        :function toggle_overlay: Włącza lub wyłącza nakładkę z wykresem
+        """
+        self.overlay = not self.overlay
+        if self.graph:
+            self.graph.fill((0, 0, 0, 0))
+
+    def draw_column(self):
+        """
+        :function draw_column: Dorysowuje na końcu wykresu słupek kończonej klatki, przesuwając wykres o piksel
+        """
+        if self.graph is None:
+            return
+        width, height = self.graph.get_size()
+        self.graph.scroll(-1, 0)
+        self.graph.fill((0, 0, 0, 0), (width - 1, 0, 1, height))
+        bottom = height
+        for i, stage in enumerate(self.stages):
+            value = self.samples[self.row + i]
+            if value <= 0:
+                continue
+            """ słupek złożony z odcinków kolejnych etapów """
+            size = value / graph_range_ms * height
+            top = max(0.0, bottom - size)
+            color = idle_color if stage in self.idle else stage_colors[i % len(stage_colors)]
+            self.graph.fill(color, (width - 1, round(top), 1, max(1, round(bottom) - round(top))))
+            bottom = top
+            if bottom <= 0:
+                break
+
+    def draw_overlay(self, surface, position=(10, 400), size=(300, 120)):
+        """
+        :function draw_overlay: Rysuje nakładkę: wykres czasów klatek, linię 60 FPS i średnie czasy etapów
+        :param surface: Powierzchnia, na której rysujemy
+        :type surface: pygame.Surface
+        :param position: Lewy górny róg wykresu
+        :param size: Rozmiar wykresu
+        """
+        if self.graph is None or self.graph.get_size() != size:
+            self.graph = pygame.Surface(size, pygame.SRCALPHA)
+            self.shade = pygame.Surface(size, pygame.SRCALPHA)
+            self.shade.fill(overlay_background)
+            self.font = pygame.font.Font(None, 16)
+        panel = pygame.Rect(position, size)
+        """ tło nakładki, wykres i linia 16.7 ms """
+        surface.blit(self.shade, panel)
+        surface.blit(self.graph, panel)
+        line_y = panel.bottom - round(1000 / 60 / graph_range_ms * size[1])
+        pygame.draw.line(surface, (255, 255, 255), (panel.left, line_y), (panel.right - 1, line_y))
+        """ średnie czasy etapów odświeżane co pół sekundy przy 60 FPS """
+        if self.summary_image is None or self.count % 30 == 0:
+            self.summary_image = self.render_summary()
+        surface.blit(self.summary_image, (panel.right + 6, panel.top))
+
+    def render_summary(self):
+        """
+        :function render_summary: Tworzy obrazek z legendą etapów i ich średnimi czasami z ostatnich 60 klatek
+        oraz medianą i p95 opóźnienia wejścia
+        :rtype: pygame.Surface
+        """
+        width = len(self.stages)
+        recent = min(self.count, self.capacity, 60)
+        means = [0.0] * width
+        for frame in range(self.count - recent, self.count):
+            row = (frame % self.rows) * width
+            for i in range(width):
+                means[i] += self.samples[row + i] / recent
+        lines = [("frame", sum(means), (255, 255, 255))]
+        for i, stage in enumerate(self.stages):
+            color = idle_color if stage in self.idle else stage_colors[i % len(stage_colors)]
+            lines.append((stage, means[i], color))
+        if self.latency_count:
+            latency = self.latency_summary()
+            lines.append(("input p50", latency['p50_ms'], (255, 255, 255)))
+            lines.append(("input p95", latency['p95_ms'], (255, 255, 255)))
+        line_height = self.font.get_linesize()
+        image = pygame.Surface((130, line_height * len(lines)), pygame.SRCALPHA)
+        image.fill(overlay_background)
+        for i, (stage, value, color) in enumerate(lines):
+            """ nazwa etapu od lewej, czas wyrównany do prawej """
+            image.blit(self.font.render(stage, True, color), (4, i * line_height))
+            text = self.font.render(f"{value:.2f} ms", True, color)
+            image.blit(text, (image.get_width() - 4 - text.get_width(), i * line_height))
+        return image
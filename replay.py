@@ -0,0 +1,249 @@
+import os
+import struct
+import sys
+import zlib
+
+from simulation import World, TICK_RATE, BEE_START_Y, DIFFICULTIES
+
+"""
+    replay
+    ======
+    Zapis i odtwarzanie gier. Symulacja jest deterministyczna, więc do powtórzenia gry wystarczą ziarno toru
+    i stan przycisku skoku w każdym kroku symulacji (jeden bit na krok - minuta gry to ok. 900 bajtów).
+    Format pliku (liczby little-endian):
+        nagłówek: b'TRZR', wersja (B), kroki na sekundę (H), ziarno (Q), początkowe położenie trzmiela (d),
+                  długość nazwy krzywej trudności (B) i jej nazwa w UTF-8
+        dane:     stany skoku kolejnych kroków, po 8 kroków w bajcie (pierwszy krok w najmłodszym bicie)
+        koniec:   ilość kroków (I), wynik (I), CRC32 wszystkich wcześniejszych bajtów pliku (I)
+    Pliki zapisywane są i czytane strumieniowo, w stałej ilości pamięci niezależnie od długości gry.
+    Sprawdzenie powtórek bez okna:
+        python replay.py plik.trzr [...]
+"""
+
+MAGIC = b'TRZR'
+VERSION = 1
+HEADER = struct.Struct('<4sBHQdB')
+RESULT = struct.Struct('<II')
+CHECKSUM = struct.Struct('<I')
+TRAILER_SIZE = RESULT.size + CHECKSUM.size
+""" Rozmiar bufora przy zapisie i porcji danych przy odczycie (w bajtach) """
+CHUNK_SIZE = 4096
+
+
+class ReplayError(ValueError):
+    """Błąd odczytu powtórki - plik uszkodzony, w innym formacie albo z inną symulacją"""
+
+
+class ReplayWriter:
+    """
+    :class ReplayWriter: Nagrywanie gry do pliku. Dane trafiają najpierw do pliku z końcówką .part,
+    a close() dopisuje zakończenie i nadaje mu docelową nazwę, więc przerwany zapis nie udaje całej powtórki.
+        :ivar self.path: Docelowy adres pliku
+        :type self.path: string
+        :ivar self.ticks: Ilość nagranych kroków
+        :type self.ticks: int
+        :ivar self.jumps: Ilość kroków z wciśniętym skokiem
+        :type self.jumps: int
+    """
+
+    def __init__(self, path, seed, difficulty='classic', bee_y=BEE_START_Y):
+        """
+        :param path: Adres pliku
+        :type path: string
+        :param seed: Ziarno toru
+        :type seed: int
+        :param difficulty: Nazwa krzywej trudności
+        :type difficulty: string
+        :param bee_y: Początkowe położenie trzmiela w pionie
+        :type bee_y: float
+        """
+        name = difficulty.encode()
+        if not 0 <= seed < 2 ** 64 or len(name) > 255:
+            raise ReplayError(f"Cannot record seed {seed} with difficulty {difficulty!r}")
+        self.path = path
+        self.file = open(path + '.part', 'wb')
+        header = HEADER.pack(MAGIC, VERSION, TICK_RATE, seed, bee_y, len(name)) + name
+        self.file.write(header)
+        self.crc = zlib.crc32(header)
+        self.buffer = bytearray()
+        self.byte = 0
+        self.ticks = 0
+        self.jumps = 0
+
+    @classmethod
+    def for_world(cls, path, world):
+        """
+        :function for_world: Zaczyna nagrywanie świeżo utworzonej gry
+        :param world: Gra przed pierwszym krokiem
+        :type world: simulation.World
+        :rtype: ReplayWriter
+        """
+        return cls(path, world.seed, world.difficulty, world.bee.y)
+
+    def record(self, jump):
+        """
+        :function record: Dopisuje stan skoku w kolejnym kroku symulacji
+        :param jump: True jeśli przycisk skoku był wciśnięty
+        :type jump: bool
+        """
+        if jump:
+            self.byte |= 1 << (self.ticks & 7)
+            self.jumps += 1
+        self.ticks += 1
+        if self.ticks & 7 == 0:
+            self.buffer.append(self.byte)
+            self.byte = 0
+            if len(self.buffer) >= CHUNK_SIZE:
+                self.flush()
+
+    def flush(self):
+        """
+        :function flush: Zapisuje bufor do pliku
+        """
+        self.crc = zlib.crc32(self.buffer, self.crc)
+        self.file.write(self.buffer)
+        self.buffer.clear()
+
+    def close(self, score):
+        """
+        :function close: Kończy nagranie, zapisując wynik, i nadaje plikowi docelową nazwę
+        :param score: Wynik gry
+        :type score: int
+        """
+        if self.ticks & 7:
+            self.buffer.append(self.byte)
+        self.flush()
+        result = RESULT.pack(self.ticks, score)
+        self.file.write(result + CHECKSUM.pack(zlib.crc32(result, self.crc)))
+        self.file.close()
+        os.replace(self.path + '.part', self.path)
+
+    def discard(self):
+        """
+        :function discard: Porzuca nagranie i usuwa plik
+        """
+        self.file.close()
+        os.remove(self.path + '.part')
+
+
+class ReplayReader:
+    """
+    :class ReplayReader: Odczyt powtórki. Konstruktor czyta tylko nagłówek i zakończenie pliku,
+    a stany skoku czytane są porcjami w trakcie odtwarzania.
+        :ivar self.seed: Ziarno toru
+        :type self.seed: int
+        :ivar self.difficulty: Nazwa krzywej trudności
+        :type self.difficulty: string
+        :ivar self.bee_y: Początkowe położenie trzmiela w pionie
+        :type self.bee_y: float
+        :ivar self.ticks: Ilość nagranych kroków
+        :type self.ticks: int
+        :ivar self.score: Wynik zapisany przy nagrywaniu
+        :type self.score: int
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size or header[:4] != MAGIC:
+                raise ReplayError(f"{path} is not a replay file")
+            _, version, tick_rate, self.seed, self.bee_y, name_size = HEADER.unpack(header)
+            if version != VERSION:
+                raise ReplayError(f"{path}: unsupported replay version {version}")
+            if tick_rate != TICK_RATE:
+                raise ReplayError(f"{path}: recorded at {tick_rate} ticks/s, simulation runs at {TICK_RATE}")
+            self.difficulty = f.read(name_size).decode(errors='replace')
+            if self.difficulty not in DIFFICULTIES:
+                raise ReplayError(f"{path}: unknown difficulty {self.difficulty!r}")
+            self.body_start = HEADER.size + name_size
+            size = f.seek(0, os.SEEK_END)
+            if size < self.body_start + TRAILER_SIZE:
+                raise ReplayError(f"{path} is truncated")
+            f.seek(size - TRAILER_SIZE)
+            self.ticks, self.score = RESULT.unpack(f.read(RESULT.size))
+            self.crc, = CHECKSUM.unpack(f.read(CHECKSUM.size))
+        self.body_size = size - TRAILER_SIZE - self.body_start
+        if self.body_size != (self.ticks + 7) // 8:
+            raise ReplayError(f"{path} is truncated")
+
+    def chunks(self):
+        """
+        :function chunks: Czyta kolejne porcje danych, sprawdzając sumę kontrolną przed oddaniem ostatniej
+        :rtype: Iterator[bytes]
+        """
+        with open(self.path, 'rb') as f:
+            crc = zlib.crc32(f.read(self.body_start))
+            left = self.body_size
+            while True:
+                chunk = f.read(min(CHUNK_SIZE, left))
+                left -= len(chunk)
+                crc = zlib.crc32(chunk, crc)
+                if left == 0:
+                    crc = zlib.crc32(f.read(RESULT.size), crc)
+                    if crc != self.crc:
+                        raise ReplayError(f"{self.path}: checksum mismatch")
+                    yield chunk
+                    return
+                if not chunk:
+                    raise ReplayError(f"{self.path} is truncated")
+                yield chunk
+
+    def inputs(self):
+        """
+        :function inputs: Zwraca stany skoku w kolejnych krokach
+        :rtype: Iterator[bool]
+        """
+        tick = 0
+        for chunk in self.chunks():
+            for byte in chunk:
+                for bit in range(min(8, self.ticks - tick)):
+                    yield bool(byte >> bit & 1)
+                tick += 8
+
+    def new_world(self):
+        """
+        :function new_world: Tworzy grę w stanie, w którym zaczęło się nagranie
+        :rtype: simulation.World
+        """
+        return World(self.seed, self.bee_y, self.difficulty)
+
+    def play(self):
+        """
+        :function play: Odtwarza całą powtórkę bez okna
+        :return: Gra po ostatnim nagranym kroku
+        :rtype: simulation.World
+        """
+        world = self.new_world()
+        for jump in self.inputs():
+            world.step(jump)
+        return world
+
+
+def main(paths):
+    """
+    :function main: Odtwarza powtórki bez okna i porównuje wyniki z zapisanymi
+    :param paths: Adresy plików
+    :type paths: List[string]
+    :return: Kod wyjścia - 0 jeśli wszystkie wyniki się zgadzają
+    :rtype: int
+    """
+    status = 0
+    for path in paths:
+        try:
+            replay = ReplayReader(path)
+            world = replay.play()
+        except (OSError, ReplayError) as error:
+            print(error)
+            status = 1
+            continue
+        if world.score != replay.score:
+            status = 1
+        result = "OK" if world.score == replay.score else "MISMATCH"
+        print(f"{path}: seed {replay.seed}, {replay.difficulty}, {replay.ticks} ticks "
+              f"({os.path.getsize(path)} B), score {replay.score}, replayed {world.score} {result}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,197 @@
+import bisect
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+"""
+    scores
+    ======
+    Trwały zapis wyników w bazie SQLite w trybie WAL: pełna historia gier z czasem, ziarnem toru, krzywą trudności,
+    długością gry, nazwą pliku powtórki i oznaczeniem wyścigów. Najlepsze wyniki gier jednoosobowych odczytywane
+    są z indeksu, a zapis odbywa się w osobnym wątku, więc klatka, w której gra się kończy, nie czeka na dysk.
+    Przerwanie programu w trakcie zapisu nie uszkadza bazy - niezatwierdzona gra po prostu się nie zapisuje.
+    Przy pierwszym otwarciu do bazy przepisywane są wyniki z dawnego pliku tekstowego (po jednym w wierszu).
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    score INTEGER NOT NULL,
+    played_at REAL NOT NULL,
+    seed INTEGER,
+    difficulty TEXT,
+    ticks INTEGER,
+    replay TEXT,
+    race INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+""" Ilość najlepszych wyników trzymanych w pamięci do wyświetlania """
+CACHED_SCORES = 10
+
+
+def connect(path):
+    """
+    :function connect: Otwiera bazę wyników w trybie WAL, tworząc tabele jeśli ich nie ma
+    :param path: Adres pliku bazy
+    :type path: string
+    :rtype: sqlite3.Connection
+    """
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    """ w trybie WAL synchronous=NORMAL nie grozi uszkodzeniem bazy, najwyżej utratą ostatniej gry przy awarii """
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    """ bazy sprzed zapisywania wyścigów nie mają kolumny race - wszystkie ich gry są jednoosobowe """
+    if 'race' not in [column[1] for column in connection.execute("PRAGMA table_info(scores)")]:
+        connection.execute("ALTER TABLE scores ADD COLUMN race INTEGER NOT NULL DEFAULT 0")
+    """ indeks zaczyna się od race, żeby najlepsze wyniki gier jednoosobowych były jego początkiem bez sortowania;
+    dawny indeks bez race zastępujemy """
+    connection.execute("DROP INDEX IF EXISTS scores_by_score")
+    connection.execute("CREATE INDEX IF NOT EXISTS scores_by_race_score ON scores (race, score DESC, played_at)")
+    connection.commit()
+    return connection
+
+
+class ScoreStore:
+    """
+    :class ScoreStore: Baza wyników z zapisem w tle
+        :ivar self.path: Adres pliku bazy
+        :type self.path: string
+        :ivar self.best_scores: Najlepsze wyniki gier jednoosobowych (malejąco), uaktualniane od razu przy dodaniu
+            gry
+        :type self.best_scores: List[int]
+        :ivar self.pending: Kolejka gier do zapisania przez wątek zapisu (None kończy wątek)
+        :type self.pending: queue.Queue
+    """
+
+    def __init__(self, path, legacy_path=None):
+        """
+        :param path: Adres pliku bazy
+        :type path: string
+        :param legacy_path: Adres dawnego pliku z wynikami, przepisywanego do bazy raz
+        :type legacy_path: string
+        """
+        self.path = path
+        self.connection = connect(path)
+        if legacy_path:
+            self.migrate(legacy_path)
+        self.best_scores = self.top(CACHED_SCORES)
+        self.pending = queue.Queue()
+        self.writer = threading.Thread(target=self.write_scores, name='scores', daemon=True)
+        self.writer.start()
+
+    def migrate(self, legacy_path):
+        """
+        :function migrate: Przepisuje wyniki z dawnego pliku tekstowego, jeśli jeszcze nie zostały przepisane
+        :param legacy_path: Adres pliku
+        :type legacy_path: string
+        """
+        with self.connection:
+            if self.connection.execute("SELECT 1 FROM meta WHERE key = 'migrated'").fetchone():
+                return
+            if os.path.exists(legacy_path):
+                played_at = os.path.getmtime(legacy_path)
+                with open(legacy_path) as f:
+                    scores = [int(line) for line in f if line.strip().isdigit()]
+                self.connection.executemany("INSERT INTO scores (score, played_at) VALUES (?, ?)",
+                                            [(score, played_at) for score in scores])
+            self.connection.execute("INSERT INTO meta (key, value) VALUES ('migrated', ?)", (legacy_path,))
+
+    def add(self, score, seed=None, difficulty=None, ticks=None, replay=None, race=False):
+        """
+        :function add: Dodaje wynik gry - od razu do najlepszych wyników w pamięci, a do bazy w tle
+        :param score: Wynik
+        :type score: int
+        :param seed: Ziarno toru
+        :type seed: int
+        :param difficulty: Krzywa trudności
+        :type difficulty: string
+        :param ticks: Długość gry w krokach symulacji
+        :type ticks: int
+        :param replay: Nazwa pliku powtórki
+        :type replay: string
+        :param race: True dla wyniku wyścigu (nie trafia do najlepszych wyników gier jednoosobowych)
+        :type race: bool
+        """
+        if not race:
+            """ wyniki trzymane są malejąco, więc szukamy miejsca wśród wartości przeciwnych """
+            position = bisect.bisect_right([-best for best in self.best_scores], -score)
+            if position < CACHED_SCORES:
+                self.best_scores.insert(position, score)
+                del self.best_scores[CACHED_SCORES:]
+        self.pending.put((score, time.time(), seed, difficulty, ticks, replay, int(race)))
+
+    def write_scores(self):
+        """
+        :function write_scores: Wątek zapisu - zatwierdza w bazie kolejne gry z kolejki
+        """
+        connection = connect(self.path)
+        while True:
+            row = self.pending.get()
+            if row is None:
+                self.pending.task_done()
+                break
+            try:
+                with connection:
+                    connection.execute("INSERT INTO scores (score, played_at, seed, difficulty, ticks, replay, race) "
+                                       "VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+            except sqlite3.Error as error:
+                """ np. baza zablokowana przez drugą kopię gry - ta gra przepada, ale wątek zapisuje następne """
+                print(f"Couldn't save score {row[0]}: {error}", file=sys.stderr)
+            finally:
+                self.pending.task_done()
+        connection.close()
+
+    def best(self):
+        """
+        :function best: Najlepszy wynik (0 jeśli brak gier)
+        :rtype: int
+        """
+        return self.best_scores[0] if self.best_scores else 0
+
+    def top(self, count=CACHED_SCORES):
+        """
+        :function top: Najlepsze zapisane wyniki gier jednoosobowych, odczytane z indeksu (bez gier czekających
+        jeszcze na zapis)
+        :param count: Ilość wyników
+        :type count: int
+        :rtype: List[int]
+        """
+        return [score for score, in self.connection.execute(
+            "SELECT score FROM scores WHERE race = 0 ORDER BY score DESC, played_at LIMIT ?", (count,))]
+
+    def history(self, limit=None):
+        """
+        :function history: Zapisane gry od najnowszej
+        :param limit: Największa ilość gier (None - wszystkie)
+        :type limit: int
+        :rtype: List[sqlite3.Row]
+        """
+        self.connection.row_factory = sqlite3.Row
+        try:
+            return self.connection.execute("SELECT * FROM scores ORDER BY played_at DESC, id DESC LIMIT ?",
+                                           (-1 if limit is None else limit,)).fetchall()
+        finally:
+            self.connection.row_factory = None
+
+    def flush(self):
+        """
+        :function flush: Czeka, aż wszystkie dodane gry zostaną zapisane
+        """
+        self.pending.join()
+
+    def close(self):
+        """
+        :function close: Zapisuje czekające gry, kończy wątek zapisu i zamyka bazę
+        """
+        if self.writer.is_alive():
+            self.pending.put(None)
+            self.writer.join()
+        self.connection.close()
@@ -0,0 +1,395 @@
+import argparse
+import asyncio
+import heapq
+import itertools
+import math
+import multiprocessing
+import os
+import queue
+import random
+import socket
+import sys
+import time
+
+from network import (RaceServer, Race, message, read_message, pack_bits, HELLO, HELLO_DATA, START, START_DATA, INPUT,
+                     INPUT_DATA, RESULT, BUSY, PROTOCOL_VERSION, INPUT_TICKS)
+from simulation import TICK_RATE, DIFFICULTIES
+from stats import percentile
+
+"""
+    session_server
+    ==============
+    Serwer wielu niezależnych gier jednoosobowych naraz, bez okna - do rozgrywania na serwerze gier, których wynik
+    ma być pewny (np. w rankingu). Protokół jest ten sam co w wyścigach (network), każda sesja to wyścig jednego
+    gracza, więc klientem może być network.RaceSession.
+    Jedna pętla asyncio na proces: kroki sesji ustawione są w kolejce według czasu następnego kroku, a sesje zaczynają
+    się na wspólnej siatce kroków, więc jedno obudzenie pętli przesuwa wszystkie sesje, na które przyszła pora.
+    Przeciążenie:
+        - klient, który nie odbiera danych, jest rozłączany (network.MAX_BUFFERED)
+        - proces obciążony powyżej max_load albo spóźniający kroki o więcej niż MAX_JITTER odrzuca nowe sesje (BUSY),
+          a nowe sesje przyjmuje najwyżej ADMISSION_RATE na sekundę (ich koszt widać dopiero po starcie)
+        - sesja spóźniona o więcej niż MAX_LAG pomija ten czas zamiast nadrabiać go kolejnymi krokami
+    Sesje dzielone są pomiędzy procesy słuchające na tym samym porcie (SO_REUSEPORT, tylko Linux), a nowy proces
+    uruchamiany jest, gdy wszystkie dotychczasowe są obciążone powyżej SCALE_LOAD. Co REPORT_INTERVAL sekund
+    wypisywana jest ilość sesji, obciążenie procesów, ilość sesji na rdzeń i spóźnienia kroków.
+    Uruchomienie:
+        python session_server.py serve [--port 5556] [--workers 1] [--max-workers N] [--seed N] [--difficulty classic]
+        python session_server.py load [--clients 200] [--duration 30] [--processes 1]
+"""
+
+"""
+    Stałe serwera
+    -------------
+    DEFAULT_PORT : int
+        Domyślny port serwera sesji
+    REPORT_INTERVAL : float
+        Co ile sekund procesy zgłaszają statystyki
+    LOAD_INTERVAL : float
+        Co ile sekund mierzone jest obciążenie procesu używane przy przyjmowaniu sesji
+    ADMISSION_RATE : int
+        Największa ilość nowych sesji na sekundę w jednym procesie
+    MAX_LOAD : float
+        Obciążenie procesu (czas procesora / czas), powyżej którego nowe sesje są odrzucane
+    SCALE_LOAD : float
+        Obciążenie wszystkich procesów, powyżej którego uruchamiany jest kolejny
+    MAX_JITTER : float
+        Średnie spóźnienie ostatnich kroków (w sekundach), powyżej którego nowe sesje są odrzucane
+    MAX_LAG : float
+        Spóźnienie sesji (w sekundach), powyżej którego pomijany jest czas zamiast nadrabiania kroków
+"""
+DEFAULT_PORT = 5556
+REPORT_INTERVAL = 5.0
+LOAD_INTERVAL = 0.5
+ADMISSION_RATE = 100
+MAX_LOAD = 0.85
+SCALE_LOAD = 0.7
+MAX_JITTER = 1 / TICK_RATE
+MAX_LAG = 0.25
+
+
+class SessionServer(RaceServer):
+    """
+    :class SessionServer: Serwer gier jednoosobowych w jednym procesie, z krokami wszystkich sesji w jednej kolejce
+        :ivar self.schedule: Kopiec (czas następnego kroku, numer, sesja) trwających sesji
+        :type self.schedule: List[Tuple[float, int, network.Race]]
+        :ivar self.lateness: Spóźnienia kroków od ostatniego raportu (w sekundach)
+        :type self.lateness: List[float]
+        :ivar self.load: Obciążenie procesu w ostatnich LOAD_INTERVAL sekundach
+        :type self.load: float
+        :ivar self.lag: Średnie spóźnienie kroków przy ostatnich obudzeniach pętli (w sekundach, 0 gdy brak sesji)
+        :type self.lag: float
+        :ivar self.admitted: Ilość sesji przyjętych w bieżącym okresie LOAD_INTERVAL
+        :type self.admitted: int
+        :ivar self.reports: Kolejka, do której trafiają statystyki (None - wypisywane)
+        :type self.reports: multiprocessing.Queue
+    """
+
+    def __init__(self, seed=None, difficulty='classic', max_load=MAX_LOAD, worker=0, reports=None,
+                 verbose=False):
+        super().__init__(1, seed, difficulty, verbose)
+        self.max_load = max_load
+        self.worker = worker
+        self.reports = reports
+        self.schedule = []
+        self.numbers = itertools.count()
+        self.wakeup = None
+        self.lateness = []
+        self.load = 0.0
+        self.lag = 0.0
+        self.admitted = 0
+        self.finished = 0
+        self.rejected = 0
+        self.skipped = 0
+
+    async def start(self, host='', port=DEFAULT_PORT, reuse_port=False):
+        self.wakeup = asyncio.Event()
+        await super().start(host, port, reuse_port)
+        asyncio.ensure_future(self.run_schedule())
+        asyncio.ensure_future(self.monitor())
+
+    def log(self, text):
+        """ pojedyncze sesje nie są wypisywane, tylko raporty """
+
+    @property
+    def overloaded(self):
+        """ True jeśli proces nie przyjmuje nowych sesji """
+        return (self.load > self.max_load or self.lag > MAX_JITTER or
+                self.admitted >= ADMISSION_RATE * LOAD_INTERVAL)
+
+    def join(self, player):
+        """
+        :function join: Zaczyna sesję nowego gracza, chyba że proces jest przeciążony
+        :param player: Nowy gracz
+        :type player: network.RacePlayer
+        :rtype: bool
+        """
+        if self.overloaded:
+            self.rejected += 1
+            return False
+        self.admitted += 1
+        session = Race(self, [player])
+        session.begin(asyncio.get_event_loop().time())
+        """ początek na siatce kroków, żeby kroki wielu sesji wypadały w tych samych chwilach """
+        session.start = math.ceil(session.start * TICK_RATE) / TICK_RATE
+        heapq.heappush(self.schedule, (session.deadline, next(self.numbers), session))
+        self.wakeup.set()
+        return True
+
+    async def run_schedule(self):
+        """
+        :function run_schedule: Wykonuje kroki sesji w czasie, na który przypadają, i kończy sesje, w których
+        gracz wylądował
+        """
+        loop = asyncio.get_event_loop()
+        schedule = self.schedule
+        while True:
+            if not schedule:
+                """ bez sesji nie ma spóźnionych kroków - stare opóźnienie nie może blokować nowych sesji """
+                self.lag = 0.0
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+            """ czekamy zawsze, choćby zerowy czas, żeby pętla obsłużyła też połączenia """
+            await asyncio.sleep(max(0.0, schedule[0][0] - loop.time()))
+            now = loop.time()
+            """ średnia ruchoma, żeby pojedyncze opóźnienie pętli nie blokowało przyjmowania sesji """
+            self.lag += (now - schedule[0][0] - self.lag) * 0.1
+            while schedule and schedule[0][0] <= now:
+                deadline, number, session = heapq.heappop(schedule)
+                late = now - deadline
+                if late > MAX_LAG:
+                    skipped = math.ceil(late * TICK_RATE)
+                    session.start += skipped / TICK_RATE
+                    self.skipped += skipped
+                self.lateness.append(late)
+                session.step()
+                if session.finished:
+                    self.finished += 1
+                    asyncio.ensure_future(session.finish())
+                else:
+                    heapq.heappush(schedule, (session.deadline, number, session))
+
+    async def monitor(self):
+        """
+        :function monitor: Co LOAD_INTERVAL sekund mierzy obciążenie procesu i odnawia limit nowych sesji,
+        a co REPORT_INTERVAL sekund zgłasza statystyki
+        """
+        loop = asyncio.get_event_loop()
+        wall, cpu = loop.time(), time.process_time()
+        report_wall, report_cpu = wall, cpu
+        while True:
+            await asyncio.sleep(LOAD_INTERVAL)
+            now, now_cpu = loop.time(), time.process_time()
+            self.load = (now_cpu - cpu) / (now - wall)
+            self.admitted = 0
+            wall, cpu = now, now_cpu
+            if now - report_wall < REPORT_INTERVAL:
+                continue
+            lateness = sorted(self.lateness)
+            self.lateness = []
+            stats = {
+                'worker': self.worker,
+                'sessions': len(self.schedule),
+                'ticks': len(lateness) / (now - report_wall),
+                'load': (now_cpu - report_cpu) / (now - report_wall),
+                'jitter_p50': percentile(lateness, 0.5),
+                'jitter_p99': percentile(lateness, 0.99),
+                'jitter_max': lateness[-1] if lateness else 0.0,
+                'finished': self.finished,
+                'rejected': self.rejected,
+                'skipped': self.skipped,
+            }
+            report_wall, report_cpu = now, now_cpu
+            if self.reports is None:
+                print(format_report([stats]), flush=True)
+            else:
+                self.reports.put(stats)
+
+
+def format_report(stats):
+    """
+    :function format_report: Jedna linia raportu ze statystyk wszystkich procesów
+    :param stats: Ostatnie statystyki każdego procesu
+    :type stats: List[Dict[string, Any]]
+    :rtype: string
+    """
+    sessions = sum(worker['sessions'] for worker in stats)
+    load = sum(worker['load'] for worker in stats)
+    per_core = f"{sessions / load:.0f}" if load > 0.01 else "-"
+    loads = ' '.join(f"{worker['load']:.2f}" for worker in stats)
+    return (f"workers {len(stats)} | sessions {sessions} ({sum(worker['ticks'] for worker in stats):.0f} ticks/s) | "
+            f"load {loads} | {per_core} sessions/core | "
+            f"jitter p50 {max(worker['jitter_p50'] for worker in stats) * 1000:.2f} ms "
+            f"p99 {max(worker['jitter_p99'] for worker in stats) * 1000:.2f} ms "
+            f"max {max(worker['jitter_max'] for worker in stats) * 1000:.2f} ms | "
+            f"finished {sum(worker['finished'] for worker in stats)} "
+            f"rejected {sum(worker['rejected'] for worker in stats)} "
+            f"skipped ticks {sum(worker['skipped'] for worker in stats)}")
+
+
+def run_worker(worker, host, port, seed, difficulty, max_load, reports, reuse_port):
+    """
+    :function run_worker: Proces serwera sesji
+    """
+    server = SessionServer(seed, difficulty, max_load, worker, reports)
+    try:
+        asyncio.run(server.serve(host, port, reuse_port))
+    except KeyboardInterrupt:
+        pass
+
+
+def supervise(host='', port=DEFAULT_PORT, workers=1, max_workers=None, seed=None, difficulty='classic',
+              max_load=MAX_LOAD):
+    """
+    :function supervise: Uruchamia procesy serwera sesji, wypisuje ich zbiorcze raporty i dodaje procesy,
+    gdy wszystkie są obciążone powyżej SCALE_LOAD
+    :param workers: Ilość procesów na start
+    :param max_workers: Największa ilość procesów (None - ilość rdzeni)
+    """
+    reuse_port = sys.platform.startswith('linux') and hasattr(socket, 'SO_REUSEPORT')
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if not reuse_port:
+        """ bez SO_REUSEPORT połączenia nie są dzielone pomiędzy procesy słuchające na jednym porcie """
+        workers = max_workers = 1
+    reports = multiprocessing.Queue()
+    processes = []
+
+    def spawn():
+        process = multiprocessing.Process(target=run_worker, daemon=True,
+                                          args=(len(processes), host, port, seed, difficulty, max_load, reports,
+                                                reuse_port))
+        process.start()
+        processes.append(process)
+
+    for _ in range(max(1, min(workers, max_workers))):
+        spawn()
+    print(f"serving sessions on port {port} with {len(processes)} worker(s), up to {max_workers}", flush=True)
+    latest = {}
+    try:
+        while True:
+            try:
+                stats = reports.get(timeout=REPORT_INTERVAL * 2)
+            except queue.Empty:
+                continue
+            latest[stats['worker']] = stats
+            if len(latest) < len(processes):
+                continue
+            print(format_report([latest[worker] for worker in sorted(latest)]), flush=True)
+            if len(processes) < max_workers and all(worker['load'] > SCALE_LOAD for worker in latest.values()):
+                spawn()
+                print(f"all workers above {SCALE_LOAD:.0%} load, started worker {len(processes) - 1}", flush=True)
+            latest = {}
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+
+
+async def load_client(host, port, until, stats):
+    """
+    :function load_client: Klient obciążający - rozgrywa kolejne sesje do czasu until, skacząc co 45 kroków
+    (bez przewidywania gry, więc trzmiel w końcu uderza w przeszkodę i zaczyna się nowa sesja)
+    """
+    loop = asyncio.get_event_loop()
+    while loop.time() < until:
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            stats['errors'] += 1
+            await asyncio.sleep(1.0)
+            continue
+        writer.write(message(HELLO, HELLO_DATA.pack(PROTOCOL_VERSION)))
+        sender = None
+        try:
+            while True:
+                kind, payload = await read_message(reader)
+                stats['received'] += len(payload)
+                if kind == BUSY:
+                    stats['rejected'] += 1
+                    await asyncio.sleep(random.uniform(0.5, 1.5))
+                    break
+                if kind == START:
+                    start = loop.time() + START_DATA.unpack_from(payload)[0] / 1000 - 0.05
+                    sender = asyncio.ensure_future(send_inputs(writer, start, random.randrange(45)))
+                elif kind == RESULT:
+                    stats['sessions'] += 1
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            stats['errors'] += 1
+        finally:
+            if sender is not None:
+                sender.cancel()
+            writer.close()
+
+
+async def send_inputs(writer, start, phase):
+    """
+    :function send_inputs: Wysyła skoki klienta obciążającego co INPUT_TICKS kroków od czasu start
+    """
+    loop = asyncio.get_event_loop()
+    tick = 0
+    while True:
+        await asyncio.sleep(max(0.0, start + (tick + INPUT_TICKS) / TICK_RATE - loop.time()))
+        bits = [(tick + 1 + i + phase) % 45 == 0 for i in range(INPUT_TICKS)]
+        writer.write(message(INPUT, INPUT_DATA.pack(tick + 1, INPUT_TICKS) + pack_bits(bits)))
+        tick += INPUT_TICKS
+
+
+def run_load(host, port, clients, duration):
+    """
+    :function run_load: Uruchamia clients klientów obciążających na duration sekund
+    :return: Statystyki klientów
+    :rtype: Dict[string, int]
+    """
+    stats = {'sessions': 0, 'rejected': 0, 'errors': 0, 'received': 0}
+
+    async def run():
+        until = asyncio.get_event_loop().time() + duration
+        await asyncio.gather(*(load_client(host, port, until, stats) for _ in range(clients)))
+
+    asyncio.run(run())
+    return stats
+
+
+def load(host='localhost', port=DEFAULT_PORT, clients=200, duration=30.0, processes=1):
+    """
+    :function load: Obciąża serwer sesji clients klientami rozłożonymi na processes procesów i wypisuje podsumowanie
+    """
+    per_process = [clients // processes + (i < clients % processes) for i in range(processes)]
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.starmap(run_load, [(host, port, count, duration) for count in per_process])
+    total = {key: sum(result[key] for result in results) for key in results[0]}
+    print(f"{clients} clients for {duration:.0f} s: {total['sessions']} sessions finished, "
+          f"{total['rejected']} rejected as busy, {total['errors']} connection errors, "
+          f"{total['received'] / duration / clients:.0f} B/s received per client")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="TrzmielIT headless session server")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve = commands.add_parser('serve', help="host single-player sessions")
+    serve.add_argument('--host', default='')
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve.add_argument('--workers', type=int, default=1, help="worker processes to start with")
+    serve.add_argument('--max-workers', type=int, help="add workers up to this many (default: CPU count)")
+    serve.add_argument('--max-load', type=float, default=MAX_LOAD, help="reject new sessions above this load")
+    serve.add_argument('--seed', type=int)
+    serve.add_argument('--difficulty', default='classic', choices=sorted(DIFFICULTIES))
+    load_test = commands.add_parser('load', help="run load-test clients against a session server")
+    load_test.add_argument('--host', default='localhost')
+    load_test.add_argument('--port', type=int, default=DEFAULT_PORT)
+    load_test.add_argument('--clients', type=int, default=200)
+    load_test.add_argument('--duration', type=float, default=30.0)
+    load_test.add_argument('--processes', type=int, default=1)
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        supervise(args.host, args.port, args.workers, args.max_workers, args.seed, args.difficulty, args.max_load)
+    else:
+        load(args.host, args.port, args.clients, args.duration, args.processes)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
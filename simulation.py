@@ -0,0 +1,485 @@
+import math
+import random
+
+from collision import collides, REACH, GAP_SIZE
+
+"""
+    simulation
+    ==========
+    Symulacja rozgrywki TrzmielIT niezależna od pygame - bez okna, dźwięku i czcionek.
+    Trzmiel, przeszkody, punktacja i kolizje są liczone w krokach o stałej długości,
+    dzięki czemu tę samą grę można uruchomić w oknie, na serwerze albo tysiące razy na sekundę przy strojeniu.
+"""
+
+"""
+    Stałe symulacji
+    ---------------
+    TICK_RATE : int
+        Ilość kroków symulacji na sekundę, niezależna od FPS
+    MAX_FRAME_TIME : int
+        Najdłuższy czas klatki (w ms) uwzględniany przez symulację, dłuższe przestoje są obcinane
+    WORLD_WIDTH : int
+        Szerokość świata gry
+    WORLD_HEIGHT : int
+        Wysokość świata gry
+    BEE_X : int
+        Stałe położenie środka trzmiela w poziomie
+    BEE_START_Y : int
+        Początkowe położenie środka trzmiela w pionie
+    BEE_SIZE : Tuple[int, int]
+        Rozmiar trzmiela
+    OBSTACLE_SIZE : Tuple[int, int]
+        Rozmiar przeszkody (przerwa w przeszkodzie wynika z kształtu jej obrazka, zob. collision)
+    OBSTACLE_START_X : int
+        Położenie pierwszej przeszkody na początku gry
+    OBSTACLE_SPACING : int
+        Odstęp pomiędzy przeszkodami w klasycznym torze
+    OBSTACLE_RECYCLE_X : int
+        Położenie, za którym przeszkoda wraca do puli i zostaje ustawiona na końcu toru
+    GAP_RANGE : Tuple[int, int]
+        Zakres położeń środka przerwy w pionie
+"""
+TICK_RATE = 120
+MAX_FRAME_TIME = 250
+WORLD_WIDTH = 800
+WORLD_HEIGHT = 600
+BEE_X = 150
+BEE_START_Y = 280
+BEE_SIZE = (60, 56)
+OBSTACLE_SIZE = (100, 1150)
+OBSTACLE_START_X = 1000
+OBSTACLE_SPACING = 400
+OBSTACLE_RECYCLE_X = -200
+GAP_RANGE = (80, 520)
+
+"""
+    Stałe fizyki gry wyrażone w jednostkach na krok symulacji
+    ---------------------------------------------------------
+    Wartości odpowiadają dotychczasowej rozgrywce, w której fizyka liczona była 30 razy na sekundę
+    (grawitacja 1.5, skok -15 i przesunięcie rur o 5 pikseli na klatkę)
+    GRAVITY : float
+        Przyrost prędkości trzmiela na krok
+    JUMP_VELOCITY : float
+        Prędkość trzmiela tuż po skoku
+    OBSTACLE_SPEED : float
+        Przesunięcie przeszkód na krok
+    SPIN_SPEED : float
+        Obrót trzmiela na krok w trakcie animacji kolizji
+    ANIMATION_TICKS : int
+        Co ile kroków zmienia się klatka animacji trzmiela
+    BEE_FRAMES : int
+        Ilość klatek animacji trzmiela
+    BOB_RANGE : int
+        Zakres unoszenia się trzmiela w oczekiwaniu na start
+"""
+GRAVITY = 1350.0 / TICK_RATE ** 2
+JUMP_VELOCITY = -450.0 / TICK_RATE
+OBSTACLE_SPEED = 150.0 / TICK_RATE
+SPIN_SPEED = 300.0 / TICK_RATE
+ANIMATION_TICKS = TICK_RATE // 30
+BEE_FRAMES = 4
+BOB_RANGE = 5
+
+"""
+    Zdarzenia zwracane przez World.step
+    -----------------------------------
+    JUMP - trzmiel podskoczył
+    POINT - gracz zdobył punkt
+    HIT - trzmiel uderzył w przeszkodę
+    LANDED - trzmiel spadł po kolizji, gra się zakończyła
+"""
+JUMP = 'jump'
+POINT = 'point'
+HIT = 'hit'
+LANDED = 'landed'
+
+
+class FixedTimestep:
+    """
+    :class FixedTimestep: Akumulator czasu dzielący czas klatek na stałe kroki symulacji
+        :ivar self.tick_time: Długość kroku w milisekundach
+        :type self.tick_time: float
+        :ivar self.accumulator: Czas, który nie został jeszcze zasymulowany
+        :type self.accumulator: float
+    """
+
+    def __init__(self, tick_rate=TICK_RATE, max_frame_time=MAX_FRAME_TIME):
+        self.tick_time = 1000 / tick_rate
+        self.max_frame_time = max_frame_time
+        self.accumulator = 0.0
+
+    def advance(self, elapsed):
+        """
+        :function advance: Dodaje czas klatki do akumulatora, przestoje dłuższe niż max_frame_time są obcinane
+        :param elapsed: Czas od poprzedniej klatki w milisekundach
+        :type elapsed: int
+        """
+        self.accumulator += min(elapsed, self.max_frame_time)
+
+    def step(self):
+        """
+        :function step: Zużywa jeden krok z akumulatora
+        :return: True jeśli należy wykonać krok symulacji
+        :rtype: bool
+        """
+        if self.accumulator >= self.tick_time:
+            self.accumulator -= self.tick_time
+            return True
+        return False
+
+    @property
+    def alpha(self):
+        """ Ułamek kroku pozostały w akumulatorze, używany do interpolacji przy rysowaniu """
+        return self.accumulator / self.tick_time
+
+
+class Bee:
+    """
+    :class Bee: Stan trzmiela
+        :ivar self.y: Położenie środka w pionie po ostatnim kroku
+        :type self.y: float
+        :ivar self.previous_y: Położenie środka w pionie przed ostatnim krokiem
+        :type self.previous_y: float
+        :ivar self.y_velocity: Prędkość w pionie
+        :type self.y_velocity: float
+        :ivar self.frame: Numer klatki animacji
+        :type self.frame: int
+        :ivar self.rotation: Obrót w stopniach
+        :type self.rotation: float
+        :ivar self.grow: Parametr unoszenia w oczekiwaniu na start
+        :type self.grow: int
+        :ivar self.mode: Kierunek unoszenia (w dół [+], w górę [-])
+        :type self.mode: int
+        :ivar self.if_jumped: True dopóki przycisk skoku jest wciśnięty od ostatniego skoku
+        :type self.if_jumped: bool
+        :ivar self.collision: True po uderzeniu w przeszkodę
+        :type self.collision: bool
+        :ivar self.stop: True gdy trzmiel spadł po kolizji
+        :type self.stop: bool
+    """
+
+    __slots__ = ('y', 'previous_y', 'y_velocity', 'frame', 'rotation', 'grow', 'mode', 'if_jumped',
+                 'collision', 'stop')
+
+    def __init__(self, y=BEE_START_Y):
+        self.y = float(y)
+        self.previous_y = self.y
+        self.y_velocity = 0.0
+        self.frame = 0
+        self.rotation = 0.0
+        self.grow = 0
+        self.mode = 1
+        self.if_jumped = False
+        self.collision = False
+        self.stop = False
+
+
+class Difficulty:
+    """
+    :class Difficulty: Krzywa trudności toru - odstępy pomiędzy przeszkodami i wielkość przerw zmieniają się
+    liniowo od wartości początkowych do końcowych przez pierwsze ramp przeszkód, a potem zostają stałe
+        :ivar self.spacing: Odstęp pomiędzy przeszkodami (początkowy, końcowy)
+        :type self.spacing: Tuple[int, int]
+        :ivar self.gap: Wysokość przerwy (początkowa, końcowa)
+        :type self.gap: Tuple[int, int]
+        :ivar self.ramp: Ilość przeszkód, po której trudność przestaje rosnąć
+        :type self.ramp: int
+        :ivar self.spacing_jitter: Największe losowe odchylenie odstępu
+        :type self.spacing_jitter: int
+    """
+
+    def __init__(self, spacing=(OBSTACLE_SPACING, OBSTACLE_SPACING), gap=(GAP_SIZE, GAP_SIZE), ramp=1,
+                 spacing_jitter=0):
+        self.spacing = spacing
+        self.gap = gap
+        self.ramp = ramp
+        self.spacing_jitter = spacing_jitter
+
+    def at(self, index):
+        """
+        :function at: Zwraca odstęp i wielkość przerwy przeszkody o danym numerze (bez losowego odchylenia)
+        :param index: Numer przeszkody od początku gry
+        :type index: int
+        :rtype: Tuple[int, int]
+        """
+        progress = min(1.0, index / self.ramp)
+        spacing = round(self.spacing[0] + (self.spacing[1] - self.spacing[0]) * progress)
+        gap = round(self.gap[0] + (self.gap[1] - self.gap[0]) * progress)
+        return spacing, gap
+
+    @property
+    def min_spacing(self):
+        """ Najmniejszy możliwy odstęp pomiędzy przeszkodami """
+        return min(self.spacing) - self.spacing_jitter
+
+    @property
+    def obstacle_count(self):
+        """ Ilość przeszkód w puli - tyle, żeby nowa przeszkoda zawsze pojawiała się poza ekranem """
+        return math.ceil((WORLD_WIDTH - OBSTACLE_RECYCLE_X + OBSTACLE_SIZE[0]) / self.min_spacing)
+
+
+""" DIFFICULTIES : Dict[string, Difficulty]
+        Dostępne krzywe trudności: classic - stałe odstępy i przerwy jak w pierwszej wersji gry,
+        ramp - przeszkody coraz gęstsze i z coraz mniejszymi przerwami
+"""
+DIFFICULTIES = {
+    'classic': Difficulty(),
+    'ramp': Difficulty(spacing=(OBSTACLE_SPACING, 300), gap=(GAP_SIZE, 125), ramp=60, spacing_jitter=30),
+}
+
+
+class CourseGenerator:
+    """
+    :class CourseGenerator: Generator toru z ziarnem - wyznacza po kolei położenie, odstęp i wielkość przerwy
+    każdej następnej przeszkody. Ten sam seed i ta sama trudność dają zawsze ten sam tor, a kolejne przeszkody
+    ustawiane są z wyprzedzeniem, poza prawą krawędzią ekranu.
+        :ivar self.random: Generator liczb losowych toru
+        :type self.random: random.Random
+        :ivar self.difficulty: Krzywa trudności
+        :type self.difficulty: Difficulty
+        :ivar self.index: Ilość przeszkód ustawionych od początku gry
+        :type self.index: int
+    """
+
+    def __init__(self, seed=None, difficulty='classic'):
+        self.random = random.Random(seed)
+        self.difficulty = DIFFICULTIES[difficulty] if isinstance(difficulty, str) else difficulty
+        self.index = 0
+
+    def place(self, obstacle, previous_x=None):
+        """
+        :function place: Ustawia przeszkodę jako następną na torze
+        :param obstacle: Przeszkoda z puli
+        :type obstacle: ObstacleState
+        :param previous_x: Położenie poprzedniej przeszkody na torze (None - pierwsza przeszkoda)
+        :type previous_x: float
+        """
+        spacing, gap = self.difficulty.at(self.index)
+        """ kolejność losowania: przerwa, potem odchylenie odstępu (klasyczny tor losuje tylko przerwy) """
+        y = self.random.randrange(*GAP_RANGE)
+        if self.difficulty.spacing_jitter:
+            spacing += self.random.randint(-self.difficulty.spacing_jitter, self.difficulty.spacing_jitter)
+        x = OBSTACLE_START_X if previous_x is None else previous_x + spacing
+        obstacle.x = obstacle.previous_x = float(x)
+        obstacle.y = y
+        obstacle.gap = gap
+        obstacle.passed = False
+        self.index += 1
+
+
+class ObstacleState:
+    """
+    :class ObstacleState: Stan przeszkody
+        :ivar self.x: Położenie środka w poziomie po ostatnim kroku
+        :type self.x: float
+        :ivar self.previous_x: Położenie środka w poziomie przed ostatnim krokiem
+        :type self.previous_x: float
+        :ivar self.y: Położenie środka przerwy w pionie
+        :type self.y: int
+        :ivar self.gap: Wysokość przerwy
+        :type self.gap: int
+        :ivar self.passed: True gdy trzmiel minął już środek przeszkody i dostał za nią punkt
+        :type self.passed: bool
+    """
+
+    __slots__ = ('x', 'previous_x', 'y', 'gap', 'passed')
+
+    def __init__(self, x=OBSTACLE_START_X, y=0, gap=GAP_SIZE):
+        self.x = float(x)
+        self.previous_x = self.x
+        self.y = y
+        self.gap = gap
+        self.passed = False
+
+
+def check_collision(bee, obstacle):
+    """
+    :function check_collision: Sprawdza kolizję trzmiela z przeszkodą na podstawie kształtów ich obrazków
+    (aktualnej klatki animacji trzmiela i przeszkody), piksel po pikselu
+    :param bee: Trzmiel
+    :type bee: Bee
+    :param obstacle: Przeszkoda
+    :type obstacle: ObstacleState
+    :return: True jeśli trzmiel zachodzi na przeszkodę poza przerwą
+    :rtype: bool
+    """
+    return collides(bee.frame, round(obstacle.x) - BEE_X, round(bee.y) - obstacle.y, obstacle.gap)
+
+
+class World:
+    """
+    :class World: Stan jednej gry jednoosobowej przesuwany krokami symulacji
+        :ivar self.bee: Trzmiel
+        :type self.bee: Bee
+        :ivar self.seed: Ziarno toru
+        :type self.seed: int
+        :ivar self.difficulty: Krzywa trudności toru (nazwa z DIFFICULTIES)
+        :type self.difficulty: string
+        :ivar self.course: Generator toru
+        :type self.course: CourseGenerator
+        :ivar self.obstacles: Pula przeszkód, tworzona raz i używana ponownie w kolejnych grach
+        :type self.obstacles: List[ObstacleState]
+        :ivar self.score: Wynik gracza
+        :type self.score: int
+        :ivar self.next_obstacle: Indeks najbliższej przeszkody, której trzmiel jeszcze nie minął
+            (przeszkody są ułożone po kolei, a przeniesiona na koniec toru zostaje ostatnia)
+        :type self.next_obstacle: int
+        :ivar self.started: True gdy trzmiel leci, a przeszkody się przesuwają
+        :type self.started: bool
+        :ivar self.landed: True gdy gra się zakończyła
+        :type self.landed: bool
+        :ivar self.tick: Numer kroku symulacji
+        :type self.tick: int
+    """
+
+    def __init__(self, seed=None, bee_y=BEE_START_Y, difficulty='classic'):
+        self.obstacles = []
+        self.reset(seed, bee_y, difficulty)
+
+    def reset(self, seed=None, bee_y=BEE_START_Y, difficulty='classic'):
+        """
+        :function reset: Przywraca stan początkowy gry, używając ponownie przeszkód z puli
+        :param seed: Ziarno toru (None - losowe, zapamiętane w self.seed, żeby grę można było powtórzyć)
+        :param bee_y: Początkowe położenie trzmiela w pionie
+        :param difficulty: Nazwa krzywej trudności z DIFFICULTIES (albo obiekt Difficulty)
+        """
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.difficulty = difficulty
+        self.course = CourseGenerator(self.seed, difficulty)
+        count = self.course.difficulty.obstacle_count
+        del self.obstacles[count:]
+        while len(self.obstacles) < count:
+            self.obstacles.append(ObstacleState())
+        previous_x = None
+        for obstacle in self.obstacles:
+            self.course.place(obstacle, previous_x)
+            previous_x = obstacle.x
+        self.bee = Bee(bee_y)
+        self.score = 0
+        self.next_obstacle = 0
+        self.started = False
+        self.landed = False
+        self.tick = 0
+
+    def start(self):
+        """
+        :function start: Rozpoczyna lot trzmiela bez skoku (np. na starcie wyścigu, gdy wszyscy ruszają naraz)
+        """
+        if not self.bee.collision:
+            self.started = True
+
+    def step(self, jump=False):
+        """
+        :function step: Wykonuje jeden krok symulacji
+        :param jump: True jeśli przycisk skoku jest wciśnięty
+        :type jump: bool
+        :return: Lista zdarzeń, które zaszły w tym kroku
+        :rtype: List[str]
+        """
+        events = []
+        bee = self.bee
+        self.tick += 1
+        if not self.started and not bee.collision and jump:
+            """ rozpocznij ruch trzmiela po naciśnięciu skoku """
+            self.started = True
+        if self.started:
+            self.move_obstacles()
+        self.move_bee(jump, events)
+        if not bee.collision and self.find_collision():
+            if self.started:
+                events.append(HIT)
+            self.started = False
+            bee.collision = True
+        if self.started:
+            self.score_passed(events)
+        return events
+
+    def find_collision(self):
+        """
+        :function find_collision: Szuka przeszkody, z którą zderzył się trzmiel. Sprawdzana jest ostatnio minięta
+        przeszkoda, a potem kolejne w kolejności położenia, dopóki zachodzą na trzmiela w poziomie - dokładny test
+        wykonywany jest najwyżej dla dwóch przeszkód, niezależnie od ich ilości
+        :return: Przeszkoda, z którą zderzył się trzmiel (None jeśli brak)
+        :rtype: ObstacleState
+        """
+        obstacles = self.obstacles
+        count = len(obstacles)
+        """ ostatnio minięta przeszkoda może już być przeniesiona na koniec toru, więc tu bez przerywania """
+        previous = obstacles[self.next_obstacle - 1]
+        if abs(round(previous.x) - BEE_X) < REACH and check_collision(self.bee, previous):
+            return previous
+        for i in range(self.next_obstacle, self.next_obstacle + count - 1):
+            obstacle = obstacles[i % count]
+            if round(obstacle.x) - BEE_X >= REACH:
+                """ ta i kolejne przeszkody są dalej w prawo """
+                break
+            if check_collision(self.bee, obstacle):
+                return obstacle
+        return None
+
+    def move_obstacles(self):
+        """
+        :function move_obstacles: Przesuwa przeszkody, a te za ekranem ustawia na końcu toru jako następne z generatora
+        (przeszkody leżą w puli po kolei, więc ostatnią na torze jest poprzednia w puli)
+        """
+        obstacles = self.obstacles
+        for obstacle in obstacles:
+            obstacle.previous_x = obstacle.x
+            obstacle.x -= OBSTACLE_SPEED
+        for i, obstacle in enumerate(obstacles):
+            if obstacle.x <= OBSTACLE_RECYCLE_X:
+                self.course.place(obstacle, obstacles[i - 1].x)
+
+    def score_passed(self, events):
+        """
+        :function score_passed: Daje punkt, gdy środek trzmiela minie środek najbliższej przeszkody.
+        Sprawdzana jest tylko jedna przeszkoda, a punkt za każdą przeszkodę przyznawany jest raz.
+        :param events: Lista zdarzeń kroku
+        """
+        obstacle = self.obstacles[self.next_obstacle]
+        if obstacle.x <= BEE_X and not obstacle.passed:
+            obstacle.passed = True
+            self.score += 1
+            self.next_obstacle = (self.next_obstacle + 1) % len(self.obstacles)
+            events.append(POINT)
+
+    def move_bee(self, jump, events):
+        """
+        :function move_bee: Ruch trzmiela: unoszenie w oczekiwaniu na start, lot lub spadanie po kolizji
+        :param jump: True jeśli przycisk skoku jest wciśnięty
+        :param events: Lista zdarzeń kroku
+        """
+        bee = self.bee
+        bee.previous_y = bee.y
+        """ klatka animacji zmienia się co ANIMATION_TICKS kroków """
+        animation_step = self.tick % ANIMATION_TICKS == 0
+        if animation_step and not bee.stop:
+            bee.frame = (bee.frame + 1) % BEE_FRAMES
+        if self.started:
+            """ sprawdzenie czy nastąpił skok """
+            if jump and not bee.if_jumped:
+                bee.y_velocity = JUMP_VELOCITY
+                bee.if_jumped = True
+                events.append(JUMP)
+            elif not jump:
+                bee.if_jumped = False
+            bee.y_velocity += GRAVITY
+            bee.y += bee.y_velocity
+        elif bee.collision:
+            if bee.y < WORLD_HEIGHT - BEE_SIZE[1] / 3:
+                """ animacja kolizji """
+                bee.rotation += SPIN_SPEED
+                bee.y_velocity += GRAVITY
+                bee.y += bee.y_velocity
+            elif not bee.stop:
+                bee.stop = True
+                self.landed = True
+                events.append(LANDED)
+        elif animation_step:
+            """ unoszenie się góra dół w oczekiwaniu na start """
+            if bee.grow > BOB_RANGE:
+                bee.mode = -1
+            if bee.grow < -BOB_RANGE:
+                bee.mode = 1
+            bee.grow += bee.mode
+            bee.y += bee.grow
@@ -0,0 +1,22 @@
+"""
+    stats
+    =====
+    Statystyki pomiarów czasu, wspólne dla profilera, benchmarku i serwera sesji. Bez pygame, więc serwer
+    sesji pozostaje bez okna i bez biblioteki graficznej.
+"""
+
+
+def percentile(values, fraction):
+    """
+    :function percentile: Percentyl metodą najbliższej pozycji
+    :param values: Posortowane wartości
+    :type values: List[float]
+    :param fraction: Percentyl jako ułamek (np. 0.95)
+    :type fraction: float
+    :return: Percentyl (0.0 dla pustej listy)
+    :rtype: float
+    """
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, round(fraction * len(values)) - 1))
+    return values[index]
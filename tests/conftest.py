@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+""" Moduły gry leżą w katalogu głównym repozytorium, a pygame działa bez okna i karty dźwiękowej """
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+
+@pytest.fixture
+def autopilot():
+    """ Prosty gracz - skacze, gdy trzmiel spada poniżej środka przerwy najbliższej przeszkody """
+    from simulation import BEE_X
+
+    def jump(world):
+        ahead = [obstacle for obstacle in world.obstacles if obstacle.x + 80 > BEE_X]
+        target = min(ahead, key=lambda obstacle: obstacle.x)
+        return world.bee.y > target.y + 35 and world.bee.y_velocity > 0
+    return jump
@@ -0,0 +1,28 @@
+import numpy as np
+
+from batch_simulation import BatchWorld
+from simulation import World
+
+SEEDS = [3, 1234, 987654]
+TICKS = 6000
+
+
+def test_batch_world_matches_world(autopilot):
+    worlds = [World(seed) for seed in SEEDS]
+    batch = BatchWorld(len(SEEDS), SEEDS)
+    for tick in range(TICKS):
+        jumps = [tick == 0 or (not world.bee.collision and autopilot(world)) for world in worlds]
+        for world, jump in zip(worlds, jumps):
+            world.step(jump)
+        batch.step(np.array(jumps))
+        assert batch.score.tolist() == [world.score for world in worlds], f"tick {tick}"
+        assert batch.alive.tolist() == [not world.bee.collision for world in worlds], f"tick {tick}"
+        assert np.allclose(batch.y, [world.bee.y for world in worlds]), f"tick {tick}"
+    assert max(world.score for world in worlds) > 0
+
+
+def test_shared_course_starts_every_bee():
+    batch = BatchWorld(4, [42], shared_course=True)
+    batch.step(False)
+    assert batch.started.all()
+    assert batch.obstacle_x.shape[0] == 1
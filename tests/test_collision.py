@@ -0,0 +1,55 @@
+import os
+
+import pygame
+import pytest
+
+import TrzmielIT as game
+from assets import read_image
+from collision import collides, bee_shapes, obstacle_shape, REACH
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def masks():
+    """ Maski obrazków trzmiela i przeszkody w rozmiarach, w jakich są rysowane """
+    bee = [pygame.mask.from_surface(read_image(os.path.join(ROOT, image), game.trzmiel_size, smooth=True))
+           for image in game.trzmiel_images]
+    obstacle = pygame.mask.from_surface(read_image(os.path.join(ROOT, game.game_obstacle_image), game.obstacle_size))
+    return bee, obstacle
+
+
+def overlap(bee, obstacle, dx, dy):
+    """
+    :function overlap: Test piksel po pikselu na maskach - przeszkoda przesunięta o dx w poziomie,
+    trzmiel o dy względem środka przeszkody w pionie (środki jak w pygame.Rect(center=...))
+    :rtype: bool
+    """
+    bee_width, bee_height = bee.get_size()
+    width, height = obstacle.get_size()
+    offset = (dx - width // 2 + bee_width // 2, -dy - height // 2 + bee_height // 2)
+    return bee.overlap(obstacle, offset) is not None
+
+
+def test_shapes_match_images(masks):
+    bee, obstacle = masks
+    assert [(shape.width, shape.height) for shape in bee_shapes] == [mask.get_size() for mask in bee]
+    assert (obstacle_shape.width, obstacle_shape.height) == obstacle.get_size()
+
+
+def test_narrowphase_matches_pixel_overlap(masks):
+    bee, obstacle = masks
+    results = set()
+    for frame in range(len(bee_shapes)):
+        for dx in range(-REACH - 3, REACH + 4, 5):
+            for dy in range(-130, 131, 4):
+                expected = overlap(bee[frame], obstacle, dx, dy)
+                assert collides(frame, dx, dy) == expected, (frame, dx, dy)
+                results.add(expected)
+    assert results == {True, False}
+
+
+def test_far_obstacle_never_collides():
+    for frame in range(len(bee_shapes)):
+        assert not collides(frame, REACH, 0)
+        assert not collides(frame, -REACH, 2000)
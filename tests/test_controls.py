@@ -0,0 +1,46 @@
+import pygame
+
+from controls import JumpTimeline
+
+
+def test_tap_shorter_than_a_tick_jumps_once():
+    timeline = JumpTimeline()
+    timeline.record(10.0, pygame.K_SPACE, True)
+    timeline.record(11.0, pygame.K_SPACE, False)
+    assert timeline.sample(5.0) is False
+    assert timeline.sample(13.0) is True
+    assert timeline.press_time == 10.0
+    assert timeline.sample(21.0) is False
+    assert timeline.press_time is None
+
+
+def test_held_key_stays_down_between_ticks():
+    timeline = JumpTimeline()
+    timeline.record(0.0, pygame.K_UP, True)
+    assert timeline.sample(8.0) is True
+    assert timeline.sample(16.0) is True
+    assert timeline.press_time is None
+    timeline.record(20.0, pygame.K_UP, False)
+    """ krok, w którego czasie klawisz był jeszcze wciśnięty """
+    assert timeline.sample(24.0) is True
+    assert timeline.sample(32.0) is False
+
+
+def test_both_jump_keys_count_as_one_button():
+    timeline = JumpTimeline()
+    timeline.record(0.0, pygame.K_UP, True)
+    timeline.record(1.0, pygame.K_SPACE, True)
+    timeline.record(2.0, pygame.K_UP, False)
+    assert list(timeline.changes) == [(0.0, True)]
+    timeline.record(3.0, pygame.K_SPACE, False)
+    assert list(timeline.changes) == [(0.0, True), (3.0, False)]
+
+
+def test_skip_drops_presses_but_keeps_held_state():
+    timeline = JumpTimeline()
+    timeline.record(0.0, pygame.K_SPACE, True)
+    timeline.skip()
+    assert not timeline.changes
+    assert timeline.held is True
+    assert timeline.sample(10.0) is True
+    assert timeline.press_time is None
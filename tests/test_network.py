@@ -0,0 +1,109 @@
+import queue
+import struct
+
+import pytest
+
+from network import bee_values, encode_bee, decode_bee, pack_bits, unpack_bits, autopilot, BEE_FIELDS, ProtocolError
+from network import RaceSession, WELCOME, WELCOME_DATA, SNAPSHOT, SNAPSHOT_DATA, RESULT, SCORE_DATA
+from simulation import World
+
+
+def stored(values):
+    """
+    :function stored: Wartości pól po zapisaniu w formatach BEE_FIELDS (obrót zapisywany jest jako float32)
+    """
+    return [field.unpack(field.pack(value))[0] for field, value in zip(BEE_FIELDS, values)]
+
+
+def flying_world(ticks):
+    world = World(4321)
+    for tick in range(ticks):
+        world.step(tick == 0 or autopilot(world))
+    return world
+
+
+def test_encode_decode_full_snapshot():
+    values = bee_values(flying_world(300))
+    data = b'\x00' + encode_bee(values, None)
+    decoded, offset = decode_bee(data, 1, None)
+    assert decoded == stored(values)
+    assert offset == len(data)
+
+
+def test_encode_decode_delta():
+    world = flying_world(300)
+    previous = stored(bee_values(world))
+    world.step(True)
+    values = stored(bee_values(world))
+    data = encode_bee(values, previous)
+    changed = [i for i in range(len(BEE_FIELDS)) if values[i] != previous[i]]
+    assert changed
+    assert len(data) == 1 + sum(BEE_FIELDS[i].size for i in changed)
+    assert decode_bee(data, 0, previous) == (values, len(data))
+
+
+def test_unchanged_bee_is_one_byte():
+    values = stored(bee_values(flying_world(10)))
+    assert encode_bee(values, values) == b'\x00'
+    assert decode_bee(b'\x00', 0, values) == (values, 1)
+
+
+def test_first_snapshot_must_be_complete():
+    values = stored(bee_values(World(1)))
+    with pytest.raises(ProtocolError):
+        decode_bee(encode_bee(values, values), 0, None)
+
+
+def test_pack_bits_round_trip():
+    bits = [bool(i % 3) for i in range(21)]
+    data = pack_bits(bits)
+    assert len(data) == 3
+    assert unpack_bits(struct.pack('<B', 0xAA) + data, len(bits), 1) == bits
+
+
+class FakeClient:
+    """
+    :class FakeClient: Połączenie z serwerem bez sieci - wiadomości wkładane są do kolejki ręcznie
+    """
+
+    def __init__(self, *messages):
+        self.messages = queue.Queue()
+        for item in messages:
+            self.messages.put(item)
+        self.closed = False
+
+    def send(self, kind, payload=b''):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def welcome(player=0, players=2, difficulty=b'classic'):
+    return WELCOME, WELCOME_DATA.pack(player, players, 7, len(difficulty)) + difficulty
+
+
+@pytest.mark.parametrize('messages', [
+    [(WELCOME, b'\x00\x02')],
+    [welcome(difficulty=b'nightmare')],
+    [welcome(player=2)],
+    [(SNAPSHOT, SNAPSHOT_DATA.pack(1, 6, 0))],
+    [welcome(), (SNAPSHOT, SNAPSHOT_DATA.pack(1, 6, 16))],
+    [welcome(), (RESULT, SCORE_DATA.pack(3))],
+])
+def test_malformed_message_closes_session(messages):
+    client = FakeClient(*messages, welcome())
+    session = RaceSession(client)
+    session.poll()
+    assert session.closed and client.closed
+    assert session.result is None
+    """ wiadomości po błędnej nie są już obsługiwane """
+    assert client.messages.qsize() == 1
+
+
+def test_result_ends_session():
+    client = FakeClient(welcome(player=1), (RESULT, SCORE_DATA.pack(3) + SCORE_DATA.pack(5)))
+    session = RaceSession(client)
+    session.poll()
+    assert not session.closed
+    assert session.result == [3, 5]
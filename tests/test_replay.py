@@ -0,0 +1,65 @@
+import pytest
+
+from replay import ReplayWriter, ReplayReader, ReplayError, HEADER
+from simulation import World
+
+""" Limit kroków nagrywanej gry (ok. 100 s) """
+MAX_TICKS = 12000
+
+
+def record_game(path, seed, autopilot, difficulty='classic'):
+    """
+    :function record_game: Nagrywa grę autopilota do path
+    :return: Gra po ostatnim kroku
+    :rtype: simulation.World
+    """
+    world = World(seed, difficulty=difficulty)
+    writer = ReplayWriter.for_world(str(path), world)
+    while not world.landed and world.tick < MAX_TICKS:
+        jump = world.tick == 0 or autopilot(world)
+        writer.record(jump)
+        world.step(jump)
+    writer.close(world.score)
+    return world
+
+
+@pytest.mark.parametrize('difficulty', ['classic', 'ramp'])
+def test_replay_reproduces_score(tmp_path, autopilot, difficulty):
+    path = tmp_path / 'game.trzr'
+    world = record_game(path, 1234, autopilot, difficulty)
+    assert world.score > 0
+
+    reader = ReplayReader(str(path))
+    assert (reader.seed, reader.difficulty, reader.ticks, reader.score) == (1234, difficulty, world.tick, world.score)
+    replayed = reader.play()
+    assert replayed.score == world.score
+    assert replayed.tick == world.tick
+    assert replayed.bee.y == world.bee.y
+
+
+def test_replay_inputs_round_trip(tmp_path):
+    path = str(tmp_path / 'inputs.trzr')
+    jumps = [tick % 3 == 0 or tick % 7 == 0 for tick in range(1000)]
+    writer = ReplayWriter(path, 7)
+    for jump in jumps:
+        writer.record(jump)
+    writer.close(0)
+    assert list(ReplayReader(path).inputs()) == jumps
+
+
+def test_corrupted_replay_is_rejected(tmp_path, autopilot):
+    path = tmp_path / 'game.trzr'
+    record_game(path, 99, autopilot)
+    data = bytearray(path.read_bytes())
+    data[HEADER.size + 10] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(ReplayError):
+        ReplayReader(str(path)).play()
+
+
+def test_truncated_replay_is_rejected(tmp_path, autopilot):
+    path = tmp_path / 'game.trzr'
+    record_game(path, 99, autopilot)
+    path.write_bytes(path.read_bytes()[:-20])
+    with pytest.raises(ReplayError):
+        ReplayReader(str(path))
@@ -0,0 +1,117 @@
+import sqlite3
+import threading
+
+import pytest
+
+from scores import ScoreStore, CACHED_SCORES, connect
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ScoreStore(str(tmp_path / 'scores.sqlite3'))
+    yield store
+    store.close()
+
+
+def test_legacy_scores_are_migrated_once(tmp_path):
+    legacy = tmp_path / 'highscores.txt'
+    legacy.write_text("5\n12\nnot a score\n\n3\n")
+    path = str(tmp_path / 'scores.sqlite3')
+    store = ScoreStore(path, str(legacy))
+    assert store.top() == [12, 5, 3]
+    assert store.best() == 12
+    store.close()
+    legacy.write_text("40\n")
+    store = ScoreStore(path, str(legacy))
+    assert store.top() == [12, 5, 3]
+    store.close()
+
+
+def test_missing_legacy_file(tmp_path):
+    store = ScoreStore(str(tmp_path / 'scores.sqlite3'), str(tmp_path / 'missing.txt'))
+    assert store.top() == []
+    assert store.best() == 0
+    store.close()
+
+
+def test_top_is_ordered_and_limited(store):
+    scores = [7, 30, 2, 30, 15, 0, 9, 21, 4, 11, 18, 1, 26]
+    for score in scores:
+        store.add(score, seed=score, difficulty='classic', ticks=100)
+    expected = sorted(scores, reverse=True)
+    """ najlepsze wyniki w pamięci są gotowe od razu, przed zapisem """
+    assert store.best_scores == expected[:CACHED_SCORES]
+    store.flush()
+    assert store.top() == expected[:CACHED_SCORES]
+    assert store.top(3) == [30, 30, 26]
+    assert store.top(100) == expected
+
+
+def test_race_scores_are_not_best_scores(store):
+    store.add(40, race=True)
+    store.add(6)
+    assert store.best_scores == [6]
+    store.flush()
+    assert store.top() == [6]
+    assert [row['race'] for row in store.history()] == [0, 1]
+
+
+def test_top_reads_the_index(store):
+    plan = store.connection.execute("EXPLAIN QUERY PLAN SELECT score FROM scores WHERE race = 0 "
+                                    "ORDER BY score DESC, played_at LIMIT 10").fetchall()
+    details = ' '.join(row[-1] for row in plan)
+    assert 'scores_by_race_score' in details
+    assert 'TEMP B-TREE' not in details
+
+
+def test_old_database_is_upgraded(tmp_path):
+    path = str(tmp_path / 'scores.sqlite3')
+    old = sqlite3.connect(path)
+    old.executescript("""
+        CREATE TABLE scores (id INTEGER PRIMARY KEY, score INTEGER NOT NULL, played_at REAL NOT NULL,
+                             seed INTEGER, difficulty TEXT, ticks INTEGER, replay TEXT);
+        CREATE INDEX scores_by_score ON scores (score DESC, played_at);
+        INSERT INTO scores (score, played_at) VALUES (5, 1.0), (11, 2.0);
+    """)
+    old.close()
+    connection = connect(path)
+    indexes = [name for name, in connection.execute("SELECT name FROM sqlite_master "
+                                                  "WHERE type = 'index' AND tbl_name = 'scores'")]
+    connection.close()
+    assert indexes == ['scores_by_race_score']
+    store = ScoreStore(path)
+    assert store.top() == [11, 5]
+    store.close()
+
+
+def test_history_keeps_every_game(store):
+    store.add(4, seed=1, difficulty='ramp', ticks=500, replay='a.trzr')
+    store.add(9, seed=2, difficulty='classic', ticks=900, replay='b.trzr')
+    store.flush()
+    history = store.history()
+    assert [(row['score'], row['seed'], row['difficulty'], row['ticks'], row['replay']) for row in history] == \
+        [(9, 2, 'classic', 900, 'b.trzr'), (4, 1, 'ramp', 500, 'a.trzr')]
+    assert len(store.history(1)) == 1
+
+
+def test_scores_survive_reopening(tmp_path):
+    path = str(tmp_path / 'scores.sqlite3')
+    store = ScoreStore(path)
+    store.add(17)
+    store.close()
+    store = ScoreStore(path)
+    assert store.best() == 17
+    store.close()
+
+
+def test_writer_survives_failed_insert(store, capsys):
+    """ ziarno, którego SQLite nie zapisze - zapis tej gry się nie udaje """
+    store.add(50, seed=object())
+    store.add(8)
+    flushed = threading.Thread(target=store.flush, daemon=True)
+    flushed.start()
+    flushed.join(5)
+    assert not flushed.is_alive()
+    assert store.writer.is_alive()
+    assert store.top() == [8]
+    assert "Couldn't save score 50" in capsys.readouterr().err
@@ -0,0 +1,73 @@
+import asyncio
+
+from network import message, read_message, HELLO, HELLO_DATA, START, BUSY, PROTOCOL_VERSION
+from session_server import SessionServer
+from simulation import TICK_RATE
+
+
+async def connect(server):
+    """
+    :function connect: Łączy klienta z serwerem i wysyła HELLO
+    :return: Strumienie połączenia
+    """
+    reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+    writer.write(message(HELLO, HELLO_DATA.pack(PROTOCOL_VERSION)))
+    return reader, writer
+
+
+async def first_message(reader, kinds):
+    """ Pierwsza wiadomość z kinds """
+    while True:
+        kind, payload = await read_message(reader)
+        if kind in kinds:
+            return kind
+
+
+async def two_sessions():
+    loop = asyncio.get_event_loop()
+    server = SessionServer(seed=5)
+    await server.start('127.0.0.1', 0)
+    clients = [await connect(server)]
+    await first_message(clients[0][0], (START,))
+    """ druga sesja zaczyna się później, ale na tej samej siatce kroków """
+    await asyncio.sleep(0.013)
+    clients.append(await connect(server))
+    await first_message(clients[1][0], (START,))
+    sessions = sorted((entry[2] for entry in server.schedule), key=lambda session: session.start)
+    assert len(sessions) == 2
+    samples = []
+    for _ in range(3):
+        await asyncio.sleep(max(0.0, sessions[1].start + 0.15 - loop.time()))
+        now = loop.time()
+        samples.append([(session.tick, (now - session.start) * TICK_RATE) for session in sessions])
+        await asyncio.sleep(0.1)
+    for writer in (writer for _, writer in clients):
+        writer.close()
+    server.server.close()
+    return sessions, samples
+
+
+def test_sessions_tick_at_tick_rate():
+    sessions, samples = asyncio.run(two_sessions())
+    for session in sessions:
+        assert abs(session.start * TICK_RATE - round(session.start * TICK_RATE)) < 1e-6
+    for sample in samples:
+        for tick, expected in sample:
+            assert expected - 3 <= tick <= expected + 1
+
+
+async def overloaded_server():
+    server = SessionServer(seed=5)
+    await server.start('127.0.0.1', 0)
+    server.load = 1.0
+    reader, writer = await connect(server)
+    kind = await first_message(reader, (START, BUSY))
+    writer.close()
+    server.server.close()
+    return kind, server
+
+
+def test_overloaded_server_answers_busy():
+    kind, server = asyncio.run(overloaded_server())
+    assert kind == BUSY
+    assert server.rejected == 1 and not server.schedule
@@ -0,0 +1,72 @@
+import pytest
+
+from simulation import (World, CourseGenerator, ObstacleState, DIFFICULTIES, GAP_RANGE, WORLD_WIDTH, OBSTACLE_SIZE,
+                        OBSTACLE_RECYCLE_X)
+
+PLACED = 200
+
+
+def course(seed, difficulty, count=PLACED):
+    """
+    :function course: Ustawia count kolejnych przeszkód toru
+    :rtype: List[ObstacleState]
+    """
+    generator = CourseGenerator(seed, difficulty)
+    obstacles = []
+    for _ in range(count):
+        obstacle = ObstacleState()
+        generator.place(obstacle, obstacles[-1].x if obstacles else None)
+        obstacles.append(obstacle)
+    return obstacles
+
+
+def test_same_seed_same_course(autopilot):
+    first, second = World(55, difficulty='ramp'), World(55, difficulty='ramp')
+    for tick in range(2000):
+        jump = tick == 0 or autopilot(first)
+        first.step(jump)
+        second.step(jump)
+    assert [(o.x, o.y, o.gap) for o in first.obstacles] == [(o.x, o.y, o.gap) for o in second.obstacles]
+    assert first.score == second.score
+    assert [(o.x, o.y) for o in course(1, 'ramp')] != [(o.x, o.y) for o in course(2, 'ramp')]
+
+
+@pytest.mark.parametrize('name', sorted(DIFFICULTIES))
+def test_course_stays_within_difficulty_bounds(name):
+    difficulty = DIFFICULTIES[name]
+    obstacles = course(7, name)
+    for index, obstacle in enumerate(obstacles):
+        spacing, gap = difficulty.at(index)
+        assert obstacle.gap == gap
+        assert min(difficulty.gap) <= gap <= max(difficulty.gap)
+        assert GAP_RANGE[0] <= obstacle.y < GAP_RANGE[1]
+        if index:
+            distance = obstacle.x - obstacles[index - 1].x
+            assert abs(distance - spacing) <= difficulty.spacing_jitter
+            assert distance >= difficulty.min_spacing
+    """ po rampie trudność przestaje rosnąć """
+    assert difficulty.at(difficulty.ramp) == difficulty.at(PLACED)
+
+
+def test_ramp_gets_harder():
+    ramp = DIFFICULTIES['ramp']
+    curve = [ramp.at(index) for index in range(ramp.ramp + 1)]
+    assert all(later[0] <= earlier[0] and later[1] <= earlier[1] for earlier, later in zip(curve, curve[1:]))
+    assert curve[-1][0] < curve[0][0] and curve[-1][1] < curve[0][1]
+
+
+@pytest.mark.parametrize('name', sorted(DIFFICULTIES))
+def test_recycled_obstacles_appear_off_screen(name, autopilot):
+    difficulty = DIFFICULTIES[name]
+    assert OBSTACLE_RECYCLE_X + difficulty.obstacle_count * difficulty.min_spacing >= WORLD_WIDTH + OBSTACLE_SIZE[0]
+    world = World(11, difficulty=name)
+    assert len(world.obstacles) == difficulty.obstacle_count
+    recycled = 0
+    for tick in range(8000):
+        previous = [obstacle.x for obstacle in world.obstacles]
+        world.step(tick == 0 or autopilot(world))
+        for x, obstacle in zip(previous, world.obstacles):
+            if obstacle.x > x:
+                recycled += 1
+                assert obstacle.x - OBSTACLE_SIZE[0] // 2 > WORLD_WIDTH
+    assert recycled > 0
@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+from stats import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.95) == 95
+    assert percentile(values, 1.0) == 100
+    assert percentile([7.0], 0.99) == 7.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_session_server_does_not_load_pygame():
+    check = "import sys, session_server; print('pygame' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', check], capture_output=True, text=True, check=True,
+                            cwd=ROOT)
+    assert result.stdout.strip() == 'False'
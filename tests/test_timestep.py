@@ -0,0 +1,37 @@
+from simulation import FixedTimestep
+
+
+def run_frames(frame_ms, duration_ms):
+    """
+    :function run_frames: Ilość kroków symulacji w duration_ms przy klatkach po frame_ms
+    :rtype: int
+    """
+    timestep = FixedTimestep()
+    steps = 0
+    for _ in range(duration_ms // frame_ms):
+        timestep.advance(frame_ms)
+        while timestep.step():
+            steps += 1
+    return steps
+
+
+def test_step_count_does_not_depend_on_frame_rate():
+    counts = [run_frames(frame_ms, 6600) for frame_ms in (7, 16, 33)]
+    assert max(counts) - min(counts) <= 1
+    assert abs(counts[0] - 6600 * 120 // 1000) <= 1
+
+
+def test_alpha_is_the_unsimulated_part_of_a_tick():
+    timestep = FixedTimestep(tick_rate=100)
+    timestep.advance(25)
+    assert timestep.step() and timestep.step() and not timestep.step()
+    assert timestep.alpha == 0.5
+
+
+def test_stall_is_capped():
+    timestep = FixedTimestep(tick_rate=100, max_frame_time=250)
+    timestep.advance(5000)
+    steps = 0
+    while timestep.step():
+        steps += 1
+    assert steps == 25
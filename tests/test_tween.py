@@ -0,0 +1,52 @@
+import pygame
+
+from tween import Tweens, linear, ease_in_quad, ease_out_quad, ease_in_out_cubic
+
+
+class Target:
+    def __init__(self, center):
+        self.rect = pygame.Rect(0, 0, 10, 10)
+        self.rect.center = center
+
+
+def test_easings_start_and_end_in_place():
+    for easing in (linear, ease_in_quad, ease_out_quad, ease_in_out_cubic):
+        assert easing(0.0) == 0.0
+        assert easing(1.0) == 1.0
+
+
+def test_move_is_time_based():
+    tweens = Tweens()
+    target = Target((0, 0))
+    done = []
+    tweens.move(target, (100, 40), 200, linear, lambda: done.append(target))
+    tweens.update(50)
+    assert target.rect.center == (25, 10)
+    tweens.update(100)
+    assert target.rect.center == (75, 30)
+    assert not done and target in tweens
+    tweens.update(1000)
+    assert target.rect.center == (100, 40)
+    assert done == [target]
+    assert target not in tweens and len(tweens) == 0
+
+
+def test_cancel_keeps_other_tweens():
+    tweens = Tweens()
+    targets = [Target((0, 0)) for _ in range(3)]
+    for i, target in enumerate(targets):
+        tweens.move(target, (100 * (i + 1), 0), 100, linear)
+    tweens.cancel(targets[0])
+    assert len(tweens) == 2 and targets[0] not in tweens
+    tweens.update(100)
+    assert [target.rect.centerx for target in targets] == [0, 200, 300]
+
+
+def test_callback_can_start_new_tween():
+    tweens = Tweens()
+    target = Target((0, 0))
+    tweens.move(target, (10, 0), 10, linear, lambda: tweens.move(target, (0, 0), 10, linear))
+    tweens.update(10)
+    assert target.rect.center == (10, 0) and target in tweens
+    tweens.update(10)
+    assert target.rect.center == (0, 0) and target not in tweens
@@ -0,0 +1,75 @@
+import pygame
+
+from ui import WidgetIndex
+
+
+class Widget:
+    def __init__(self, rect):
+        self.hit_rect = pygame.Rect(rect)
+        self.hovers = []
+        self.presses = 0
+
+    def hover(self, on):
+        self.hovers.append(on)
+
+    def press(self):
+        self.presses += 1
+
+
+def event(kind, position):
+    return pygame.event.Event(kind, pos=position, button=1)
+
+
+def test_hover_only_on_change():
+    index = WidgetIndex()
+    button = Widget((150, 150, 120, 40))
+    index.add(button)
+    index.move((10, 10))
+    index.move((160, 160))
+    index.move((200, 170))
+    index.move((400, 400))
+    assert button.hovers == [True, False]
+
+
+def test_release_presses_widget_under_pointer():
+    index = WidgetIndex()
+    first, second = Widget((0, 0, 50, 50)), Widget((300, 300, 50, 50))
+    index.add(first)
+    index.add(second)
+    index.dispatch([event(pygame.MOUSEMOTION, (10, 10)), event(pygame.MOUSEMOTION, (310, 310)),
+                    event(pygame.MOUSEBUTTONUP, (20, 20))])
+    assert (first.presses, second.presses) == (1, 0)
+    assert index.hovered is first
+
+
+def test_later_widget_is_on_top():
+    index = WidgetIndex()
+    below, above = Widget((0, 0, 200, 200)), Widget((50, 50, 20, 20))
+    index.add(below)
+    index.add(above)
+    assert index.widget_at((60, 60)) is above
+    assert index.widget_at((10, 10)) is below
+    assert index.widget_at((250, 10)) is None
+
+
+def test_remove_and_leave_unhover():
+    index = WidgetIndex()
+    button, kept = Widget((0, 0, 50, 50)), Widget((100, 0, 50, 50))
+    index.add(button)
+    index.add(kept)
+    index.move((10, 10))
+    index.remove(button)
+    assert button.hovers == [True, False]
+    assert index.widget_at((10, 10)) is None
+    index.move((110, 10))
+    index.leave(keep=kept)
+    assert kept.hovers == [True]
+    assert index.hovered is None and index.pointer is None
+
+
+def test_widget_added_under_pointer_is_hovered():
+    index = WidgetIndex()
+    index.move((10, 10))
+    button = Widget((0, 0, 50, 50))
+    index.add(button)
+    assert button.hovers == [True]
@@ -0,0 +1,171 @@
+from array import array
+
+"""
+    tween
+    =====
+    Przejścia obiektów w czasie (np. wysuwanie okna startowego). Przejście trwa zadany czas w milisekundach,
+    niezależnie od ilości klatek na sekundę, a drogę wyznacza funkcja wygładzania. Dane aktywnych przejść leżą
+    w płaskich tablicach (po TWEEN_FIELDS liczb na przejście), a zakończone przejście zastępowane jest ostatnim,
+    więc tablice nie mają dziur. Gdy żadne przejście nie trwa, update() od razu wraca.
+"""
+
+
+def linear(t):
+    """
+    :function linear: Ruch jednostajny
+    :param t: Część czasu przejścia (0.0 - 1.0)
+    :type t: float
+    :return: Część drogi (0.0 - 1.0)
+    :rtype: float
+    """
+    return t
+
+
+def ease_in_quad(t):
+    """
+    :function ease_in_quad: Ruch przyspieszający
+    """
+    return t * t
+
+
+def ease_out_quad(t):
+    """
+    :function ease_out_quad: Ruch zwalniający
+    """
+    return t * (2.0 - t)
+
+
+def ease_in_out_cubic(t):
+    """
+    :function ease_in_out_cubic: Ruch przyspieszający do połowy drogi, a potem zwalniający
+    """
+    if t < 0.5:
+        return 4.0 * t * t * t
+    t = 2.0 * t - 2.0
+    return 0.5 * t * t * t + 1.0
+
+
+"""
+    Stałe przejść
+    -------------
+    TWEEN_FIELDS : int
+        Ilość liczb opisujących jedno przejście w Tweens.values: początek x, y, przesunięcie x, y,
+        czas rozpoczęcia i czas trwania
+"""
+TWEEN_FIELDS = 6
+
+
+class Tweens:
+    """
+    :class Tweens: Aktywne przejścia środków prostokątów (sprite.rect) do miejsc docelowych
+        :ivar self.clock: Czas przejść w milisekundach (płynie tylko, gdy jakieś przejście trwa)
+        :type self.clock: float
+        :ivar self.values: Kolejne przejścia po TWEEN_FIELDS liczb
+        :type self.values: array.array
+        :ivar self.targets: Przesuwane obiekty (z atrybutem rect), w kolejności przejść
+        :type self.targets: List[pygame.sprite.Sprite]
+        :ivar self.easings: Funkcje wygładzania przejść
+        :type self.easings: List[Callable[[float], float]]
+        :ivar self.callbacks: Funkcje wywoływane po zakończeniu przejść (None - brak)
+        :type self.callbacks: List[Callable]
+        :ivar self.slots: Numer przejścia po obiekcie
+        :type self.slots: Dict[Any, int]
+    """
+
+    def __init__(self):
+        self.clock = 0.0
+        self.values = array('d')
+        self.targets = []
+        self.easings = []
+        self.callbacks = []
+        self.slots = {}
+
+    def __len__(self):
+        return len(self.targets)
+
+    def __contains__(self, target):
+        return target in self.slots
+
+    def move(self, target, destination, duration, easing=ease_in_quad, on_done=None):
+        """
+        :function move: Zaczyna przesuwanie środka target.rect do destination (wcześniejsze przejście obiektu
+        zostaje przerwane)
+        :param target: Obiekt z atrybutem rect
+        :param destination: Docelowy środek
+        :type destination: Tuple[int, int]
+        :param duration: Czas przejścia w milisekundach
+        :type duration: float
+        :param easing: Funkcja wygładzania
+        :type easing: Callable[[float], float]
+        :param on_done: Funkcja wywoływana bez argumentów po dojściu na miejsce
+        :type on_done: Callable
+        """
+        self.cancel(target)
+        start_x, start_y = target.rect.center
+        self.slots[target] = len(self.targets)
+        self.targets.append(target)
+        self.easings.append(easing)
+        self.callbacks.append(on_done)
+        self.values.extend((start_x, start_y, destination[0] - start_x, destination[1] - start_y, self.clock,
+                            max(duration, 1.0)))
+
+    def cancel(self, target):
+        """
+        :function cancel: Przerywa przejście obiektu w miejscu, w którym jest (bez wywołania on_done)
+        :param target: Obiekt
+        """
+        slot = self.slots.pop(target, None)
+        if slot is None:
+            return
+        last = len(self.targets) - 1
+        if slot != last:
+            """ ostatnie przejście zajmuje miejsce usuniętego """
+            moved = self.targets[last]
+            self.targets[slot] = moved
+            self.easings[slot] = self.easings[last]
+            self.callbacks[slot] = self.callbacks[last]
+            self.values[slot * TWEEN_FIELDS:(slot + 1) * TWEEN_FIELDS] = \
+                self.values[last * TWEEN_FIELDS:(last + 1) * TWEEN_FIELDS]
+            self.slots[moved] = slot
+        self.targets.pop()
+        self.easings.pop()
+        self.callbacks.pop()
+        del self.values[last * TWEEN_FIELDS:]
+
+    def clear(self):
+        """
+        :function clear: Przerywa wszystkie przejścia
+        """
+        for target in list(self.targets):
+            self.cancel(target)
+
+    def update(self, elapsed):
+        """
+        :function update: Przesuwa obiekty o upływ czasu. Funkcje on_done zakończonych przejść wywoływane są
+        dopiero po przesunięciu wszystkich obiektów (mogą więc rozpoczynać nowe przejścia).
+        :param elapsed: Czas od poprzedniej klatki w milisekundach
+        :type elapsed: float
+        """
+        if not self.targets:
+            return
+        self.clock += elapsed
+        clock = self.clock
+        values = self.values
+        finished = []
+        for slot, target in enumerate(self.targets):
+            base = slot * TWEEN_FIELDS
+            progress = (clock - values[base + 4]) / values[base + 5]
+            if progress >= 1.0:
+                progress = 1.0
+                finished.append(target)
+            done = self.easings[slot](progress)
+            target.rect.center = (round(values[base] + values[base + 2] * done),
+                                  round(values[base + 1] + values[base + 3] * done))
+        callbacks = []
+        for target in finished:
+            callback = self.callbacks[self.slots[target]]
+            self.cancel(target)
+            if callback is not None:
+                callbacks.append(callback)
+        for callback in callbacks:
+            callback()
@@ -0,0 +1,166 @@
+import pygame
+
+"""
+    ui
+    ==
+    Warstwa wejścia interfejsu. Zdarzenia myszki z jednej klatki trafiają do indeksu aktywnych elementów sceny
+    (siatka komórek ekranu, w każdej elementy, które na nią zachodzą), więc wyszukanie elementu pod kursorem
+    sprawdza tylko kilka prostokątów, niezależnie od ilości elementów. Element dostaje wywołanie hover(True/False)
+    tylko gdy kursor na niego wjedzie lub z niego zjedzie, a press() przy puszczeniu przycisku myszki nad nim -
+    w klatkach bez ruchu myszki interfejs nic nie kosztuje.
+    Element to dowolny obiekt z atrybutem hit_rect (pygame.Rect) oraz metodami hover(bool) i press().
+"""
+
+""" CELL_SIZE : int
+        Bok komórki siatki indeksu w pikselach
+"""
+CELL_SIZE = 100
+
+
+class WidgetIndex:
+    """
+    :class WidgetIndex: Aktywne elementy interfejsu sceny w siatce komórek razem ze stanem kursora nad nimi
+        :ivar self.cells: Elementy zachodzące na komórkę siatki, po współrzędnych komórki
+        :type self.cells: Dict[Tuple[int, int], List[Any]]
+        :ivar self.rects: Prostokąty, pod którymi elementy są w siatce, i ich kolejność dodania (późniejszy na wierzchu)
+        :type self.rects: Dict[Any, Tuple[pygame.Rect, int]]
+        :ivar self.hovered: Element pod kursorem (None - brak)
+        :type self.hovered: Any
+        :ivar self.pointer: Ostatnie położenie kursora (None - jeszcze nieznane)
+        :type self.pointer: Tuple[int, int]
+    """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.rects = {}
+        self.hovered = None
+        self.pointer = None
+        self.order = 0
+
+    def covered_cells(self, rect):
+        """
+        :function covered_cells: Współrzędne komórek siatki, na które zachodzi prostokąt
+        :type rect: pygame.Rect
+        :rtype: Iterator[Tuple[int, int]]
+        """
+        size = self.cell_size
+        for column in range(rect.left // size, (rect.right - 1) // size + 1):
+            for row in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield column, row
+
+    def add(self, widget):
+        """
+        :function add: Dodaje element do indeksu pod jego aktualnym hit_rect (na wierzchu wcześniejszych)
+        :param widget: Element interfejsu
+        """
+        if widget in self.rects:
+            self.remove(widget)
+        rect = pygame.Rect(widget.hit_rect)
+        self.order += 1
+        self.rects[widget] = (rect, self.order)
+        for cell in self.covered_cells(rect):
+            self.cells.setdefault(cell, []).append(widget)
+        if self.pointer is not None and rect.collidepoint(self.pointer):
+            self.move(self.pointer)
+
+    def remove(self, widget):
+        """
+        :function remove: Usuwa element z indeksu (element pod kursorem dostaje hover(False))
+        :param widget: Element interfejsu
+        """
+        entry = self.rects.pop(widget, None)
+        if entry is None:
+            return
+        for cell in self.covered_cells(entry[0]):
+            widgets = self.cells[cell]
+            widgets.remove(widget)
+            if not widgets:
+                del self.cells[cell]
+        if widget is self.hovered:
+            self.hovered = None
+            widget.hover(False)
+
+    def update(self, widget):
+        """
+        :function update: Przenosi element w indeksie po zmianie jego hit_rect
+        :param widget: Element interfejsu
+        """
+        self.remove(widget)
+        self.add(widget)
+
+    def clear(self):
+        """
+        :function clear: Usuwa wszystkie elementy z indeksu
+        """
+        for widget in list(self.rects):
+            self.remove(widget)
+
+    def widget_at(self, position):
+        """
+        :function widget_at: Szuka elementu pod punktem (z elementów nachodzących na siebie - dodanego najpóźniej)
+        :param position: Punkt na ekranie
+        :type position: Tuple[int, int]
+        :rtype: Any
+        """
+        found, found_order = None, 0
+        cell = (position[0] // self.cell_size, position[1] // self.cell_size)
+        for widget in self.cells.get(cell, ()):
+            rect, order = self.rects[widget]
+            if order > found_order and rect.collidepoint(position):
+                found, found_order = widget, order
+        return found
+
+    def move(self, position):
+        """
+        :function move: Uaktualnia element pod kursorem, wywołując hover tylko przy zmianie
+        :param position: Położenie kursora
+        :type position: Tuple[int, int]
+        """
+        self.pointer = position
+        widget = self.widget_at(position)
+        if widget is not self.hovered:
+            previous, self.hovered = self.hovered, widget
+            if previous is not None:
+                previous.hover(False)
+            if widget is not None:
+                widget.hover(True)
+
+    def release(self, position):
+        """
+        :function release: Puszczenie przycisku myszki - naciśnięcie elementu pod kursorem
+        :param position: Położenie kursora
+        :type position: Tuple[int, int]
+        """
+        self.move(position)
+        if self.hovered is not None:
+            self.hovered.press()
+
+    def leave(self, keep=None):
+        """
+        :function leave: Kursor opuszcza indeks (np. gdy scena przestaje dostawać wejście) - element pod kursorem
+        dostaje hover(False), a położenie kursora jest zapominane
+        :param keep: Element, który zostaje pod kursorem w innym indeksie (nie dostaje hover(False))
+        """
+        self.pointer = None
+        if self.hovered is not None:
+            previous, self.hovered = self.hovered, None
+            if previous is not keep:
+                previous.hover(False)
+
+    def dispatch(self, events):
+        """
+        :function dispatch: Przekazuje zdarzenia myszki z jednej klatki. Z kolejnych ruchów myszki liczy się tylko
+        ostatni przed puszczeniem przycisku (i ostatni w klatce)
+        :param events: Zdarzenia MOUSEMOTION i MOUSEBUTTONUP w kolejności
+        :type events: List[pygame.event.Event]
+        """
+        motion = None
+        for event in events:
+            if event.type == pygame.MOUSEMOTION:
+                motion = event.pos
+            elif event.type == pygame.MOUSEBUTTONUP:
+                motion = None
+                self.release(event.pos)
+        if motion is not None:
+            self.move(motion)